@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2025 Kanarath.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+------------------------
+Micro-benchmarks for the Sock Spy generation and I/O hot paths.
+
+Runs every benchmark against the shipped data/ directory and against a
+synthetic corpus 100x its size (see synthetic_corpus.py), and stores the
+timings as JSON so two commits can be compared:
+
+    python benchmarks/bench_hot_paths.py                       # writes benchmarks/results/<commit>.json
+    python benchmarks/bench_hot_paths.py --corpus shipped -k name
+    python benchmarks/bench_hot_paths.py --compare benchmarks/results/abc1234.json
+
+Only the standard library is used (timeit), so it runs wherever Sock Spy runs.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+import tempfile
+import argparse
+import statistics
+import subprocess
+import contextlib
+import timeit
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from utils import (  # noqa: E402 (needs the repo on sys.path)
+    load_data_file,
+    load_json_file,
+    get_random_hierarchical_item,
+    generate_username_suggestions,
+    generate_random_password,
+    save_profile,
+    export_profile_to_txt,
+)
+from datasets import get_registry  # noqa: E402
+from synthetic_corpus import build_synthetic_corpus, scale_options  # noqa: E402
+
+SHIPPED_DATA_DIR = os.path.join(REPO_DIR, "data")
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmarks", "results")
+SCALE_FACTOR = 100
+REPEAT = 5
+MIN_RUN_TIME = 0.2 # Seconds per repeat; timeit.autorange picks the loop count
+REGRESSION_THRESHOLD = 0.10
+
+
+# ==============================================================================
+# Benchmarks
+# ==============================================================================
+SAMPLE_PROFILE = {
+    "gender": "female", "nationality": "portuguese", "first_name": "Marta Sofia", "last_name": "Duarte",
+    "age": 28, "profession": "Cardiothoracic Surgeon", "location": "Lisbon, Portugal, Europe",
+    "username": "martasofiaduarte", "password": "x7#Qp!2rT9&a", "platforms": ["Twitter", "Reddit"],
+    "interests": ["Python", "Hiking", "Jazz"], "common_phrases": ["No worries!"],
+    "profile_picture": "https://randomuser.me/api/portraits/women/1.jpg",
+}
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Silence the prints of the functions under test."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _benchmarks(data_dir, scratch_dir):
+    """Return {name: zero-argument callable} for one corpus."""
+    from main import SockSpy
+    from generator import PersonaGenerator
+
+    rng = random.Random(1)
+    name_file = os.path.join(data_dir, "names", "male", "american.txt")
+    locations_path = os.path.join(data_dir, "locations.json")
+    locations = load_json_file(locations_path)
+    profiles_dir = os.path.join(scratch_dir, "profiles")
+    exports_dir = os.path.join(scratch_dir, "exports")
+
+    with _quiet():
+        app = SockSpy(seed=1)
+    app.data_dir = data_dir
+    app.name_counts_path = os.path.join(scratch_dir, "name_counts.json")
+    app.datasets = get_registry(data_dir)
+
+    def update_cache_cold():
+        with _quiet():
+            app._update_name_counts_cache(force=True, verbose=False)
+
+    def update_cache_warm():
+        with _quiet():
+            app._update_name_counts_cache(verbose=False)
+
+    registry = get_registry(data_dir)
+
+    def generator_init():
+        registry.clear() # Parse every dataset again, as a fresh process would
+        PersonaGenerator(data_dir, seed=1)
+
+    generator = PersonaGenerator(data_dir, seed=1)
+    update_cache_cold() # Leave a cache behind for the warm run
+
+    return {
+        "load_data_file": lambda: load_data_file(name_file),
+        "load_json_file": lambda: load_json_file(locations_path),
+        "get_random_hierarchical_item": lambda: get_random_hierarchical_item(locations, rng),
+        "generate_username_suggestions": lambda: generate_username_suggestions("Marta Sofia", "Duarte", 28, rng),
+        "generate_random_password": lambda: generate_random_password(12, rng),
+        "save_profile": lambda: save_profile(SAMPLE_PROFILE, "bench_profile", profiles_dir, rng),
+        "export_profile_to_txt": lambda: export_profile_to_txt(SAMPLE_PROFILE, "bench_profile", exports_dir, rng),
+        "update_name_counts_cache_cold": update_cache_cold,
+        "update_name_counts_cache_warm": update_cache_warm,
+        "persona_generator_init": generator_init,
+        "persona_level4": lambda: generator.generate(4),
+    }
+
+
+def _time(func):
+    """Per-call timings (seconds) of ``func`` over REPEAT runs of an autoranged loop."""
+    timer = timeit.Timer(func)
+    loops = 1
+    while True:
+        elapsed = timer.timeit(loops)
+        if elapsed >= MIN_RUN_TIME or loops >= 1_000_000:
+            break
+        loops *= 10 if elapsed < MIN_RUN_TIME / 10 else 2
+    runs = [elapsed / loops] + [timer.timeit(loops) / loops for _ in range(REPEAT - 1)]
+    return {
+        "loops": loops,
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.mean(runs),
+        "stdev": statistics.stdev(runs) if len(runs) > 1 else 0.0,
+    }
+
+
+def run_corpus(label, data_dir, selected=None):
+    """Run every (or every ``selected``) benchmark against ``data_dir``."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="sockspy_bench_") as scratch_dir:
+        for name, func in _benchmarks(data_dir, scratch_dir).items():
+            if selected and not any(s in name for s in selected):
+                continue
+            results[name] = _time(func)
+            print(f"  [{label}] {name:<32} {_format_seconds(results[name]['median']):>10} "
+                  f"(min {_format_seconds(results[name]['min'])}, {results[name]['loops']} loops)")
+    return results
+
+
+# ==============================================================================
+# Reporting
+# ==============================================================================
+def _format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Print median ratios current/baseline per benchmark.
+
+    Returns:
+        list: (corpus, benchmark, ratio) for every slowdown beyond ``threshold``.
+    """
+    regressions = []
+    print(f"\nCompared with {baseline.get('meta', {}).get('commit') or 'baseline'} (median, >1 is slower):")
+    for corpus, results in current["results"].items():
+        for name, stats in results.items():
+            old = baseline.get("results", {}).get(corpus, {}).get(name)
+            if not old:
+                continue
+            ratio = stats["median"] / old["median"] if old["median"] else float("inf")
+            flag = ""
+            if ratio > 1 + threshold:
+                flag = "  <-- slower"
+                regressions.append((corpus, name, ratio))
+            elif ratio < 1 - threshold:
+                flag = "  faster"
+            print(f"  [{corpus}] {name:<32} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Sock Spy hot paths.")
+    parser.add_argument("--corpus", choices=("shipped", "scaled", "both"), default="both")
+    parser.add_argument("--scale", type=int, default=SCALE_FACTOR, help="Size factor of the synthetic corpus.")
+    parser.add_argument("-k", dest="selected", action="append", help="Only run benchmarks whose name contains this.")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>.json).")
+    parser.add_argument("--compare", help="Earlier result file to compare against.")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Relative slowdown reported as a regression (exit status 1).")
+    args = parser.parse_args(argv)
+
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": args.scale,
+        },
+        "results": {},
+    }
+
+    if args.corpus in ("shipped", "both"):
+        report["results"]["shipped"] = run_corpus("shipped", SHIPPED_DATA_DIR, args.selected)
+    if args.corpus in ("scaled", "both"):
+        with tempfile.TemporaryDirectory(prefix="sockspy_corpus_") as corpus_dir:
+            print(f"Building a {args.scale}x synthetic corpus...")
+            build_synthetic_corpus(corpus_dir, source_dir=SHIPPED_DATA_DIR, **scale_options(args.scale))
+            report["results"][f"scaled_{args.scale}x"] = run_corpus(f"{args.scale}x", corpus_dir, args.selected)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        regressions = compare(load_json_file(args.compare) or {}, report, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2025 Kanarath.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+------------------------
+Bulk export of a whole profiles directory.
+
+Every saved profile is converted to the requested per-profile formats (TXT,
+JSON) in a thread or process pool. Exports that are already newer than their
+source profile are left alone, so re-running an export only redoes what
+changed. Dataset formats (Parquet, Arrow) collect all profiles into one file.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from utils import load_json_file, atomic_write_json, export_profile_to_txt, sanitize_filename
+
+PROFILE_FORMATS = ("txt", "json") # One export file per profile
+DATASET_FORMATS = {"parquet": "personas.parquet", "arrow": "personas.arrow"} # One file for the whole directory
+EXPORT_FORMATS = PROFILE_FORMATS + tuple(DATASET_FORMATS)
+
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _is_fresh(target, source_mtime):
+    """True if ``target`` exists and is at least as new as the source."""
+    target_mtime = _mtime_ns(target)
+    return target_mtime is not None and target_mtime >= source_mtime
+
+
+def _export_one(task):
+    """
+    Pool task: export one profile to each requested format.
+
+    Returns:
+        tuple: (files written, files skipped as up to date, failures), where
+        failures is a list of (source path, format, error message).
+    """
+    source, exports_dir, formats, force = task
+    stem = sanitize_filename(os.path.splitext(os.path.basename(source))[0])
+    source_mtime = _mtime_ns(source)
+    if source_mtime is None or not stem:
+        reason = "profile not found" if source_mtime is None else "no usable file name"
+        return 0, 0, [(source, fmt, reason) for fmt in formats]
+
+    pending = [fmt for fmt in formats
+               if force or not _is_fresh(os.path.join(exports_dir, f"{stem}.{fmt}"), source_mtime)]
+    if not pending:
+        return 0, len(formats), []
+
+    profile = load_json_file(source)
+    if not isinstance(profile, dict):
+        return 0, len(formats) - len(pending), [(source, fmt, "not a profile JSON object") for fmt in pending]
+
+    written = 0
+    failures = []
+    for fmt in pending:
+        if fmt == "txt":
+            if export_profile_to_txt(profile, stem, exports_dir) is not None:
+                written += 1
+            else:
+                failures.append((source, fmt, "TXT export failed"))
+        else:
+            try:
+                atomic_write_json(os.path.join(exports_dir, f"{stem}.json"), profile)
+                written += 1
+            except OSError as e:
+                failures.append((source, fmt, str(e)))
+    return written, len(formats) - len(pending), failures
+
+
+def _export_dataset(sources, exports_dir, fmt, force):
+    """
+    Write every profile into one Parquet/Arrow file unless it is newer than all sources.
+
+    Returns (files written, files skipped); errors propagate (a missing pyarrow
+    is a RuntimeError for the caller to report).
+    """
+    target = os.path.join(exports_dir, DATASET_FORMATS[fmt])
+    # The directory mtime also moves when a profile is deleted
+    newest = max([_mtime_ns(os.path.dirname(sources[0])) or 0] + [_mtime_ns(path) or 0 for path in sources])
+    if not force and _is_fresh(target, newest):
+        return 0, 1
+
+    from sinks import ArrowSink, write_personas # Needs pyarrow; only imported when asked for
+
+    profiles = (load_json_file(path) for path in sources)
+    write_personas((p for p in profiles if isinstance(p, dict)), ArrowSink(target, format=fmt))
+    return 1, 0
+
+
+def bulk_export(profiles_dir, exports_dir, formats=PROFILE_FORMATS, workers=None, processes=False, force=False):
+    """
+    Export every profile in ``profiles_dir`` to ``exports_dir``.
+
+    Args:
+        profiles_dir (str): Directory of saved profile JSON files.
+        exports_dir (str): Destination directory (created if missing).
+        formats (iterable): Any of "txt", "json", "parquet", "arrow".
+        workers (int): Pool size (executor default if None).
+        processes (bool): Use a process pool instead of threads.
+        force (bool): Re-export even when an export is up to date.
+
+    Failed exports are reported on stderr as they happen and listed in the result.
+
+    Returns:
+        dict: profiles, written, skipped, failed (count), failures (list of
+        {"profile", "format", "error"} dicts), seconds and profiles_per_second.
+    """
+    unknown = set(formats) - set(EXPORT_FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {', '.join(sorted(unknown))}")
+    start = time.perf_counter()
+
+    sources = []
+    if os.path.isdir(profiles_dir):
+        sources = [os.path.join(profiles_dir, name) for name in sorted(os.listdir(profiles_dir))
+                   if name.endswith(".json")]
+    if not os.path.exists(exports_dir):
+        os.makedirs(exports_dir)
+
+    written = skipped = 0
+    failures = []
+    profile_formats = tuple(fmt for fmt in PROFILE_FORMATS if fmt in formats)
+    if sources and profile_formats:
+        tasks = [(path, exports_dir, profile_formats, force) for path in sources]
+        pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        # Processes get a few large chunks to amortize pickling; threads share memory
+        chunksize = max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1))) if processes else 1
+        with pool(max_workers=workers) as executor:
+            for w, s, f in executor.map(_export_one, tasks, chunksize=chunksize):
+                written += w
+                skipped += s
+                for source, fmt, error in f:
+                    print(f"Error exporting {os.path.basename(source)} to {fmt}: {error}", file=sys.stderr)
+                failures += f
+
+    for fmt in DATASET_FORMATS:
+        if fmt in formats and sources:
+            w, s = _export_dataset(sources, exports_dir, fmt, force)
+            written += w
+            skipped += s
+
+    seconds = time.perf_counter() - start
+    return {
+        "profiles": len(sources),
+        "written": written,
+        "skipped": skipped,
+        "failed": len(failures),
+        "failures": [{"profile": source, "format": fmt, "error": error} for source, fmt, error in failures],
+        "seconds": seconds,
+        "profiles_per_second": len(sources) / seconds if seconds > 0 else 0.0,
+    }
+
+
+def format_summary(summary):
+    """One-line human readable report of a bulk_export() result."""
+    return (f"Exported {summary['written']} file(s) from {summary['profiles']} profile(s) "
+            f"in {summary['seconds']:.2f}s ({summary['profiles_per_second']:.0f} profiles/s); "
+            f"{summary['skipped']} up to date, {summary['failed']} failed.")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Export every saved Sock Spy profile in parallel.")
+    parser.add_argument("--profiles-dir", default=os.path.join(base_dir, "profiles"))
+    parser.add_argument("--exports-dir", default=os.path.join(base_dir, "exports"))
+    parser.add_argument("--format", dest="formats", action="append", choices=EXPORT_FORMATS,
+                        help="Repeat for several formats (default: txt and json).")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--processes", action="store_true", help="Use processes instead of threads.")
+    parser.add_argument("--force", action="store_true", help="Re-export up-to-date profiles too.")
+    args = parser.parse_args()
+
+    result = bulk_export(args.profiles_dir, args.exports_dir, args.formats or PROFILE_FORMATS,
+                         args.workers, args.processes, args.force)
+    print(format_summary(result))
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2025 Kanarath.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+------------------------
+Columnar (NumPy) batch generation for Sock Spy.
+
+A batch of personas is held as integer columns (gender, nationality, name
+indices, age, leaf indices...) drawn with one vectorized call per column.
+Every string table is flattened once up front, so string columns are a single
+fancy-index away and dicts are only built when a batch is serialized.
+
+Follows the level 1-4 rules of generator.PersonaGenerator. Usernames pick
+uniformly among the eight suggestion patterns instead of de-duplicating the
+suggestion list first, and interests are taken from a fixed number of draws
+per persona instead of a retry loop. Needs NumPy (pip install numpy).
+"""
+
+from utils import PASSWORD_CHARACTERS, MissingDependencyError, get_current_year
+from sampling import UNIFORM, BRANCH
+from generator import (
+    PersonaGenerator,
+    RANDOM_PLATFORMS,
+    FALLBACK_NATIONALITY,
+    FALLBACK_FIRST_NAME,
+    FALLBACK_LAST_NAME,
+)
+from datasets import DEFAULT_DATA_DIR
+
+DEFAULT_BATCH_SIZE = 100_000
+
+PASSWORD_LENGTH = 12
+MAX_PLATFORMS = 4
+MAX_INTERESTS = 5
+INTEREST_DRAWS = 3 * MAX_INTERESTS # Candidates per persona, duplicates dropped at serialization
+MAX_PHRASES = 3
+
+# The first eight patterns of utils.generate_username_suggestions (ages are always
+# 18-75, so the age and birth-year patterns are always present) and the range of
+# the random number each one appends.
+USERNAME_NUMBER_RANGES = [None, None, None, None, None, None, (10, 999), (10, 99)]
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise MissingDependencyError("The columnar backend needs NumPy (pip install numpy).")
+    return numpy
+
+
+def _sample_without_replacement(np, rng, population, rows, k):
+    """
+    Return a (rows, k) array of distinct indices in range(population) per row.
+
+    Column j is drawn from the population minus the j earlier picks and then
+    shifted past them, so each row is a uniform ordered sample (like rng.sample).
+    """
+    picks = np.empty((rows, k), dtype=np.int64)
+    for j in range(k):
+        column = rng.integers(0, population - j, rows)
+        previous = np.sort(picks[:, :j], axis=1)
+        for m in range(j):
+            column += column >= previous[:, m]
+        picks[:, j] = column
+    return picks
+
+
+class _LeafTable:
+    """Vectorized sampler and per-leaf display strings for one HierarchyIndex."""
+
+    def __init__(self, np, index, mode):
+        self.size = len(index)
+        self._cumulative = None
+        if mode == BRANCH and self.size:
+            self._cumulative = np.cumsum(index._branch_weights)
+
+        self.leaves = np.array(index.leaves, dtype=object)
+        # Index of the first leaf with the same value (-1 for empty leaves), to spot duplicates
+        first_seen = {}
+        self.canonical = np.array(
+            [first_seen.setdefault(leaf, i) if leaf else -1 for i, leaf in enumerate(index.leaves)],
+            dtype=np.int64,
+        )
+        self.professions = np.array(
+            [leaf if leaf else (path[-1] if path else "Unspecified") for leaf, path in zip(index.leaves, index.paths)],
+            dtype=object,
+        )
+        self.basic_locations = np.array(
+            [", ".join(reversed(path[:2])) or "Earth" for path in index.paths], dtype=object,
+        )
+        self.full_locations = np.array(
+            [", ".join(reversed((path + (leaf,))[:4])) for leaf, path in zip(index.leaves, index.paths)],
+            dtype=object,
+        )
+
+    def sample(self, np, rng, shape):
+        """Leaf indices of the given shape, uniform or branch-weighted."""
+        if self._cumulative is None:
+            return rng.integers(0, self.size, shape)
+        u = rng.random(shape) * self._cumulative[-1]
+        return np.minimum(np.searchsorted(self._cumulative, u, side="right"), self.size - 1)
+
+
+class PersonaBatch:
+    """
+    One generated batch, stored as columns.
+
+    ``columns()`` resolves every string column with a single take per column
+    (the form Arrow/Parquet writers want); ``iter_profiles()`` yields the same
+    persona dicts as PersonaGenerator.generate().
+    """
+
+    def __init__(self, generator, level, data):
+        self._gen = generator
+        self.level = level
+        self.data = data # Raw integer/bool NumPy columns
+
+    def __len__(self):
+        return len(self.data["male"])
+
+    def _usernames(self, first_names, last_names, ages):
+        current_year = get_current_year()
+        usernames = []
+        for fn, ln, age, pattern, number in zip(
+                first_names, last_names, ages,
+                self.data["username_pattern"].tolist(), self.data["username_number"].tolist()):
+            fn = fn.lower().replace(" ", "") or "user"
+            ln = ln.lower().replace(" ", "") or str(number)
+            if pattern == 0: usernames.append(f"{fn}{ln}")
+            elif pattern == 1: usernames.append(f"{fn}_{ln}")
+            elif pattern == 2: usernames.append(f"{fn}{ln[0]}")
+            elif pattern == 3: usernames.append(f"{fn[0]}{ln}")
+            elif pattern == 4: usernames.append(f"{fn}{ln}{age}")
+            elif pattern == 5: usernames.append(f"{fn}{ln}{str(current_year - age)[-2:]}")
+            elif pattern == 6: usernames.append(f"{fn}{ln}{number}")
+            else: usernames.append(f"{fn}_{ln}{number}")
+        return usernames
+
+    @staticmethod
+    def _ragged(table, picks, counts):
+        """Turn a (rows, k) pick matrix plus per-row counts into lists of strings."""
+        return [row[:count] for row, count in zip(table[picks].tolist(), counts.tolist())]
+
+    def _interests(self):
+        """
+        First MAX_INTERESTS distinct interests of each row's draws.
+
+        Rows whose first draws are already distinct (nearly all of them) are
+        resolved in one take; only the others are de-duplicated in Python.
+        """
+        np = self._gen.np
+        table = self._gen.interests
+        draws = self.data["interests"]
+        head = np.sort(table.canonical[draws[:, :MAX_INTERESTS]], axis=1)
+        distinct = (head[:, 0] >= 0) & np.all(head[:, 1:] != head[:, :-1], axis=1)
+        interests = table.leaves[draws[:, :MAX_INTERESTS]].tolist()
+        for row in np.flatnonzero(~distinct).tolist():
+            unique = [v for v in dict.fromkeys(table.leaves[draws[row]].tolist()) if v]
+            interests[row] = unique[:MAX_INTERESTS]
+        return interests
+
+    def columns(self):
+        """
+        Return the batch as {column name: list}, list fields as lists of lists.
+
+        Columns a level doesn't produce are left out; profile_picture is None
+        for rows without a picture.
+        """
+        np = self._gen.np
+        gen = self._gen
+        data = self.data
+        level = self.level
+
+        columns = {
+            "gender": np.where(data["male"], "male", "female").tolist(),
+            "nationality": gen.nationality_names[data["nationality"]].tolist(),
+            "first_name": gen.first_name_table[data["first_name"]].tolist(),
+            "last_name": gen.last_name_table[data["last_name"]].tolist(),
+            "age": data["age"].tolist(),
+            "profession": (gen.professions.professions[data["profession"]].tolist()
+                           if "profession" in data else ["Unspecified"] * len(self)),
+        }
+
+        if level >= 2:
+            if "location" in data:
+                table = gen.locations.full_locations if level >= 3 else gen.locations.basic_locations
+                columns["location"] = table[data["location"]].tolist()
+            else:
+                columns["location"] = ["Earth"] * len(self)
+            columns["username"] = self._usernames(columns["first_name"], columns["last_name"], columns["age"])
+            passwords = gen.password_table[data["password"]].view(f"S{PASSWORD_LENGTH}").ravel()
+            columns["password"] = passwords.astype(f"U{PASSWORD_LENGTH}").tolist()
+
+        if level >= 3:
+            columns["platforms"] = self._ragged(gen.platform_table, data["platforms"], data["platform_count"])
+            if "interests" in data:
+                columns["interests"] = self._interests()
+            else:
+                columns["interests"] = [[] for _ in range(len(self))]
+
+        if level >= 4:
+            if "phrases" in data:
+                columns["common_phrases"] = self._ragged(gen.phrase_table, data["phrases"], data["phrase_count"])
+            else:
+                columns["common_phrases"] = [[] for _ in range(len(self))]
+            columns["profile_picture"] = gen.picture_table[data["picture"]].tolist()
+
+        return columns
+
+    def iter_profiles(self):
+        """Yield one persona dict per row, keys in PersonaGenerator.generate() order."""
+        columns = self.columns()
+        names = list(columns)
+        has_picture = "profile_picture" in columns
+        for values in zip(*(columns[name] for name in names)):
+            profile = dict(zip(names, values))
+            if has_picture and profile["profile_picture"] is None:
+                del profile["profile_picture"]
+            yield profile
+
+
+class ColumnarGenerator:
+    """
+    Vectorized counterpart of PersonaGenerator.
+
+    Datasets are loaded through PersonaGenerator (and so the shared registry),
+    then flattened into NumPy tables once.
+
+    Args:
+        data_dir (str): Directory holding the Sock Spy datasets.
+        seed (int): Optional seed for numpy.random.default_rng.
+        sampling_mode (str): "uniform" or "branch" leaf sampling for hierarchical data.
+    """
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, seed=None, sampling_mode=UNIFORM):
+        np = self.np = _import_numpy()
+        self.rng = np.random.default_rng(seed)
+        self.sampling_mode = sampling_mode
+        base = PersonaGenerator(data_dir, None, sampling_mode)
+
+        self._build_name_tables(base)
+
+        self.professions = _LeafTable(np, base.professions_index, sampling_mode)
+        self.locations = _LeafTable(np, base.locations_index, sampling_mode)
+        self.interests = _LeafTable(np, base.interests_index, sampling_mode)
+
+        self.platform_table = np.array(RANDOM_PLATFORMS, dtype=object)
+        self.phrase_table = np.array(list(base.phrases_data), dtype=object)
+        self.password_table = np.frombuffer(PASSWORD_CHARACTERS.encode("ascii"), dtype="S1")
+
+        male_pictures = list(base.pictures_by_gender["male"])
+        female_pictures = list(base.pictures_by_gender["female"])
+        # Trailing None is the "no picture" entry for a gender without pictures
+        self.picture_table = np.array(male_pictures + female_pictures + [None], dtype=object)
+        self._picture_offsets = np.array([0, len(male_pictures)])
+        self._picture_lengths = np.array([len(male_pictures), len(female_pictures)])
+
+    def _build_name_tables(self, base):
+        """
+        Flatten every name list into one array per kind, with per-nationality offsets.
+
+        A fallback nationality (Alex Smith, as in the interactive generator) is
+        appended with weight zero; it only gets picked when a gender has no names.
+        """
+        np = self.np
+        nationalities = sorted(base.last_names) + [None]
+        self.nationality_names = np.array(nationalities[:-1] + [FALLBACK_NATIONALITY], dtype=object)
+
+        last_lists = [list(base.last_names[nat]) for nat in nationalities[:-1]] + [[FALLBACK_LAST_NAME]]
+        self._last_lengths = np.array([len(names) for names in last_lists])
+        self._last_offsets = np.concatenate(([0], np.cumsum(self._last_lengths)[:-1]))
+        self.last_name_table = np.array([name for names in last_lists for name in names], dtype=object)
+
+        first_table = []
+        self._first_offsets = np.zeros((2, len(nationalities)), dtype=np.int64)
+        self._first_lengths = np.zeros((2, len(nationalities)), dtype=np.int64)
+        self._nationality_cumulative = []
+        for g, gender in enumerate(("male", "female")):
+            weights = []
+            for n, nat in enumerate(nationalities):
+                names = [FALLBACK_FIRST_NAME] if nat is None else list(base.first_names[gender].get(nat, []))
+                self._first_offsets[g, n] = len(first_table)
+                self._first_lengths[g, n] = len(names)
+                first_table.extend(names)
+                weights.append(0 if nat is None else len(names) * self._last_lengths[n])
+            if not any(weights):
+                weights[-1] = 1
+            self._nationality_cumulative.append(np.cumsum(weights, dtype=np.float64))
+        self.first_name_table = np.array(first_table, dtype=object)
+
+    def _draw_nationalities(self, male):
+        """Weighted nationality index per row, one searchsorted per gender."""
+        np = self.np
+        nationality = np.empty(len(male), dtype=np.int64)
+        for g, mask in enumerate((male, ~male)):
+            cumulative = self._nationality_cumulative[g]
+            u = self.rng.random(int(mask.sum())) * cumulative[-1]
+            nationality[mask] = np.minimum(np.searchsorted(cumulative, u, side="right"), len(cumulative) - 1)
+        return nationality
+
+    def generate(self, count, level=4):
+        """Draw a PersonaBatch of ``count`` personas for the given detail level (1-4)."""
+        if not 1 <= level <= 4:
+            raise ValueError(f"level must be between 1 and 4, got {level}")
+        np = self.np
+        rng = self.rng
+        data = {}
+
+        # --- Level 1: Minimal ---
+        male = rng.random(count) < 0.5
+        gender_index = np.where(male, 0, 1)
+        nationality = self._draw_nationalities(male)
+        data["male"] = male
+        data["nationality"] = nationality
+        first_lengths = self._first_lengths[gender_index, nationality]
+        data["first_name"] = (self._first_offsets[gender_index, nationality]
+                              + (rng.random(count) * first_lengths).astype(np.int64))
+        data["last_name"] = (self._last_offsets[nationality]
+                             + (rng.random(count) * self._last_lengths[nationality]).astype(np.int64))
+        data["age"] = rng.integers(18, 76, count)
+        if self.professions.size:
+            data["profession"] = self.professions.sample(np, rng, count)
+
+        # --- Level 2: Standard --- (level 3 replaces the location, so it is drawn once)
+        if level >= 2:
+            if self.locations.size:
+                data["location"] = self.locations.sample(np, rng, count)
+            pattern = rng.integers(0, len(USERNAME_NUMBER_RANGES), count)
+            number = rng.integers(100, 1000, count) # Also the fallback for empty last names
+            for p, bounds in enumerate(USERNAME_NUMBER_RANGES):
+                if bounds:
+                    mask = pattern == p
+                    number[mask] = rng.integers(bounds[0], bounds[1] + 1, int(mask.sum()))
+            data["username_pattern"] = pattern
+            data["username_number"] = number
+            data["password"] = rng.integers(0, len(self.password_table), (count, PASSWORD_LENGTH))
+
+        # --- Level 3: Detailed ---
+        if level >= 3:
+            data["platform_count"] = rng.integers(1, MAX_PLATFORMS + 1, count)
+            data["platforms"] = _sample_without_replacement(np, rng, len(self.platform_table), count, MAX_PLATFORMS)
+            if self.interests.size:
+                data["interests"] = self.interests.sample(np, rng, (count, INTEREST_DRAWS))
+
+        # --- Level 4: Full ---
+        if level >= 4:
+            phrase_total = len(self.phrase_table)
+            if phrase_total:
+                k = min(MAX_PHRASES, phrase_total)
+                data["phrase_count"] = np.minimum(rng.integers(1, MAX_PHRASES + 1, count), phrase_total)
+                data["phrases"] = _sample_without_replacement(np, rng, phrase_total, count, k)
+            picture_lengths = self._picture_lengths[gender_index]
+            picture = self._picture_offsets[gender_index] + (rng.random(count) * picture_lengths).astype(np.int64)
+            data["picture"] = np.where(picture_lengths > 0, picture, len(self.picture_table) - 1)
+
+        return PersonaBatch(self, level, data)
+
+    def iter_batches(self, count, level=4, batch_size=DEFAULT_BATCH_SIZE):
+        """Yield PersonaBatch objects of at most ``batch_size`` rows until ``count`` are made."""
+        for start in range(0, count, batch_size):
+            yield self.generate(min(batch_size, count - start), level)
+
+    def iter_personas(self, count, level=4, batch_size=DEFAULT_BATCH_SIZE):
+        """Yield persona dicts batch by batch (memory bounded by ``batch_size``)."""
+        for batch in self.iter_batches(count, level, batch_size):
+            yield from batch.iter_profiles()
+
+
+def generate_personas_columnar(count, level=4, seed=None, data_dir=DEFAULT_DATA_DIR, sampling_mode=UNIFORM):
+    """
+    Columnar equivalent of generator.generate_personas().
+
+    Returns:
+        list: A list of persona dicts.
+    """
+    generator = ColumnarGenerator(data_dir, seed, sampling_mode)
+    return list(generator.iter_personas(count, level))
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2025 Kanarath.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+------------------------
+Compiled data pack for Sock Spy.
+
+The data/ directory stays the editable source of truth. build_pack() compiles
+every text corpus and JSON tree in it into one versioned file, and DataPack
+reads that file through mmap so a cold start is a single open().
+
+The pack records the size and mtime of every source file it was built from,
+so a reader can tell when data/ has been edited since (see stale_sources()).
+
+Layout (all integers little-endian):
+    header      magic "SSPK", u16 version, u16 flags, u32 entry count,
+                u32 string count, u64 offset table offset, u64 TOC offset,
+                u64 sources offset
+    blob        every distinct string once, UTF-8, back to back
+    offsets     (string count + 1) x u32 offsets into the blob
+    payloads    per dataset, see below
+    TOC         entry count x (u32 name string id, u32 kind, u64 offset, u64 length)
+    sources     u32 count, then count x (u32 name string id, u64 size, u64 mtime_ns)
+
+Payloads:
+    lines       u32 count, then count x u32 string ids
+    tree        recursive nodes: b"D" u32 n (u32 key id, node)*n
+                                 b"L" u32 n (u32 string id)*n
+                                 b"S" u32 string id
+                                 b"J" u32 string id of a JSON-encoded scalar
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+from collections.abc import Sequence
+
+from utils import load_data_file, load_json_file
+
+PACK_MAGIC = b"SSPK"
+PACK_VERSION = 2 # v2 added the source file stats
+DEFAULT_PACK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sockspy_data.pack")
+
+KIND_LINES = 1
+KIND_TREE = 2
+
+_HEADER = struct.Struct("<4sHHIIQQQ")
+_TOC_ENTRY = struct.Struct("<IIQQ")
+_SOURCE_ENTRY = struct.Struct("<IQQ")
+_U32 = struct.Struct("<I")
+
+# Directories under data/ that are not line-based corpora
+_SKIP_DIRS = {"ascii_art"}
+
+
+class DataPackError(Exception):
+    """Raised when a pack file is missing, truncated or of an unknown version."""
+
+
+# ==============================================================================
+# Building
+# ==============================================================================
+class _StringTable:
+    """Interns strings so each distinct value is stored once in the blob."""
+
+    def __init__(self):
+        self.ids = {}
+        self.encoded = []
+
+    def add(self, value):
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = len(self.encoded)
+            self.ids[value] = string_id
+            self.encoded.append(value.encode("utf-8"))
+        return string_id
+
+
+def _encode_tree(node, strings, out):
+    """Append the binary encoding of a JSON node to ``out`` (a bytearray)."""
+    if isinstance(node, dict):
+        out += b"D" + _U32.pack(len(node))
+        for key, value in node.items():
+            out += _U32.pack(strings.add(str(key)))
+            _encode_tree(value, strings, out)
+    elif isinstance(node, list) and all(isinstance(item, str) for item in node):
+        out += b"L" + _U32.pack(len(node))
+        for item in node:
+            out += _U32.pack(strings.add(item))
+    elif isinstance(node, str):
+        out += b"S" + _U32.pack(strings.add(node))
+    else:
+        # Mixed lists, numbers, booleans, null: rare in our data, keep them as JSON text
+        out += b"J" + _U32.pack(strings.add(json.dumps(node, ensure_ascii=False)))
+
+
+def _collect_sources(data_dir):
+    """Return sorted (dataset name, absolute path) pairs to compile."""
+    sources = []
+    for root, dirs, files in os.walk(data_dir):
+        dirs[:] = sorted(d for d in dirs if d not in _SKIP_DIRS)
+        for filename in sorted(files):
+            if not filename.endswith((".txt", ".json")):
+                continue
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, data_dir).replace(os.sep, "/")
+            if filename.endswith(".json") and "/" in name:
+                continue # Only top-level JSON files are datasets
+            sources.append((name, path))
+    return sources
+
+
+def build_pack(data_dir, pack_path=DEFAULT_PACK_PATH):
+    """
+    Compile every text corpus and top-level JSON tree in ``data_dir`` into one pack.
+
+    Text files are stored the way utils.load_data_file reads them (stripped,
+    blank lines dropped). The pack is written to a temporary file and then
+    renamed into place.
+
+    Returns:
+        dict: Summary with entry, string and byte counts.
+    """
+    strings = _StringTable()
+    payloads = [] # (name id, kind, bytes)
+    sources = [] # (name id, size, mtime_ns)
+
+    for name, path in _collect_sources(data_dir):
+        name_id = strings.add(name)
+        st = os.stat(path) # Before reading, so an edit made meanwhile shows up as stale
+        sources.append((name_id, st.st_size, st.st_mtime_ns))
+        if name.endswith(".json"):
+            out = bytearray()
+            _encode_tree(load_json_file(path), strings, out)
+            payloads.append((name_id, KIND_TREE, bytes(out)))
+        else:
+            lines = load_data_file(path) or []
+            out = bytearray(_U32.pack(len(lines)))
+            for line in lines:
+                out += _U32.pack(strings.add(line))
+            payloads.append((name_id, KIND_LINES, bytes(out)))
+
+    blob = b"".join(strings.encoded)
+    offsets = [0]
+    for encoded in strings.encoded:
+        offsets.append(offsets[-1] + len(encoded))
+
+    blob_offset = _HEADER.size
+    offsets_offset = blob_offset + len(blob)
+    offsets_offset += -offsets_offset % 4 # u32-align the offset table for zero-copy casts
+    position = offsets_offset + 4 * len(offsets)
+    toc = []
+    for name_id, kind, payload in payloads:
+        position += -position % 4
+        toc.append((name_id, kind, position, len(payload)))
+        position += len(payload)
+    toc_offset = position + (-position % 8)
+    sources_offset = toc_offset + _TOC_ENTRY.size * len(toc)
+
+    tmp_path = f"{pack_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(PACK_MAGIC, PACK_VERSION, 0, len(toc), len(strings.encoded),
+                                 offsets_offset, toc_offset, sources_offset))
+            f.write(blob)
+            f.write(b"\0" * (offsets_offset - f.tell()))
+            f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+            for (_, _, payload), (_, _, offset, _) in zip(payloads, toc):
+                f.write(b"\0" * (offset - f.tell()))
+                f.write(payload)
+            f.write(b"\0" * (toc_offset - f.tell()))
+            for entry in toc:
+                f.write(_TOC_ENTRY.pack(*entry))
+            f.write(_U32.pack(len(sources)))
+            for source in sources:
+                f.write(_SOURCE_ENTRY.pack(*source))
+        os.replace(tmp_path, pack_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return {
+        "entries": len(toc),
+        "strings": len(strings.encoded),
+        "bytes": os.path.getsize(pack_path),
+    }
+
+
+# ==============================================================================
+# Reading
+# ==============================================================================
+class PackedStrings(Sequence):
+    """
+    Read-only list of strings backed by the pack's mmap.
+
+    Indexing decodes a single string; nothing else is copied. Compares equal
+    to a list with the same items so existing ``== FILE_EMPTY`` checks work.
+    """
+
+    __slots__ = ("_pack", "_ids")
+
+    def __init__(self, pack, ids):
+        self._pack = pack
+        self._ids = ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._pack.string(i) for i in self._ids[index]]
+        return self._pack.string(self._ids[index])
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, PackedStrings)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"PackedStrings({len(self)} items)"
+
+
+class DataPack:
+    """Memory-mapped reader for a pack produced by build_pack()."""
+
+    def __init__(self, pack_path=DEFAULT_PACK_PATH):
+        self.path = pack_path
+        try:
+            with open(pack_path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise DataPackError(f"Could not open data pack {pack_path}: {e}") from e
+
+        if len(self._mmap) < _HEADER.size:
+            raise DataPackError(f"Data pack {pack_path} is truncated.")
+        magic, version = struct.unpack_from("<4sH", self._mmap, 0)
+        if magic != PACK_MAGIC:
+            raise DataPackError(f"{pack_path} is not a Sock Spy data pack.")
+        if version != PACK_VERSION:
+            raise DataPackError(f"Data pack {pack_path} has version {version}, expected {PACK_VERSION}. Rebuild it.")
+        _, _, _, n_entries, n_strings, offsets_offset, toc_offset, sources_offset = _HEADER.unpack_from(self._mmap, 0)
+
+        self._view = memoryview(self._mmap)
+        self._blob_offset = _HEADER.size
+        self._offsets = self._u32_array(offsets_offset, n_strings + 1)
+
+        self._entries = {}
+        for i in range(n_entries):
+            name_id, kind, offset, length = _TOC_ENTRY.unpack_from(self._mmap, toc_offset + i * _TOC_ENTRY.size)
+            self._entries[self.string(name_id)] = (kind, offset, length)
+
+        self.sources = {} # Dataset name -> (size, mtime_ns) of the file it was built from
+        n_sources = _U32.unpack_from(self._mmap, sources_offset)[0]
+        for i in range(n_sources):
+            name_id, size, mtime_ns = _SOURCE_ENTRY.unpack_from(self._mmap, sources_offset + 4 + i * _SOURCE_ENTRY.size)
+            self.sources[self.string(name_id)] = (size, mtime_ns)
+
+    def _u32_array(self, offset, count):
+        """Zero-copy view of ``count`` little-endian u32 values at ``offset``."""
+        raw = self._view[offset:offset + 4 * count]
+        if sys.byteorder == "little":
+            return raw.cast("I")
+        return struct.unpack(f"<{count}I", raw) # Big-endian hosts pay for one copy
+
+    def string(self, string_id):
+        """Decode string ``string_id`` straight from the blob."""
+        start = self._blob_offset + self._offsets[string_id]
+        end = self._blob_offset + self._offsets[string_id + 1]
+        return str(self._view[start:end], "utf-8")
+
+    @staticmethod
+    def _key(name):
+        return name.replace(os.sep, "/")
+
+    def __contains__(self, name):
+        return self._key(name) in self._entries
+
+    def names(self):
+        """All dataset names stored in the pack."""
+        return list(self._entries)
+
+    def is_current(self, name, path):
+        """True if the file at ``path`` still has the size and mtime dataset ``name`` was built from."""
+        recorded = self.sources.get(self._key(name))
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        return recorded == (st.st_size, st.st_mtime_ns)
+
+    def stale_sources(self, data_dir):
+        """
+        Names of datasets that changed in ``data_dir`` since the pack was built.
+
+        Covers edited, deleted and newly added files (one stat per source file).
+        """
+        stale = []
+        current = _collect_sources(data_dir)
+        for name, path in current:
+            if not self.is_current(name, path):
+                stale.append(name)
+        found = {name for name, _ in current}
+        stale += sorted(name for name in self.sources if name not in found)
+        return stale
+
+    def lines(self, name):
+        """Return a text corpus as PackedStrings, or None if the pack doesn't have it."""
+        entry = self._entries.get(self._key(name))
+        if entry is None or entry[0] != KIND_LINES:
+            return None
+        _, offset, _ = entry
+        count = _U32.unpack_from(self._mmap, offset)[0]
+        return PackedStrings(self, self._u32_array(offset + 4, count))
+
+    def tree(self, name):
+        """Decode a JSON tree into dicts/lists, or None if the pack doesn't have it."""
+        entry = self._entries.get(self._key(name))
+        if entry is None or entry[0] != KIND_TREE:
+            return None
+        node, _ = self._decode_node(entry[1])
+        return node
+
+    def _decode_node(self, offset):
+        """Decode one tree node at ``offset``; returns (value, next offset)."""
+        tag = self._mmap[offset:offset + 1]
+        value = _U32.unpack_from(self._mmap, offset + 1)[0]
+        offset += 5
+        if tag == b"D":
+            node = {}
+            for _ in range(value):
+                key = self.string(_U32.unpack_from(self._mmap, offset)[0])
+                node[key], offset = self._decode_node(offset + 4)
+            return node, offset
+        if tag == b"L":
+            ids = self._u32_array(offset, value)
+            return [self.string(i) for i in ids], offset + 4 * value
+        if tag == b"S":
+            return self.string(value), offset
+        return json.loads(self.string(value)), offset
+
+    def close(self):
+        """Release the mapping (left to the GC if PackedStrings views are still alive)."""
+        self._offsets = None
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            pass
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile the Sock Spy data directory into a single pack file.")
+    parser.add_argument("--data-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+    parser.add_argument("--output", default=DEFAULT_PACK_PATH)
+    args = parser.parse_args()
+
+    summary = build_pack(args.data_dir, args.output)
+    print(f"Data pack written to {args.output}: {summary['entries']} datasets, "
+          f"{summary['strings']} unique strings, {summary['bytes']} bytes.")
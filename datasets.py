@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2025 Kanarath.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+------------------------
+Process-wide dataset registry for Sock Spy.
+
+Every data file is read and parsed at most once per process and then served
+from memory. Callers share the returned objects, so they must not mutate them
+(copy first, e.g. with sorted() or list()).
+
+If a compiled data pack is attached (see datapack.py), datasets are served
+from it instead of the individual files. Set SOCKSPY_DATA_PACK to a pack path
+to attach one to the default registry. A pack older than the files in the data
+directory is not attached, and invalidate() stops serving a dataset from the
+pack once its file has changed.
+"""
+
+import os
+import sys
+
+from utils import load_data_file, load_json_file
+from sampling import HierarchyIndex
+from text_index import TextIndex
+from instrumentation import METRICS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA_DIR = os.path.join(BASE_DIR, "data")
+NAME_COUNTS_PATH = os.path.join(BASE_DIR, "name_counts.json")
+
+# Layout version of name_counts.json (v1 was a flat {nationality: counts} dict)
+NAME_COUNTS_CACHE_VERSION = 2
+
+
+class DatasetRegistry:
+    """Lazily loads datasets under a data directory and caches them in memory."""
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, pack=None):
+        self.data_dir = data_dir
+        self.pack = pack # Optional datapack.DataPack
+        self._pack_bypass = set() # Datasets whose file changed after the pack was built
+        self._cache = {}
+        self._indexes = {} # Derived HierarchyIndex objects, keyed by dataset name
+        self._text_indexes = {} # Derived TextIndex objects, keyed by dataset name
+
+    def attach_pack(self, pack):
+        """
+        Serve datasets from a DataPack (or None to go back to plain files).
+
+        A pack that no longer matches the data directory is closed instead,
+        with a warning on stderr. Returns True if the pack was attached.
+        """
+        if pack is not None:
+            stale = pack.stale_sources(self.data_dir)
+            if stale:
+                print(f"Warning: Data pack {pack.path} is out of date ({len(stale)} changed file(s), e.g. {stale[0]}). "
+                      f"Falling back to data files; rebuild it with 'main.py rebuild-cache --pack'.", file=sys.stderr)
+                pack.close()
+                pack = None
+        self.pack = pack
+        self._pack_bypass.clear()
+        self.clear()
+        return pack is not None
+
+    def _path(self, name):
+        """Absolute path of a dataset given relative to the data directory."""
+        return os.path.join(self.data_dir, name)
+
+    def load_json(self, name):
+        """
+        Return the parsed JSON dataset ``name`` (e.g. "locations.json").
+
+        Loaded on first use; later calls return the cached object.
+        """
+        try:
+            data = self._cache[name]
+            METRICS.count("cache_hits", cache="datasets")
+            return data
+        except KeyError:
+            METRICS.count("cache_misses", cache="datasets")
+            with METRICS.stage("data_load"):
+                data = None
+                if self.pack is not None and name in self.pack and name not in self._pack_bypass:
+                    data = self.pack.tree(name)
+                if data is None:
+                    data = load_json_file(self._path(name))
+            self._cache[name] = data
+            return data
+
+    def load_lines(self, name):
+        """
+        Return the line-based dataset ``name`` (e.g. "names/male/moroccan.txt").
+
+        Same contract as utils.load_data_file, but read from disk only once.
+        """
+        try:
+            lines = self._cache[name]
+            METRICS.count("cache_hits", cache="datasets")
+            return lines
+        except KeyError:
+            METRICS.count("cache_misses", cache="datasets")
+            with METRICS.stage("data_load"):
+                lines = None
+                if self.pack is not None and name in self.pack and name not in self._pack_bypass:
+                    lines = self.pack.lines(name) # Zero-copy PackedStrings
+                if lines is None:
+                    lines = load_data_file(self._path(name))
+            self._cache[name] = lines
+            return lines
+
+    def load_hierarchy(self, name):
+        """
+        Return a HierarchyIndex over the hierarchical JSON dataset ``name``.
+
+        Built once from the cached JSON and dropped together with it on invalidate().
+        """
+        index = self._indexes.get(name)
+        if index is None:
+            data = self.load_json(name)
+            index = HierarchyIndex(data if isinstance(data, dict) else {})
+            self._indexes[name] = index
+        return index
+
+    def load_text_index(self, name):
+        """
+        Return a TextIndex (type-ahead search) over the line-based dataset ``name``.
+
+        Built once from the cached lines and dropped together with them on invalidate().
+        """
+        index = self._text_indexes.get(name)
+        if index is None:
+            index = TextIndex(self.load_lines(name) or []) # Missing or empty file: empty index
+            self._text_indexes[name] = index
+        return index
+
+    def is_loaded(self, name):
+        """True if ``name`` is currently held in memory."""
+        return name in self._cache
+
+    def invalidate(self, name):
+        """Drop a single dataset so the next access re-reads it from disk."""
+        if self.pack is not None and name in self.pack and not self.pack.is_current(name, self._path(name)):
+            self._pack_bypass.add(name) # Edited since the pack was built: read the file from now on
+        self._cache.pop(name, None)
+        self._indexes.pop(name, None)
+        self._text_indexes.pop(name, None)
+
+    def clear(self):
+        """Drop every cached dataset."""
+        self._cache.clear()
+        self._indexes.clear()
+        self._text_indexes.clear()
+
+
+_registries = {}
+
+def get_registry(data_dir=DEFAULT_DATA_DIR):
+    """Return the shared DatasetRegistry for ``data_dir`` (one per process)."""
+    key = os.path.abspath(data_dir)
+    registry = _registries.get(key)
+    if registry is None:
+        registry = DatasetRegistry(key)
+        pack_path = os.environ.get("SOCKSPY_DATA_PACK")
+        if pack_path and key == os.path.abspath(DEFAULT_DATA_DIR):
+            # Imported here so plain-file users never touch mmap/struct
+            from datapack import DataPack, DataPackError
+            try:
+                registry.attach_pack(DataPack(pack_path))
+            except DataPackError as e:
+                print(f"Warning: {e} Falling back to data files.", file=sys.stderr)
+        _registries[key] = registry
+    return registry
+
+
+def load_name_counts(cache_path=NAME_COUNTS_PATH):
+    """
+    Return the per-nationality name counts from the name counts cache.
+
+    Understands both the current cache layout ({"version": 2, "counts", "files"})
+    and the older flat {nationality: counts} layout. Returns {} if unavailable.
+    """
+    cache = load_json_file(cache_path) if os.path.exists(cache_path) else {}
+    if not isinstance(cache, dict):
+        return {}
+    if cache.get("version") == NAME_COUNTS_CACHE_VERSION:
+        return cache.get("counts", {})
+    return cache # Legacy layout: counts at top level
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2025 Kanarath.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+------------------------
+Headless batch persona generation for Sock Spy.
+
+Mirrors the level 1-4 rules of SockSpy.create_random_persona() without any
+prompts, prints or pauses, so labs can produce thousands of personas per run.
+"""
+
+import os
+import sys
+import json
+import random
+
+from utils import (
+    PASSWORD_CHARACTERS,
+    get_current_year,
+)
+from datasets import DEFAULT_DATA_DIR, get_registry, load_name_counts
+from sampling import UNIFORM, NationalitySampler
+from instrumentation import METRICS
+
+RANDOM_PLATFORMS = [
+    "Twitter", "Facebook", "Instagram", "Reddit", "LinkedIn", "TikTok",
+    "Pinterest", "YouTube", "Discord", "Telegram", "Snapchat", "Mastodon", "Bluesky"
+]
+
+# Same fallbacks as SockSpy.create_random_persona()
+FALLBACK_NATIONALITY = "american"
+FALLBACK_FIRST_NAME = "Alex"
+FALLBACK_LAST_NAME = "Smith"
+
+
+class PersonaGenerator:
+    """Builds random personas from datasets loaded once at construction."""
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, seed=None, sampling_mode=UNIFORM, name_counts=None):
+        """
+        Fetch every dataset needed for levels 1-4 and seed a private RNG.
+
+        ``sampling_mode`` controls hierarchical picks (professions, locations,
+        interests): "uniform" over all leaves, or "branch" to reproduce the
+        per-level choice of the interactive generator.
+        ``name_counts`` defaults to name_counts.json for the bundled data
+        directory; other directories are counted on the fly.
+        """
+        self.data_dir = data_dir
+        self.rng = random.Random(seed)
+        self.sampling_mode = sampling_mode
+
+        self.datasets = get_registry(data_dir)
+        if name_counts is None and os.path.abspath(data_dir) == os.path.abspath(DEFAULT_DATA_DIR):
+            name_counts = load_name_counts()
+
+        self.nationalities_data = self.datasets.load_json("nationalities.json")
+        self.phrases_data = self.datasets.load_lines(os.path.join("common_phrases", "english.txt")) or []
+        pictures = self.datasets.load_lines("profile_pictures.txt") or []
+        self.pictures_by_gender = {
+            "male": [p for p in pictures if "/men/" in p.lower()] or pictures,
+            "female": [p for p in pictures if "/women/" in p.lower()] or pictures,
+        }
+
+        self.professions_index = self.datasets.load_hierarchy("professions.json")
+        self.locations_index = self.datasets.load_hierarchy("locations.json")
+        self.interests_index = self.datasets.load_hierarchy("interests.json")
+
+        self._load_name_lists(name_counts)
+        self._current_year = get_current_year()
+
+    def _count_names(self):
+        """Count every name file listed in nationalities.json (used when no counts cache applies)."""
+        name_counts = {}
+        for nationality_list in (self.nationalities_data or {}).values():
+            for nationality in nationality_list:
+                nat_key = nationality.lower()
+                name_counts[nat_key] = {
+                    "male": len(self.datasets.load_lines(os.path.join("names", "male", f"{nat_key}.txt")) or []),
+                    "female": len(self.datasets.load_lines(os.path.join("names", "female", f"{nat_key}.txt")) or []),
+                    "last": len(self.datasets.load_lines(os.path.join("last_names", f"{nat_key}.txt")) or []),
+                }
+        return name_counts
+
+    def _load_name_lists(self, name_counts):
+        """
+        Load the name lists of nationalities that have names, and build the sampler.
+
+        ``name_counts`` (name_counts.json layout) decides which files are worth
+        opening at all. The sampler is then built from the lists actually loaded,
+        so a stale cache can never lead to an empty pick.
+        """
+        if not name_counts:
+            name_counts = self._count_names()
+
+        self.last_names = {}
+        self.first_names = {"male": {}, "female": {}}
+        loaded_counts = {}
+        for nat_key, counts in name_counts.items():
+            if not counts.get("last") or not (counts.get("male") or counts.get("female")):
+                continue
+            last_list = self.datasets.load_lines(os.path.join("last_names", f"{nat_key}.txt")) or []
+            loaded_counts[nat_key] = {"last": len(last_list)}
+            self.last_names[nat_key] = last_list
+            for gender in ("male", "female"):
+                names_list = []
+                if counts.get(gender):
+                    names_list = self.datasets.load_lines(os.path.join("names", gender, f"{nat_key}.txt")) or []
+                self.first_names[gender][nat_key] = names_list
+                loaded_counts[nat_key][gender] = len(names_list)
+
+        self.nationality_sampler = NationalitySampler(loaded_counts)
+
+    def _choice(self, seq):
+        """random.choice() without the _randbelow overhead (hot path)."""
+        return seq[int(self.rng.random() * len(seq))]
+
+    def _username(self, first_name, last_name, age):
+        """
+        One of the first eight utils.generate_username_suggestions() patterns, picked uniformly.
+
+        Only the chosen pattern is built and only its number is drawn (as the
+        columnar backend does), instead of all ten candidates per persona.
+        """
+        random_float = self.rng.random
+        fn = first_name.lower().replace(" ", "") or "user"
+        ln = last_name.lower().replace(" ", "") or str(100 + int(random_float() * 900))
+        pattern = int(random_float() * 8)
+        if pattern == 0: return f"{fn}{ln}"
+        if pattern == 1: return f"{fn}_{ln}"
+        if pattern == 2: return f"{fn}{ln[0]}"
+        if pattern == 3: return f"{fn[0]}{ln}"
+        if pattern == 4: return f"{fn}{ln}{age}"
+        if pattern == 5: return f"{fn}{ln}{str(self._current_year - age)[-2:]}"
+        if pattern == 6: return f"{fn}{ln}{10 + int(random_float() * 990)}"
+        return f"{fn}_{ln}{10 + int(random_float() * 90)}"
+
+    def _pick_nationality_and_names(self, gender):
+        """Pick a nationality weighted by name corpus size, plus matching names."""
+        choice = self._choice
+        with METRICS.stage("nationality_sampling"):
+            nationality = self.nationality_sampler.sample(gender, self.rng)
+        if nationality is None:
+            return FALLBACK_NATIONALITY, FALLBACK_FIRST_NAME, FALLBACK_LAST_NAME
+        with METRICS.stage("name_lookup"):
+            first_name = choice(self.first_names[gender][nationality])
+            last_name = choice(self.last_names[nationality])
+        return nationality, first_name, last_name
+
+    def generate(self, level=4):
+        """Return one random persona dict for the given detail level (1-4)."""
+        if not 1 <= level <= 4:
+            raise ValueError(f"level must be between 1 and 4, got {level}")
+        rng = self.rng
+        random_float = rng.random
+        mode = self.sampling_mode
+        profile = {}
+
+        # --- Level 1: Minimal ---
+        gender = "male" if random_float() < 0.5 else "female"
+        profile["gender"] = gender
+        nationality, first_name, last_name = self._pick_nationality_and_names(gender)
+        profile["nationality"] = nationality
+        profile["first_name"] = first_name
+        profile["last_name"] = last_name
+        profile["age"] = 18 + int(random_float() * 58) # 18-75 inclusive
+
+        selected_profession = "Unspecified"
+        if self.professions_index:
+            item, path = self.professions_index.sample(rng, mode)
+            selected_profession = item if item else (path[-1] if path else "Unspecified")
+        profile["profession"] = selected_profession
+
+        # --- Level 2: Standard ---
+        if level >= 2:
+            basic_location = "Earth"
+            if self.locations_index:
+                _, path = self.locations_index.sample(rng, mode)
+                parts = path[:2]
+                if parts: basic_location = ", ".join(reversed(parts))
+            profile["location"] = basic_location
+
+            with METRICS.stage("username_password"):
+                profile["username"] = self._username(first_name, last_name, profile["age"])
+                profile["password"] = "".join(rng.choices(PASSWORD_CHARACTERS, k=12)) # utils.generate_random_password(12)
+
+        # --- Level 3: Detailed ---
+        if level >= 3:
+            if self.locations_index:
+                item, path = self.locations_index.sample(rng, mode)
+                parts = (path + (item,))[:4]
+                if parts: profile["location"] = ", ".join(reversed(parts))
+
+            profile["platforms"] = rng.sample(RANDOM_PLATFORMS, 1 + int(random_float() * 4)) # 1-4
+
+            max_interests_to_add = 5
+            selected_interests = {} # Insertion-ordered set, as in OrderedSelection
+            if self.interests_index:
+                max_attempts_per_interest = 15
+                interests_index = self.interests_index
+                for _ in range(max_attempts_per_interest * max_interests_to_add):
+                    item = interests_index.sample(rng, mode)[0]
+                    if item:
+                        selected_interests[item] = None
+                        if len(selected_interests) >= max_interests_to_add:
+                            break
+            profile["interests"] = list(selected_interests)
+
+        # --- Level 4: Full ---
+        if level >= 4:
+            selected_phrases = []
+            if self.phrases_data:
+                num_phrases = min(1 + int(random_float() * 3), len(self.phrases_data)) # 1-3
+                selected_phrases = rng.sample(self.phrases_data, num_phrases)
+            profile["common_phrases"] = selected_phrases
+
+            pictures = self.pictures_by_gender[gender]
+            if pictures:
+                profile["profile_picture"] = rng.choice(pictures)
+
+        return profile
+
+    def iter_personas(self, count, level=4):
+        """Iterate over ``count`` personas built one at a time (constant memory)."""
+        if not 1 <= level <= 4: # Checked here so a bad level fails at the call, not at the first next()
+            raise ValueError(f"level must be between 1 and 4, got {level}")
+        generate = self.generate
+        return (generate(level) for _ in range(count))
+
+
+def generate_personas(count, level=4, seed=None, data_dir=DEFAULT_DATA_DIR, sampling_mode=UNIFORM):
+    """
+    Generate ``count`` random personas without any user interaction.
+
+    Args:
+        count (int): Number of personas to build.
+        level (int): Detail level, 1 (Minimal) to 4 (Full), as in the interactive menu.
+        seed: Optional seed; the same seed always yields the same personas.
+        data_dir (str): Directory holding the Sock Spy datasets.
+        sampling_mode (str): "uniform" or "branch" leaf sampling for hierarchical data.
+
+    Returns:
+        list: A list of persona dicts.
+    """
+    generator = PersonaGenerator(data_dir, seed, sampling_mode)
+    return list(generator.iter_personas(count, level))
+
+
+# ==============================================================================
+# Parallel generation
+# ==============================================================================
+DEFAULT_CHUNK_SIZE = 2000
+
+# Per-process generator, created once by _init_worker() in each pool worker
+_worker_generator = None
+
+
+def chunk_seed(master_seed, chunk_index):
+    """
+    Seed for one chunk of a parallel run, derived from the master seed.
+
+    String seeds go through SHA-512 in random.seed(), so this is stable across
+    processes and platforms (unlike hash()).
+    """
+    return f"sockspy:{master_seed}:{chunk_index}"
+
+
+def _init_worker(data_dir, sampling_mode):
+    """Pool initializer: load the datasets once per worker process."""
+    global _worker_generator
+    _worker_generator = PersonaGenerator(data_dir, None, sampling_mode)
+
+
+def _generate_chunk(task):
+    """Pool task: build one chunk of personas from its own derived seed."""
+    seed, count, level = task
+    _worker_generator.rng.seed(seed)
+    return list(_worker_generator.iter_personas(count, level))
+
+
+def iter_personas_parallel(count, level=4, seed=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                           data_dir=DEFAULT_DATA_DIR, sampling_mode=UNIFORM):
+    """
+    Generate personas across a ProcessPoolExecutor and yield them in order.
+
+    The batch is cut into fixed-size chunks; chunk ``i`` is always generated
+    from chunk_seed(seed, i). Output therefore depends only on ``seed`` and
+    ``chunk_size`` (not on scheduling or the worker count), so a seeded run is
+    byte-identical every time. It does differ from the single-process
+    generate_personas() stream for the same seed.
+
+    At most two chunks per worker are in flight, keeping memory bounded.
+    """
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    if not 1 <= level <= 4:
+        raise ValueError(f"level must be between 1 and 4, got {level}")
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    workers = workers or os.cpu_count() or 1
+
+    tasks = []
+    for chunk_index, start in enumerate(range(0, count, chunk_size)):
+        tasks.append((chunk_seed(seed, chunk_index), min(chunk_size, count - start), level))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(data_dir, sampling_mode)) as executor:
+        pending = deque()
+        task_iter = iter(tasks)
+        for task in task_iter:
+            pending.append(executor.submit(_generate_chunk, task))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            chunk = pending.popleft().result()
+            next_task = next(task_iter, None)
+            if next_task is not None:
+                pending.append(executor.submit(_generate_chunk, next_task))
+            yield from chunk
+
+
+def generate_personas_parallel(count, level=4, seed=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                               data_dir=DEFAULT_DATA_DIR, sampling_mode=UNIFORM):
+    """List version of iter_personas_parallel()."""
+    return list(iter_personas_parallel(count, level, seed, workers, chunk_size, data_dir, sampling_mode))
+
+
+def save_personas(personas, filepath):
+    """Write a batch of personas to a single JSON file in one write."""
+    try:
+        directory = os.path.dirname(filepath)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        personas = list(personas) # Generation happens here for lazy iterables, outside the timed stage
+        with METRICS.stage("serialization"):
+            text = json.dumps(personas, ensure_ascii=False, separators=(",", ":"))
+        METRICS.count("file_opens", kind="write")
+        with METRICS.stage("file_write"), open(filepath, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return filepath
+    except Exception as e:
+        print(f"Error saving personas to {filepath}: {e}", file=sys.stderr)
+        return None
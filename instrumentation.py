@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2025 Kanarath.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+------------------------
+Opt-in hot-path instrumentation: per-stage timings and counters.
+
+Off by default; when off, every hook is a single attribute check. Turn it on
+with the --metrics [PATH] option of main.py or the SOCKSPY_METRICS variable
+(1 for the summary table only, or a file path). At exit a summary table goes
+to stderr and, if a path was given, the metrics are written to it: JSON for a
+.json file, Prometheus text exposition format for anything else (.prom).
+
+Stage times are inclusive wall-clock time, so a data load triggered inside a
+name lookup counts towards both. Worker processes keep their own metrics,
+which are not merged into the parent's.
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+
+# Stages in pipeline order (the summary table lists them first)
+STAGES = ("data_load", "nationality_sampling", "name_lookup", "username_password", "serialization", "file_write")
+
+METRICS_ENV_VAR = "SOCKSPY_METRICS"
+_ENV_ON_VALUES = ("1", "true", "yes", "on")
+
+
+class _NullStage:
+    """Shared do-nothing context manager returned while instrumentation is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """
+    Stage timings and counters of one process.
+
+    Use the shared METRICS instance:
+
+        with METRICS.stage("file_write"):
+            ...
+        METRICS.count("cache_hits", cache="datasets")
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.output_path = None
+        self._lock = threading.Lock()
+        self._exit_hook = False
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        self.started = time.perf_counter()
+        self.stages = {} # name -> [calls, total seconds, max seconds]
+        self.counters = {} # (name, ((label, value), ...)) -> count
+
+    def enable(self, output_path=None, report_at_exit=True):
+        """
+        Start recording.
+
+        Args:
+            output_path (str): Metrics file written at exit (JSON if it ends in .json, else Prometheus text).
+            report_at_exit (bool): Print the summary table to stderr and write ``output_path`` at exit.
+        """
+        self.enabled = True
+        self.output_path = output_path or self.output_path
+        self.reset()
+        if report_at_exit and not self._exit_hook:
+            atexit.register(self._report_at_exit)
+            self._exit_hook = True
+
+    def disable(self):
+        self.enabled = False
+
+    def stage(self, name):
+        """Context manager timing one pass through stage ``name``."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def record(self, name, seconds):
+        """Add one timed pass of stage ``name``."""
+        with self._lock:
+            entry = self.stages.get(name)
+            if entry is None:
+                self.stages[name] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                if seconds > entry[2]:
+                    entry[2] = seconds
+
+    def count(self, name, n=1, **labels):
+        """Increment counter ``name`` (e.g. "file_opens"), optionally split by labels."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    # --------------------------------------------------------------------------
+    # Output
+    # --------------------------------------------------------------------------
+    def _ordered_stages(self):
+        names = [name for name in STAGES if name in self.stages]
+        return names + sorted(name for name in self.stages if name not in STAGES)
+
+    def snapshot(self):
+        """Everything recorded so far as a JSON-serializable dict."""
+        with self._lock:
+            stages = {}
+            for name in self._ordered_stages():
+                calls, total, longest = self.stages[name]
+                stages[name] = {"calls": calls, "seconds": total, "mean_seconds": total / calls, "max_seconds": longest}
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self.counters.items())]
+        return {
+            "pid": os.getpid(),
+            "wall_seconds": time.perf_counter() - self.started,
+            "stages": stages,
+            "counters": counters,
+        }
+
+    def summary_table(self):
+        """Human readable table of stages and counters."""
+        data = self.snapshot()
+        lines = [f"Metrics ({data['wall_seconds']:.3f}s wall clock):",
+                 f"  {'stage':<22} {'calls':>9} {'total ms':>11} {'mean us':>10} {'max ms':>9}"]
+        for name, stage in data["stages"].items():
+            lines.append(f"  {name:<22} {stage['calls']:>9} {1000 * stage['seconds']:>11.2f} "
+                         f"{1e6 * stage['mean_seconds']:>10.1f} {1000 * stage['max_seconds']:>9.2f}")
+        if not data["stages"]:
+            lines.append("  (no stage recorded)")
+        if data["counters"]:
+            lines.append(f"  {'counter':<38} {'value':>9}")
+            for counter in data["counters"]:
+                label = counter["name"] + "".join(f" {k}={v}" for k, v in counter["labels"].items())
+                lines.append(f"  {label:<38} {counter['value']:>9}")
+        return "\n".join(lines)
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (counters get the conventional _total suffix)."""
+        data = self.snapshot()
+        lines = [
+            "# HELP sockspy_stage_seconds_total Wall-clock time spent in each stage.",
+            "# TYPE sockspy_stage_seconds_total counter",
+        ]
+        lines += [f'sockspy_stage_seconds_total{{stage="{name}"}} {stage["seconds"]:.9f}'
+                  for name, stage in data["stages"].items()]
+        lines += ["# HELP sockspy_stage_calls_total Passes through each stage.", "# TYPE sockspy_stage_calls_total counter"]
+        lines += [f'sockspy_stage_calls_total{{stage="{name}"}} {stage["calls"]}' for name, stage in data["stages"].items()]
+        lines += ["# HELP sockspy_stage_max_seconds Longest single pass through each stage.",
+                  "# TYPE sockspy_stage_max_seconds gauge"]
+        lines += [f'sockspy_stage_max_seconds{{stage="{name}"}} {stage["max_seconds"]:.9f}'
+                  for name, stage in data["stages"].items()]
+        declared = set()
+        for counter in data["counters"]:
+            metric = f"sockspy_{counter['name']}_total"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            labels = ",".join(f'{k}="{v}"' for k, v in counter["labels"].items())
+            lines.append(f"{metric}{{{labels}}} {counter['value']}" if labels else f"{metric} {counter['value']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the metrics to ``path``: JSON for *.json, Prometheus text otherwise."""
+        text = (json.dumps(self.snapshot(), indent=2) + "\n") if path.lower().endswith(".json") else self.to_prometheus()
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def _report_at_exit(self):
+        if not self.enabled:
+            return
+        print(self.summary_table(), file=sys.stderr)
+        if self.output_path:
+            try:
+                self.write(self.output_path)
+                print(f"Metrics written to {self.output_path}", file=sys.stderr)
+            except OSError as e:
+                print(f"Error writing metrics to {self.output_path}: {e}", file=sys.stderr)
+
+
+METRICS = Metrics()
+
+
+def enable_from_env(environ=os.environ):
+    """Turn instrumentation on if SOCKSPY_METRICS is set (1/true, or an output path)."""
+    value = environ.get(METRICS_ENV_VAR, "").strip()
+    if value and value.lower() not in ("0", "false", "no", "off"):
+        METRICS.enable(None if value.lower() in _ENV_ON_VALUES else value)
+
+
+enable_from_env()
@@ -24,16 +24,17 @@ A tool to create realistic and customizable personas for OSINT investigations.
 
 import os
 import sys
+import time # Timing; UI pauses go through pacing.pause()
+_STARTUP_T0 = time.perf_counter() # Reference point for --profile-startup
 import json
 import random
-import datetime
-import time # Import time for sleep
 
 # Correctly import all necessary functions from utils
 from utils import (
     load_data_file,
     load_json_file,
     save_profile,
+    atomic_write_json,
     export_profile_to_txt,
     display_ascii_art,
     clear_screen,
@@ -43,12 +44,20 @@ from utils import (
     get_current_year,
     # load_hierarchical_data, # Likely not needed anymore
     generate_random_password,
-    get_random_hierarchical_item,
     handle_dynamic_list_selection,
     load_data_file,
     FILE_NOT_FOUND,
     FILE_EMPTY,
+    MissingDependencyError,
 )
+from datasets import get_registry, load_name_counts, NAME_COUNTS_CACHE_VERSION
+from sampling import NationalitySampler, PermutationCursor, OrderedSelection
+from instrumentation import METRICS
+from pacing import PACING, PACE_MODES, pause
+from terminal import enable_screen_buffering
+# sqlite3 (persona index), datetime and the batch/export modules are imported
+# where they are first needed, to keep start-up fast
+_IMPORTS_DONE = time.perf_counter()
 
 # English texts ONLY
 # fmt: off
@@ -111,6 +120,7 @@ TEXTS = {
         "biography_prompt": "Enter a short biography (press Enter to generate automatically):",
         "no_personas_found": "No saved personas found.",
         "select_persona": "Select a persona to load:",
+        "persona_list_actions": "Enter a number to load, n/p for next/previous page, f to filter, c to clear the filter, x to export every profile (TXT + JSON) (Enter to cancel):",
         "persona_loaded": "Persona loaded successfully.",
         "persona_options": "Persona Options:",
         "persona_options_list": ["View persona details", "Edit persona", "Export persona (JSON)", "Export persona (TXT)", "Delete persona", "Back to main menu"],
@@ -120,12 +130,14 @@ TEXTS = {
         "show_more_options": "Show More Options",
         "regenerate_options": "Show New Options (Regenerate List)",
         "skip_level_and_continue": "Stop here and use current selection",
+        "filter_options": "Search by name (start or any part of it)",
+        "filter_prompt": "Type the start or any part of the name (Enter to clear the search):",
+        "filter_no_matches": "No names match '{}'.",
         "select_or_action": "Select an item or choose an action:",
         "empty_name_list_warning": "Warning: The name list for this selection ({filepath}) is currently empty.",
         "name_list_contribution_prompt": "We are working hard to bring more data! Perhaps you could help contribute names to this list?",
         "go_back_prompt": "Would you like to go back and change your selection? (y/n):",
-        "random_name_retry_warning": "Warning: Could not find name data for {nationality}. Retrying with another nationality...",
-        "random_name_fallback_warning": "Warning: Failed to find name data after several attempts. Using default names.",
+        "random_name_fallback_warning": "Warning: No name data available for any nationality. Using default names.",
     }
 }
 # fmt: on
@@ -136,15 +148,27 @@ TEXTS = {
 class SockSpy:
     """Main class for the Sock Spy application."""
 
-    def __init__(self):
-        """Initialize paths, texts, and ensure directories exist."""
+    def __init__(self, seed=None):
+        """
+        Initialize paths, texts, and ensure directories exist.
+
+        ``seed`` makes every random choice of the session reproducible.
+        """
         self.texts = TEXTS["en"]
         self.profile = {}
+        # Single RNG for the session; all generation paths draw from it
+        self.rng = random.Random(seed)
         # Determine base directory safely
         base_dir = os.path.dirname(os.path.abspath(__file__))
         self.data_dir = os.path.join(base_dir, "data")
         self.profiles_dir = os.path.join(base_dir, "profiles")
         self.exports_dir = os.path.join(base_dir, "exports")
+        self.name_counts_path = os.path.join(base_dir, "name_counts.json")
+        self._nationality_sampler = None # Built lazily from name_counts.json
+        self._name_counts_checked = False # name_counts.json is refreshed on first use
+        self._persona_index = None # See the persona_index property
+        # Shared in-memory cache: each data file is parsed once per process
+        self.datasets = get_registry(self.data_dir)
 
         # Ensure essential directories exist
         for directory in [self.profiles_dir, self.exports_dir]:
@@ -157,6 +181,14 @@ class SockSpy:
                     print("Please check permissions and run again.")
                     sys.exit(1) # Exit if essential dirs can't be created
 
+    @property
+    def persona_index(self):
+        """Listing index for saved profiles, created on first use (imports sqlite3)."""
+        if self._persona_index is None:
+            from persona_index import PersonaIndex
+            self._persona_index = PersonaIndex(self.profiles_dir)
+        return self._persona_index
+
     # --------------------------------------------------------------------------
     # Core Application Flow Methods
     # --------------------------------------------------------------------------
@@ -194,8 +226,9 @@ class SockSpy:
                 display_ascii_art(self.data_dir)
                 print("\nThank you for using Sock Spy!")
                 print("We hope to see you back soon.")
-                print("\nExiting in 4 seconds...")
-                time.sleep(4)
+                if PACING.duration(4) >= 1: # Only announce a wait the user will notice
+                    print("\nExiting in 4 seconds...")
+                pause(4)
                 clear_screen()
                 sys.exit(0)
 
@@ -227,7 +260,7 @@ class SockSpy:
             # _select_name returns False if empty file + user says 'y' OR user cancels dynamic list
             if not self._select_name():
                 print("\nReturning to Nationality selection...")
-                time.sleep(1.5)
+                pause(1.5)
                 # Clear potentially selected nationality from profile to ensure re-selection
                 self.profile.pop("nationality", None)
                 continue # Restart the while loop (go back to nationality)
@@ -236,7 +269,7 @@ class SockSpy:
             # _select_lastname returns False if empty file + user says 'y' OR user cancels dynamic list
             if not self._select_lastname():
                 print("\nReturning to Nationality selection...")
-                time.sleep(1.5)
+                pause(1.5)
                 # Clear potentially selected names/nationality from profile
                 self.profile.pop("nationality", None)
                 self.profile.pop("first_name", None)
@@ -245,7 +278,7 @@ class SockSpy:
             # --- Success for this block ---
             # If we reach here, Nationality, Name, and Lastname are successfully set.
             print("\nNationality and Names selected successfully.")
-            time.sleep(1)
+            pause(1)
             break # Exit the Nationality/Name/Lastname loop
 
         # === Remaining Independent Steps ===
@@ -386,11 +419,11 @@ class SockSpy:
             if length_choice is None:
                 return False # Cancelled
             selected_length = length_map.get(length_choice, 12)
-            password_to_confirm = generate_random_password(selected_length)
+            password_to_confirm = generate_random_password(selected_length, self.rng)
             # Display masked password confirmation
             print(f"\nGenerated Password: {'*' * len(password_to_confirm)}") # CORRECTED: Separated print
             print("Generated password set.") # CORRECTED: Separated print
-            time.sleep(1.5)
+            pause(1.5)
         # Assign password if one was set
         if password_to_confirm:
             self.profile["password"] = password_to_confirm
@@ -402,7 +435,8 @@ class SockSpy:
         """Selects platforms."""
         clear_screen() # CORRECTED: Separated
         platforms_input = get_input(self.texts["platforms_prompt"])
-        self.profile["platforms"] = [p.strip() for p in platforms_input.split(",") if p.strip()]
+        # Drop repeated entries, keeping the order they were typed in
+        self.profile["platforms"] = OrderedSelection(p.strip() for p in platforms_input.split(",") if p.strip()).to_list()
         return True # Always succeeds even if list is empty
 
     def _select_hierarchical_interests(self):
@@ -446,14 +480,14 @@ class SockSpy:
     def _save_and_export_profile(self):
         """Handles filename prompt, saving, and exporting."""
         clear_screen() # CORRECTED: Separated
-        default_filename = f"{self.profile.get('first_name', 'profile')}_{self.profile.get('last_name', str(random.randint(100,999)))}".lower().replace(" ","_")
+        default_filename = f"{self.profile.get('first_name', 'profile')}_{self.profile.get('last_name', str(self.rng.randint(100,999)))}".lower().replace(" ","_")
         filename_prompt = self.texts["filename_prompt"] + f" (Leave blank for '{default_filename}')"
         filename = get_input(filename_prompt).strip()
         filename = filename if filename else default_filename
-        saved_path = save_profile(self.profile, filename, self.profiles_dir)
+        saved_path = save_profile(self.profile, filename, self.profiles_dir, rng=self.rng, index=self.persona_index)
         if saved_path:
             print(self.texts["save_success"].format(saved_path))
-            exported_path = export_profile_to_txt(self.profile, filename, self.exports_dir)
+            exported_path = export_profile_to_txt(self.profile, filename, self.exports_dir, rng=self.rng)
             if exported_path:
                 print(self.texts["export_success"].format(exported_path)) # CORRECTED: Separated from export call
             # Consider adding an else for export failure here if desired
@@ -470,24 +504,18 @@ class SockSpy:
         """Select nationality using hierarchical structure (Continent -> Specific), showing counts."""
 
         # --- Load Name Counts Cache ---
-        cache_file_path = os.path.join(os.path.dirname(__file__), "name_counts.json")
         loaded_name_counts = {} # Default to empty dict
         try:
-            # Use load_json_file utility if it handles errors, otherwise basic load
-            # Assuming load_json_file returns {} or None on error/not found
-            temp_counts = load_json_file(cache_file_path)
-            if temp_counts:
-                 loaded_name_counts = temp_counts
-            # else: keep loaded_name_counts as {}
+            loaded_name_counts = self._load_name_counts()
         except Exception as e:
-            print(f"Warning: Could not load name counts cache ({cache_file_path}): {e}")
+            print(f"Warning: Could not load name counts cache ({self.name_counts_path}): {e}")
             # Proceed without counts if cache fails
 
         # --- Load Nationalities Data ---
         clear_screen()
         print("Loading nationality data...")
         try:
-            nationalities_data = load_json_file(os.path.join(self.data_dir, "nationalities.json"))
+            nationalities_data = self.datasets.load_json("nationalities.json")
             assert nationalities_data and isinstance(nationalities_data, dict)
         except Exception as e:
             print(f"Error loading nationalities: {e}")
@@ -547,7 +575,8 @@ class SockSpy:
                 prompt,
                 10,
                 False,
-                True
+                True,
+                rng=self.rng
             )
 
             if action == 'selected':
@@ -588,8 +617,7 @@ class SockSpy:
         """Select a first name using dynamic list helper"""
         clear_screen() # CORRECTED: Separated
         prompt = self.texts["name_select"]
-        names_file = os.path.join(self.data_dir, "names", gender, f"{nationality}.txt")
-        full_list = load_data_file(names_file)
+        full_list = self.datasets.load_lines(os.path.join("names", gender, f"{nationality}.txt"))
         if full_list is FILE_NOT_FOUND:
             # File non-existent or error reading - treat as cancellation
             print(f"Error: Could not load name file for {gender}/{nationality}.")
@@ -610,7 +638,7 @@ class SockSpy:
                 # Or, assign a default? For now, let handle_dynamic show no options.
                 full_list = [] # Ensure it's an empty list for the next step
                 print("Proceeding without name options for this selection.")
-                time.sleep(1.5)
+                pause(1.5)
                 # Fall through to handle_dynamic_list_selection which will show no items
                 # and likely result in 'back' action if user cancels there.
 
@@ -618,9 +646,11 @@ class SockSpy:
 
         # If full_list is valid (non-empty list), proceed with selection
         # Note: If user chose *not* to go back on empty list, full_list is now []
+        name_index = self.datasets.load_text_index(os.path.join("names", gender, f"{nationality}.txt"))
         while True:
-            # Args: list, texts, prompt, page_size=7, allow_skip=False, allow_back=True
-            selected_item, action = handle_dynamic_list_selection(full_list, self.texts, prompt, 7, False, True)
+            selected_item, action = handle_dynamic_list_selection(
+                full_list, self.texts, prompt, initial_show=7, increment=7, rng=self.rng,
+                search_index=name_index if full_list else None)
             if action == 'selected':
                 self.profile["first_name"] = selected_item
                 break
@@ -636,8 +666,7 @@ class SockSpy:
         """Select a last name using dynamic list helper"""
         clear_screen() # CORRECTED: Separated
         prompt = self.texts["lastname_select"]
-        lastnames_file = os.path.join(self.data_dir, "last_names", f"{nationality}.txt")
-        full_list = load_data_file(lastnames_file)
+        full_list = self.datasets.load_lines(os.path.join("last_names", f"{nationality}.txt"))
         if full_list is FILE_NOT_FOUND:
             print(f"Error: Could not load last name file for {nationality}.")
             input(self.texts["continue_prompt"])
@@ -654,12 +683,14 @@ class SockSpy:
             else:
                 full_list = []
                 print("Proceeding without last name options for this selection.")
-                time.sleep(1.5)
+                pause(1.5)
         # --- End Check ---
 
+        name_index = self.datasets.load_text_index(os.path.join("last_names", f"{nationality}.txt"))
         while True:
-            # Args: list, texts, prompt, page_size=7, allow_skip=False, allow_back=True
-            selected_item, action = handle_dynamic_list_selection(full_list, self.texts, prompt, 7, False, True)
+            selected_item, action = handle_dynamic_list_selection(
+                full_list, self.texts, prompt, initial_show=7, increment=7, rng=self.rng,
+                search_index=name_index if full_list else None)
             if action == 'selected':
                 self.profile["last_name"] = selected_item
                 break
@@ -680,11 +711,11 @@ class SockSpy:
                 first = self.profile.get("first_name", "User") # CORRECTED: Separated assignment
                 last = self.profile.get("last_name", "")        # CORRECTED: Separated assignment
                 age = self.profile.get("age", 30)               # CORRECTED: Separated assignment
-                suggestions = generate_username_suggestions(first, last, age)
+                suggestions = generate_username_suggestions(first, last, age, self.rng)
             except Exception as e:
                 print(f"Warning: Username suggestion error ({e}). Using fallback.") # Added detail
             # Ensure fallback is always available
-            fallback = f"{self.profile.get('first_name','user')[:4].lower()}{random.randint(100,999)}"
+            fallback = f"{self.profile.get('first_name','user')[:4].lower()}{self.rng.randint(100,999)}"
             if not suggestions: suggestions.append(fallback) # Only add if suggestions failed
             elif fallback not in suggestions: suggestions.append(fallback) # Add if not already present
 
@@ -723,7 +754,7 @@ class SockSpy:
         clear_screen() # CORRECTED: Separated
         print("Loading interests data...")
         try:
-            interests_data = load_json_file(os.path.join(self.data_dir, "interests.json"))
+            interests_data = self.datasets.load_json("interests.json")
             assert interests_data and isinstance(interests_data, dict)
         except Exception as e:
             print(f"Warning: Interests data error ({e}). Skipping interests selection.") # CORRECTED: Separated
@@ -754,7 +785,7 @@ class SockSpy:
                 selected_option = options[choice - 1] if action == 'selected' else None
             else: # Use dynamic handler for subsequent levels
                 # Args: list, texts, prompt, page_size=10, allow_skip=True, allow_back=True
-                selected_option, action = handle_dynamic_list_selection(options, self.texts, level_name, 10, True, True)
+                selected_option, action = handle_dynamic_list_selection(options, self.texts, level_name, 10, True, True, rng=self.rng)
 
             if action == 'selected':
                 path.append(selected_option)
@@ -814,7 +845,7 @@ class SockSpy:
         clear_screen()
         print("Loading professions data...")
         try:
-            professions_data = load_json_file(os.path.join(self.data_dir, "professions.json"))
+            professions_data = self.datasets.load_json("professions.json")
             assert professions_data and isinstance(professions_data, dict)
         except Exception as e:
             print(f"Warning: Professions data error ({e}). Setting profession to 'Unspecified'.")
@@ -851,7 +882,7 @@ class SockSpy:
                 # *** CORRECTED CALL for hierarchical levels ***
                 # Uses 'options' list, stores in 'selected_option', page_size=10
                 # Args: list, texts, prompt, page_size=10, allow_skip=True, allow_back=True
-                selected_option, action = handle_dynamic_list_selection(options, self.texts, level_name, 10, True, True)
+                selected_option, action = handle_dynamic_list_selection(options, self.texts, level_name, 10, True, True, rng=self.rng)
 
             # --- Handle action from this level's selection ---
             if action == 'selected':
@@ -892,7 +923,7 @@ class SockSpy:
                 # *** CORRECTED CALL for final list selection ***
                 # Uses 'specific_professions' list, stores in 'selected_final', page_size=15
                 # Args: list, texts, prompt, page_size=15, allow_skip=True, allow_back=True
-                selected_final, action = handle_dynamic_list_selection(specific_professions, self.texts, level_name, 15, True, True)
+                selected_final, action = handle_dynamic_list_selection(specific_professions, self.texts, level_name, 15, True, True, rng=self.rng)
 
                 if action == 'selected':
                     final_profession = selected_final # Assign the specific job title
@@ -921,7 +952,7 @@ class SockSpy:
         clear_screen() # CORRECTED: Separated
         print("Loading location data...")
         try:
-            locations_data = load_json_file(os.path.join(self.data_dir, "locations.json"))
+            locations_data = self.datasets.load_json("locations.json")
             assert locations_data and isinstance(locations_data, dict)
         except Exception as e:
             print(f"Error loading locations.json: {e}. Setting location to 'Earth'.") # CORRECTED: Separated
@@ -956,7 +987,7 @@ class SockSpy:
                 selected_option = options[choice - 1] if action == 'selected' else None
             else: # Use dynamic handler for subsequent levels
                             # Args: list, texts, prompt, page_size=10, allow_skip=allow_skip_here, allow_back=True
-                            selected_option, action = handle_dynamic_list_selection(options, self.texts, level_name, 10, allow_skip_here, True)
+                            selected_option, action = handle_dynamic_list_selection(options, self.texts, level_name, 10, allow_skip_here, True, rng=self.rng)
 
             if action == 'selected':
                 path.append(selected_option)
@@ -988,7 +1019,7 @@ class SockSpy:
                 final_level_index = min(level, len(level_prompt_keys) - 1) # Avoid index error
                 level_name = self.texts.get(level_prompt_keys[final_level_index], f"Select Final Location {level+1}:")
                 # Args: list, texts, prompt, page_size=10, allow_skip=True, allow_back=True
-                selected_final, action = handle_dynamic_list_selection(final_options, self.texts, level_name + " (Optional)", 10, True, True)
+                selected_final, action = handle_dynamic_list_selection(final_options, self.texts, level_name + " (Optional)", 10, True, True, rng=self.rng)
                 if action == 'selected':
                     path.append(selected_final)
                 # If skipped/backed, just use the path as it was before this step
@@ -1000,8 +1031,7 @@ class SockSpy:
     def select_common_phrases(self):
         """Select common phrases using reusable multi-select helper"""
         clear_screen() # CORRECTED: Separated
-        phrases_file = os.path.join(self.data_dir, "common_phrases", "english.txt")
-        full_list = load_data_file(phrases_file)
+        full_list = self.datasets.load_lines(os.path.join("common_phrases", "english.txt"))
         if not full_list:
             print("Warning: No common phrases found. Skipping.") # CORRECTED: Separated
             self.profile["common_phrases"] = []                 # CORRECTED: Separated
@@ -1025,10 +1055,9 @@ class SockSpy:
         """Select a profile picture URL using dynamic helper"""
         clear_screen() # CORRECTED: Separated
         prompt = "Select a profile picture:"
-        pictures_file = os.path.join(self.data_dir, "profile_pictures.txt")
         full_list = [] # CORRECTED: Separated assignment
 
-        pictures = load_data_file(pictures_file) # Load first
+        pictures = self.datasets.load_lines("profile_pictures.txt") # Load first (cached)
         if not pictures:
             print("Warning: No pictures file found or list is empty. Cannot select picture.") # CORRECTED: Separated
             self.profile.pop("profile_picture", None) # Ensure key isn't present # CORRECTED: Separated
@@ -1056,7 +1085,7 @@ class SockSpy:
         # Loop for selection using the dynamic helper
         while True:
             # Args: list, texts, prompt, page_size=5, allow_skip=False, allow_back=True
-            selected_item, action = handle_dynamic_list_selection(full_list, self.texts, prompt, 5, False, True)
+            selected_item, action = handle_dynamic_list_selection(full_list, self.texts, prompt, 5, False, True, rng=self.rng)
             if action == 'selected':
                 self.profile["profile_picture"] = selected_item # CORRECTED: Separated
                 print(f"\nSelected Picture: {selected_item}") # Give feedback
@@ -1072,20 +1101,19 @@ class SockSpy:
         clear_screen() # CORRECTED: Separated
         initial_show = 10
         increment = 5
-        available_indices = list(range(len(full_list)))
-        # Sample initial indices
-        displayed_indices = random.sample(available_indices, min(initial_show, len(available_indices)))
-        displayed_indices.sort()
-        # Get existing selections or start fresh, ensure it's a mutable copy
-        selected_items_list = list(self.profile.get(profile_key, [])) # Use list() for copy
+        # Lazily shuffled permutation: Show More / Regenerate cost O(items added)
+        cursor = PermutationCursor(len(full_list), self.rng)
+        displayed_indices = sorted(cursor.take(initial_show))
+        # Get existing selections or start fresh (a copy; O(1) membership for the redraws below)
+        selected_items = OrderedSelection(self.profile.get(profile_key, []))
 
         while True:
             clear_screen()
             print(prompt)
             print("-" * 30)
-            print(f"Currently Selected ({len(selected_items_list)}/{max_select}):")
-            if selected_items_list:
-                for item in selected_items_list:
+            print(f"Currently Selected ({len(selected_items)}/{max_select}):")
+            if selected_items:
+                for item in selected_items:
                     print(f"- {item}")
             else:
                 print("(None)")
@@ -1095,7 +1123,7 @@ class SockSpy:
             current_options_map = {
                 i + 1: full_list[idx]
                 for i, idx in enumerate(displayed_indices)
-                if full_list[idx] not in selected_items_list
+                if full_list[idx] not in selected_items
             }
             if not current_options_map:
                 print("(No more selectable options in current view)")
@@ -1111,7 +1139,7 @@ class SockSpy:
             finish_opt_num = -1
             current_max_choice = max(current_options_map.keys()) if current_options_map else 0 # Start with highest item number
 
-            can_show_more = len(displayed_indices) < len(available_indices)
+            can_show_more = cursor.remaining() > 0
 
             # Display actions and update max choice number
             if can_show_more:
@@ -1144,18 +1172,14 @@ class SockSpy:
 
             # --- Handle Actions ---
             if user_choice == show_more_opt_num and can_show_more:
-                remaining_indices = [i for i in available_indices if i not in displayed_indices]
-                if remaining_indices:
-                    num_to_add = min(increment, len(remaining_indices))
-                    new_indices = random.sample(remaining_indices, num_to_add)
-                    displayed_indices.extend(new_indices)
-                    displayed_indices.sort()
+                displayed_indices.extend(cursor.take(increment))
+                displayed_indices.sort()
                 continue # Redisplay
 
             elif user_choice == regenerate_opt_num:
-                num_to_show = min(initial_show, len(available_indices))
-                displayed_indices = random.sample(available_indices, num_to_show)
-                displayed_indices.sort()
+                if cursor.remaining() == 0:
+                    cursor.reset() # Everything was shown: start a new shuffle
+                displayed_indices = sorted(cursor.take(initial_show))
                 continue # Redisplay
 
             elif user_choice == finish_opt_num:
@@ -1165,22 +1189,22 @@ class SockSpy:
             # --- Handle Item Selection ---
             elif user_choice in current_options_map:
                 item_to_add = current_options_map[user_choice]
-                if len(selected_items_list) < max_select:
-                    selected_items_list.append(item_to_add)
+                if len(selected_items) < max_select:
+                    selected_items.add(item_to_add)
                     print(f"Added: {item_to_add}") # CORRECTED: Separated
-                    time.sleep(0.8)
+                    pause(0.8)
                 else:
                     print(f"Cannot add more than {max_select} item(s).") # CORRECTED: Separated
-                    time.sleep(1)
+                    pause(1)
                 continue # Continue loop after attempting to add item
 
             else: # Choice was not a valid item or action number
                 print(self.texts.get("invalid_choice", "Invalid selection.")) # CORRECTED: Separated
-                time.sleep(1)
+                pause(1)
                 continue # Ask again
 
         # After loop finishes (break), update the profile with the final list
-        self.profile[profile_key] = selected_items_list
+        self.profile[profile_key] = selected_items.to_list()
 
 
     # --------------------------------------------------------------------------
@@ -1188,18 +1212,36 @@ class SockSpy:
     # --------------------------------------------------------------------------
 
 
-    def _update_name_counts_cache(self):
+    def _load_name_counts(self):
         """
-        Scans name files based on nationalities.json, counts names,
-        and saves the counts to a cache file (name_counts.json).
+        Return the per-nationality name counts from name_counts.json ({} if unavailable).
+
+        The first call of a session brings the cache up to date with the name files.
         """
-        print("Initializing name count update...")
-        nationalities_path = os.path.join(self.data_dir, "nationalities.json")
-        cache_file_path = os.path.join(os.path.dirname(__file__), "name_counts.json") # Cache in base dir
+        if not self._name_counts_checked:
+            self._name_counts_checked = True
+            self._update_name_counts_cache(verbose=False)
+        return load_name_counts(self.name_counts_path)
+
+    def _get_nationality_sampler(self):
+        """Weighted nationality sampler built from the name counts (cached until the cache changes)."""
+        if self._nationality_sampler is None:
+            self._nationality_sampler = NationalitySampler(self._load_name_counts())
+        return self._nationality_sampler
+
+    def _update_name_counts_cache(self, force=False, verbose=True):
+        """
+        Refreshes the name counts cache (name_counts.json) incrementally.
 
-        name_counts = {}
-        total_nationalities = 0
-        processed_count = 0
+        The cache records size and mtime of every male/female/last name file.
+        Only files whose stats changed since the last run are re-read, and the
+        cache is rewritten (atomically) only if something actually changed.
+        ``force`` recounts every file; ``verbose=False`` keeps only warnings and errors.
+        """
+        say = print if verbose else (lambda *args, **kwargs: None)
+        say("Initializing name count update...")
+        nationalities_path = os.path.join(self.data_dir, "nationalities.json")
+        cache_file_path = self.name_counts_path # Cache in base dir
 
         try:
             nationalities_data = load_json_file(nationalities_path)
@@ -1207,75 +1249,81 @@ class SockSpy:
                 print("Warning: Could not load nationalities.json. Skipping name count update.")
                 return
 
-            # First count total nationalities for progress bar
-            for continent_list in nationalities_data.values():
-                total_nationalities += len(continent_list)
-
+            total_nationalities = sum(len(continent_list) for continent_list in nationalities_data.values())
             if total_nationalities == 0:
                 print("Warning: No nationalities found in nationalities.json.")
                 return
 
-            print(f"Found {total_nationalities} nationalities to process.")
-            time.sleep(0.5) # Brief pause
+            say(f"Found {total_nationalities} nationalities to process.")
+
+            # --- Load previous file stats (legacy caches have none, so everything is recounted) ---
+            old_cache = load_json_file(cache_file_path) if os.path.exists(cache_file_path) else {}
+            old_files = {}
+            old_counts = {}
+            if not force and isinstance(old_cache, dict) and old_cache.get("version") == NAME_COUNTS_CACHE_VERSION:
+                old_files = old_cache.get("files", {})
+                old_counts = old_cache.get("counts", {})
+
+            name_counts = {}
+            file_stats = {}
+            recounted = 0
 
-            # Iterate and count
-            for continent, nationality_list in nationalities_data.items():
+            for nationality_list in nationalities_data.values():
                 for nationality in nationality_list:
-                    processed_count += 1
                     nat_key = nationality.lower() # Use lowercase key
-
-                    # --- Construct Paths ---
-                    male_path = os.path.join(self.data_dir, "names", "male", f"{nat_key}.txt")
-                    female_path = os.path.join(self.data_dir, "names", "female", f"{nat_key}.txt")
-                    last_path = os.path.join(self.data_dir, "last_names", f"{nat_key}.txt")
-
-                    # --- Load and Count ---
-                    male_list = load_data_file(male_path)
-                    female_list = load_data_file(female_path)
-                    last_list = load_data_file(last_path)
-
-                    # Get length if list is valid (not None, includes []), else 0
-                    male_count = len(male_list) if isinstance(male_list, list) else 0
-                    female_count = len(female_list) if isinstance(female_list, list) else 0
-                    last_count = len(last_list) if isinstance(last_list, list) else 0
-
-                    # --- Store Counts ---
-                    name_counts[nat_key] = {
-                        "male": male_count,
-                        "female": female_count,
-                        "last": last_count
-                    }
-
-                    # --- Update Progress ---
-                    progress = int((processed_count / total_nationalities) * 100)
-                    bar_length = 20
-                    filled_length = int(bar_length * processed_count // total_nationalities)
-                    bar = '#' * filled_length + '-' * (bar_length - filled_length)
-                    # Use \r to return to beginning of line, end='' to prevent newline
-                    print(f"\rProcessing: [{bar}] {progress}% ({processed_count}/{total_nationalities}) - {nationality}", end='')
-
-            print() # Newline after the loop finishes
+                    counts = {}
+                    for count_key, rel_parts in (
+                        ("male", ("names", "male")),
+                        ("female", ("names", "female")),
+                        ("last", ("last_names",)),
+                    ):
+                        rel_path = "/".join(rel_parts + (f"{nat_key}.txt",))
+                        try:
+                            st = os.stat(os.path.join(self.data_dir, *rel_parts, f"{nat_key}.txt"))
+                        except OSError:
+                            counts[count_key] = 0 # Missing file counts as empty
+                            continue
+
+                        previous = old_files.get(rel_path)
+                        if previous and previous.get("size") == st.st_size and previous.get("mtime_ns") == st.st_mtime_ns:
+                            count = previous.get("count", 0)
+                            METRICS.count("cache_hits", cache="name_counts")
+                        else:
+                            METRICS.count("cache_misses", cache="name_counts")
+                            # Changed or new file: recount from disk (never from a data pack)
+                            # and drop any stale in-memory copy
+                            name_list = load_data_file(os.path.join(self.data_dir, *rel_parts, f"{nat_key}.txt"))
+                            self.datasets.invalidate(os.path.join(*rel_parts, f"{nat_key}.txt"))
+                            count = len(name_list) if isinstance(name_list, list) else 0
+                            recounted += 1
+
+                        counts[count_key] = count
+                        file_stats[rel_path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "count": count}
+                    name_counts[nat_key] = counts
+
+            if recounted == 0 and name_counts == old_counts and file_stats == old_files:
+                say("Name counts cache is up to date.")
+                return
 
             # --- Save Cache ---
-            print(f"Saving counts to {cache_file_path}...")
+            say(f"Recounted {recounted} changed name file(s). Saving counts to {cache_file_path}...")
             try:
-                with open(cache_file_path, "w", encoding="utf-8") as f:
-                    json.dump(name_counts, f, indent=2, ensure_ascii=False)
-                print("Name counts cache updated successfully.")
-            except IOError as e:
+                atomic_write_json(cache_file_path, {
+                    "version": NAME_COUNTS_CACHE_VERSION,
+                    "counts": name_counts,
+                    "files": file_stats,
+                })
+                say("Name counts cache updated successfully.")
+                self._nationality_sampler = None # Rebuild from the new counts on next use
+            except (IOError, OSError) as e:
                 print(f"Error saving name counts cache: {e}")
             except Exception as e:
                  print(f"An unexpected error occurred saving cache: {e}")
 
         except Exception as e:
             print(f"\nAn error occurred during name count update: {e}")
-            # Optionally log the error traceback here if needed
-            # import traceback
-            # traceback.print_exc()
             print("Proceeding without updated name counts.")
 
-        time.sleep(1) # Pause briefly after completion/error message
-
 
     def preview_profile(self):
         """Display a preview of the generated or loaded profile"""
@@ -1411,15 +1459,15 @@ class SockSpy:
                         # else: keep current value if blank was entered (except for password)
 
                     print("... Field updated (if a new value was provided).") # CORRECTED: Separated
-                    time.sleep(0.8) # Brief pause
+                    pause(0.8) # Brief pause
 
                 else:
                     print(self.texts["invalid_choice"]) # CORRECTED: Separated
-                    time.sleep(1)
+                    pause(1)
 
             except ValueError:
                 print(self.texts["invalid_choice"]) # CORRECTED: Separated
-                time.sleep(1)
+                pause(1)
             # Outer while loop continues
 
     # --- persona_options and create_random_persona were assumed correct from previous turns ---
@@ -1427,36 +1475,69 @@ class SockSpy:
 
     # Example placeholder for load_persona if it wasn't defined before
     def load_persona(self):
-        """Loads an existing persona from a JSON file."""
-        clear_screen()
-        try:
-            profiles = [f for f in os.listdir(self.profiles_dir) if f.endswith(".json")]
-        except FileNotFoundError:
-            print(f"Error: Profiles directory not found at {self.profiles_dir}")
-            input(self.texts["continue_prompt"])
-            return
-        except OSError as e:
-            print(f"Error accessing profiles directory: {e}")
-            input(self.texts["continue_prompt"])
-            return
+        """Loads an existing persona, listing saved profiles page by page from the persona index."""
+        import sqlite3 # Already loaded by the persona index; needed for its error type
+        page_size = 20
+        offset = 0
+        filters = {}
+        while True:
+            clear_screen()
+            try:
+                total = self.persona_index.count(**filters)
+                rows = self.persona_index.list(offset, page_size, **filters)
+            except (OSError, sqlite3.Error) as e:
+                print(f"Error accessing profiles index: {e}")
+                input(self.texts["continue_prompt"])
+                return
 
-        if not profiles:
-            print(self.texts["no_personas_found"])
-            input(self.texts["continue_prompt"])
-            return
+            if total == 0 and not filters:
+                print(self.texts["no_personas_found"])
+                input(self.texts["continue_prompt"])
+                return
 
-        print(self.texts["select_persona"])
-        for i, profile_name in enumerate(profiles, 1):
-            # Strip .json for display
-            print(f"{i}. {profile_name[:-5]}")
+            print(self.texts["select_persona"])
+            filter_desc = ", ".join(f"{k}={v}" for k, v in filters.items())
+            if filter_desc:
+                print(f"(Filter: {filter_desc})")
+            print(f"Showing {offset + 1 if rows else 0}-{offset + len(rows)} of {total}")
+            for i, row in enumerate(rows, 1):
+                details = ", ".join(str(v) for v in (
+                    (row["nationality"] or "").capitalize(), row["age"], row["profession"]) if v)
+                print(f"{i}. {row['filename'][:-5]}" + (f" ({details})" if details else ""))
+            print("-" * 20)
+            print(self.texts["persona_list_actions"])
 
-        choice = get_numeric_choice(1, len(profiles))
-        if choice is None:
-            print("Loading cancelled.")
-            input(self.texts["continue_prompt"])
-            return
+            choice = get_input("> ").strip().lower()
+            if not choice:
+                print("Loading cancelled.")
+                input(self.texts["continue_prompt"])
+                return
+            if choice == "n":
+                if offset + page_size < total:
+                    offset += page_size
+                continue
+            if choice == "p":
+                offset = max(0, offset - page_size)
+                continue
+            if choice == "f":
+                filters = self._prompt_persona_filters()
+                offset = 0
+                continue
+            if choice == "c":
+                filters = {}
+                offset = 0
+                continue
+            if choice == "x":
+                from bulk_export import bulk_export, format_summary
+                print(format_summary(bulk_export(self.profiles_dir, self.exports_dir)))
+                input(self.texts["continue_prompt"])
+                continue
+            if choice.isdigit() and 1 <= int(choice) <= len(rows):
+                break
+            print(self.texts["invalid_choice"])
+            pause(1)
 
-        selected_profile_file = profiles[choice - 1]
+        selected_profile_file = rows[int(choice) - 1]["filename"]
         profile_path = os.path.join(self.profiles_dir, selected_profile_file)
         profile_name_base = selected_profile_file[:-5] # Name without extension
 
@@ -1473,9 +1554,26 @@ class SockSpy:
             input(self.texts["continue_prompt"])
 
 
+    def _prompt_persona_filters(self):
+        """Ask for name / nationality / age filters used by load_persona."""
+        filters = {}
+        name = get_input("Name contains (Enter to skip):").strip()
+        if name:
+            filters["name"] = name
+        nationality = get_input("Nationality (Enter to skip):").strip()
+        if nationality:
+            filters["nationality"] = nationality.lower()
+        for key, prompt in (("min_age", "Minimum age (Enter to skip):"), ("max_age", "Maximum age (Enter to skip):")):
+            value = get_input(prompt).strip()
+            if value.isdigit():
+                filters[key] = int(value)
+        return filters
+
     # --- Added persona_options from previous turn for completeness ---
     def persona_options(self, profile_path, profile_name):
         """Display options for loaded persona, including deleting TXT export."""
+        import sqlite3 # Error type of the persona index updates below
+        import datetime
         while True:
             clear_screen()
             print(f"--- Options for Persona: {profile_name} ---")
@@ -1487,7 +1585,7 @@ class SockSpy:
             choice = get_numeric_choice(1, len(options_list))
             if choice is None: # Assume None means user wants to go back or cancelled input
                  print("Returning to main menu...")
-                 time.sleep(1)
+                 pause(1)
                  break # Exit the options loop
 
             if choice == 1:  # View details (using preview)
@@ -1499,8 +1597,11 @@ class SockSpy:
                     with open(profile_path, "w", encoding="utf-8") as f:
                         json.dump(self.profile, f, indent=2, ensure_ascii=False)
                     print("Changes saved.")
+                    self.persona_index.upsert(profile_path, self.profile)
                 except IOError as e:
                     print(f"Save Error after edit: {e}")
+                except sqlite3.Error as e: # Saved; the index catches up on its next sync
+                    print(f"Warning: Could not update the persona index: {e}")
                 input(self.texts["continue_prompt"])
             elif choice == 3:  # Export persona (JSON)
                 if not os.path.exists(self.exports_dir):
@@ -1531,7 +1632,7 @@ class SockSpy:
                         continue
                 try:
                     # export_profile_to_txt should handle its own file writing
-                    txt_filepath = export_profile_to_txt(self.profile, profile_name, self.exports_dir) # Use base name for TXT
+                    txt_filepath = export_profile_to_txt(self.profile, profile_name, self.exports_dir, rng=self.rng) # Use base name for TXT
                     if txt_filepath:
                         print(self.texts["export_success"].format(txt_filepath))
                     else:
@@ -1550,8 +1651,11 @@ class SockSpy:
                         os.remove(profile_path)
                         print(f"Deleted JSON: {profile_path}")
                         deleted_json = True
+                        self.persona_index.remove(profile_path)
                     except OSError as e:
                         print(f"Error deleting JSON profile ({profile_path}): {e}")
+                    except sqlite3.Error as e: # Deleted; the index catches up on its next sync
+                        print(f"Warning: Could not update the persona index: {e}")
 
                     # Try deleting corresponding TXT export (assuming name.txt)
                     txt_export_path = os.path.join(self.exports_dir, f"{profile_name}.txt")
@@ -1611,73 +1715,51 @@ class SockSpy:
 
         # --- Load Data ---
         print("Loading necessary data files...")
-        time.sleep(pause_time * 1.5) # Pause after loading message
-        # Use try-except blocks for robustness when loading each file
-        nationalities_data = load_json_file(os.path.join(self.data_dir, "nationalities.json"))
-        professions_data = load_json_file(os.path.join(self.data_dir, "professions.json"))
-        locations_data = load_json_file(os.path.join(self.data_dir, "locations.json"))
-        interests_data = load_json_file(os.path.join(self.data_dir, "interests.json"))
+        pause(pause_time * 1.5) # Pause after loading message
+        # Served from the dataset registry, so only the first persona pays for disk/JSON parsing
+        # Flattened leaf indexes: uniform over all leaves, no per-call tree walk
+        professions_index = self.datasets.load_hierarchy("professions.json")
+        locations_index = self.datasets.load_hierarchy("locations.json")
+        interests_index = self.datasets.load_hierarchy("interests.json")
         # Assuming english.txt for phrases, adjust if language selection is added
-        phrases_data = load_data_file(os.path.join(self.data_dir, "common_phrases", "english.txt"))
-        pictures_data = load_data_file(os.path.join(self.data_dir, "profile_pictures.txt"))
-        # Need names and last names data loaded here too for Level 1
-        # We'll load them dynamically based on selected nationality later
+        phrases_data = self.datasets.load_lines(os.path.join("common_phrases", "english.txt"))
+        pictures_data = self.datasets.load_lines("profile_pictures.txt")
+        # Names and last names are loaded for the sampled nationality only
 
         # --- Level 1: Minimal ---
         print("\n--- Generating Level 1 Details ---")
 
         # Gender (Select first)
         print(f"{self.texts['random_generating'].format(item='Gender')}")
-        self.profile["gender"] = random.choice(["male", "female"])
+        self.profile["gender"] = self.rng.choice(["male", "female"])
         print(f"-> Gender: {self.profile['gender'].capitalize()}")
-        time.sleep(pause_time)
+        pause(pause_time)
 
-        # --- Loop to find valid Name/Nationality ---
+        # --- Weighted Nationality & Names ---
         first_name = "Alex" # Default fallback
         last_name = "Smith" # Default fallback
         selected_nationality = "american" # Default fallback
-        found_names = False
-        max_retries = 50 # Safety break
-        retries = 0
 
         print(f"{self.texts['random_generating'].format(item='Nationality & Names')}") # Combined message
 
-        while not found_names and retries < max_retries:
-            retries += 1
-            current_nationality = "american" # Reset default for this attempt
-
-            # Select Nationality for this attempt
-            if nationalities_data:
-                item, _ = get_random_hierarchical_item(nationalities_data)
-                if item:
-                    current_nationality = item.lower()
-            # else: keep 'american' default
-
-            # Try loading names for this nationality
-            names_file = os.path.join(self.data_dir, "names", self.profile["gender"], f"{current_nationality}.txt")
-            names_list = load_data_file(names_file)
-
-            lastnames_file = os.path.join(self.data_dir, "last_names", f"{current_nationality}.txt")
-            lastnames_list = load_data_file(lastnames_file)
-
-            # Check if both lists are valid (not None and not empty)
-            if names_list and lastnames_list: # Checks for None and [] implicitly (empty lists are False)
-                selected_nationality = current_nationality # Store the successful nationality
-                first_name = random.choice(names_list)
-                last_name = random.choice(lastnames_list)
-                found_names = True # Signal success
-                # print(f"Debug: Found names for {selected_nationality} on attempt {retries}") # Optional debug
-            else:
-                 if retries % 5 == 0: # Print warning occasionally if it takes long
-                     print(self.texts["random_name_retry_warning"].format(nationality=current_nationality))
-                     time.sleep(0.1) # Small pause if retrying
-
-        # --- End Loop ---
-
-        # Handle fallback if loop finished without success
-        if not found_names:
+        # The sampler only returns nationalities whose name lists are non-empty,
+        # so a single pick (and two cached list lookups) replaces the old retry loop.
+        with METRICS.stage("nationality_sampling"):
+            current_nationality = self._get_nationality_sampler().sample(self.profile["gender"], self.rng)
+        with METRICS.stage("name_lookup"):
+            names_list = lastnames_list = None
+            if current_nationality:
+                names_list = self.datasets.load_lines(os.path.join("names", self.profile["gender"], f"{current_nationality}.txt"))
+                lastnames_list = self.datasets.load_lines(os.path.join("last_names", f"{current_nationality}.txt"))
+            if names_list and lastnames_list:
+                first_name = self.rng.choice(names_list)
+                last_name = self.rng.choice(lastnames_list)
+
+        if names_list and lastnames_list:
+            selected_nationality = current_nationality
+        else:
+            # No counted corpus (or a stale cache): defaults for name/lastname/nationality are already set
             print(self.texts["random_name_fallback_warning"])
-            # Defaults for name/lastname/nationality are already set
 
         # Assign the found (or default) values
         self.profile["nationality"] = selected_nationality
@@ -1686,31 +1768,31 @@ class SockSpy:
 
         # Print results after loop/fallback
         print(f"-> Nationality: {self.profile['nationality'].capitalize()}")
-        time.sleep(pause_time)
+        pause(pause_time)
         # Print First Name separately now
         # print(f"{self.texts['random_generating'].format(item='First Name')}") # Message already printed above
         print(f"-> First Name: {self.profile['first_name']}")
-        time.sleep(pause_time)
+        pause(pause_time)
         # Print Last Name separately now
         # print(f"{self.texts['random_generating'].format(item='Last Name')}") # Message already printed above
         print(f"-> Last Name: {self.profile['last_name']}")
-        time.sleep(pause_time)
+        pause(pause_time)
 
         # Age (can remain as before)
         print(f"{self.texts['random_generating'].format(item='Age')}")
-        self.profile["age"] = random.randint(18, 75)
+        self.profile["age"] = self.rng.randint(18, 75)
         print(f"-> Age: {self.profile['age']}")
-        time.sleep(pause_time)
+        pause(pause_time)
 
         # Profession (can remain as before)
         print(f"{self.texts['random_generating'].format(item='Profession')}")
         selected_profession = "Unspecified"
-        if professions_data:
-            item, path = get_random_hierarchical_item(professions_data)
+        if professions_index:
+            item, path = professions_index.sample(self.rng)
             selected_profession = item if item else (path[-1] if path else "Unspecified")
         self.profile["profession"] = selected_profession
         print(f"-> Profession: {self.profile['profession']}")
-        time.sleep(pause_time)
+        pause(pause_time)
 
         # --- Level 2: Standard ---
         if level_choice >= 2:
@@ -1718,31 +1800,33 @@ class SockSpy:
             # Basic Location (e.g., Country, Region from random path)
             print(f"{self.texts['random_generating'].format(item='Basic Location')}")
             basic_location = "Earth"
-            if locations_data:
-                _, path = get_random_hierarchical_item(locations_data) # Get a random path
+            if locations_index:
+                _, path = locations_index.sample(self.rng) # Get a random path
                 # Take first 2 elements (e.g., Continent, Country) or fewer if path is short
                 parts = path[:2]
                 if parts: basic_location = ", ".join(reversed(parts)) # Format as Country, Continent
             # For level 2, we overwrite location if it exists, otherwise create it
             self.profile["location"] = basic_location
             print(f"-> Location: {self.profile['location']}")
-            time.sleep(pause_time)
+            pause(pause_time)
             # Username (using suggestions)
             print(f"{self.texts['random_generating'].format(item='Username')}")
-            generated_user = f"{self.profile['first_name'][:4].lower()}{random.randint(100,999)}" # Fallback
-            try:
-                suggestions = generate_username_suggestions(self.profile['first_name'], self.profile['last_name'], self.profile['age'])
-                if suggestions: generated_user = random.choice(suggestions)
-            except Exception: pass # Use fallback if suggestion fails
+            with METRICS.stage("username_password"):
+                generated_user = f"{self.profile['first_name'][:4].lower()}{self.rng.randint(100,999)}" # Fallback
+                try:
+                    suggestions = generate_username_suggestions(self.profile['first_name'], self.profile['last_name'], self.profile['age'], self.rng)
+                    if suggestions: generated_user = self.rng.choice(suggestions)
+                except Exception: pass # Use fallback if suggestion fails
             self.profile["username"] = generated_user
             print(f"-> Username: {self.profile['username']}")
-            time.sleep(pause_time)
+            pause(pause_time)
             # Password (standard length)
             print(f"{self.texts['random_generating'].format(item='Password')}")
-            generated_password = generate_random_password(length=12) # Standard length
+            with METRICS.stage("username_password"):
+                generated_password = generate_random_password(length=12, rng=self.rng) # Standard length
             self.profile["password"] = generated_password
             print(f"-> Password: {'*' * len(generated_password)}")
-            time.sleep(pause_time)
+            pause(pause_time)
 
         # --- Level 3: Detailed ---
         if level_choice >= 3:
@@ -1750,42 +1834,38 @@ class SockSpy:
             # Detailed Location (overwrite L2 location)
             print(f"{self.texts['random_generating'].format(item='Detailed Location')}")
             detailed_location = self.profile.get("location", "Earth") # Start with previous if exists
-            if locations_data:
-                item, path = get_random_hierarchical_item(locations_data)
-                if item: path.append(item) # Add leaf node if found
+            if locations_index:
+                item, path = locations_index.sample(self.rng)
+                if item: path = path + (item,) # Add leaf node if found (path tuple is shared)
                 # Take up to 4 elements (e.g., City, Region, Country, Continent)
                 parts = path[:4]
                 if parts: detailed_location = ", ".join(reversed(parts))
             self.profile["location"] = detailed_location # Overwrite location
             print(f"-> Location: {self.profile['location']}")
-            time.sleep(pause_time)
+            pause(pause_time)
             # Platforms
             print(f"{self.texts['random_generating'].format(item='Platforms')}")
             possible_platforms = [
                 "Twitter", "Facebook", "Instagram", "Reddit", "LinkedIn", "TikTok",
                 "Pinterest", "YouTube", "Discord", "Telegram", "Snapchat", "Mastodon", "Bluesky"
             ]
-            num_platforms = random.randint(1, 4) # Choose 1 to 4 platforms
+            num_platforms = self.rng.randint(1, 4) # Choose 1 to 4 platforms
             num_platforms = min(num_platforms, len(possible_platforms)) # Ensure not asking for more than available
-            selected_platforms = random.sample(possible_platforms, num_platforms)
+            selected_platforms = self.rng.sample(possible_platforms, num_platforms)
             self.profile["platforms"] = selected_platforms
             print(f"-> Platforms: {', '.join(self.profile['platforms'])}")
-            time.sleep(pause_time)
+            pause(pause_time)
             # Interests (multiple random hierarchical)
             print(f"{self.texts['random_generating'].format(item='Interests')}")
-            selected_interests = []
-            if interests_data:
-                attempts = 0
-                max_interests_to_add = 5
+            max_interests_to_add = 5
+            selected_interests = OrderedSelection(limit=max_interests_to_add)
+            if interests_index:
                 max_attempts_per_interest = 15 # Prevent infinite loop if data is sparse
-                while len(selected_interests) < max_interests_to_add and attempts < max_attempts_per_interest * max_interests_to_add:
-                    item, _ = get_random_hierarchical_item(interests_data)
-                    if item and item not in selected_interests:
-                        selected_interests.append(item)
-                    attempts += 1
-            self.profile["interests"] = selected_interests
+                selected_interests.fill(lambda: interests_index.sample(self.rng)[0],
+                                        max_attempts_per_interest * max_interests_to_add)
+            self.profile["interests"] = selected_interests.to_list()
             print(f"-> Interests: {', '.join(self.profile['interests']) if self.profile['interests'] else '(None found)'}")
-            time.sleep(pause_time)
+            pause(pause_time)
 
         # --- Level 4: Full ---
         if level_choice >= 4:
@@ -1794,12 +1874,12 @@ class SockSpy:
             print(f"{self.texts['random_generating'].format(item='Common Phrases')}")
             selected_phrases = []
             if phrases_data:
-                num_phrases = random.randint(1, 3) # Choose 1 to 3 phrases
+                num_phrases = self.rng.randint(1, 3) # Choose 1 to 3 phrases
                 num_phrases = min(num_phrases, len(phrases_data)) # Ensure not asking for more than available
-                selected_phrases = random.sample(phrases_data, num_phrases)
+                selected_phrases = self.rng.sample(phrases_data, num_phrases)
             self.profile["common_phrases"] = selected_phrases
             print(f"-> Common Phrases: {len(self.profile['common_phrases'])} added")
-            time.sleep(pause_time)
+            pause(pause_time)
             # Profile Picture (filtered by gender if possible)
             print(f"{self.texts['random_generating'].format(item='Profile Picture')}")
             picture_url = None
@@ -1808,15 +1888,15 @@ class SockSpy:
                 gender_path_part = "/men/" if self.profile.get("gender") == "male" else "/women/"
                 gender_specific_pics = [p for p in pictures_data if gender_path_part in p.lower()]
                 if gender_specific_pics:
-                    picture_url = random.choice(gender_specific_pics)
+                    picture_url = self.rng.choice(gender_specific_pics)
                 elif pictures_data: # Fallback to any picture if no gender-specific found
-                    picture_url = random.choice(pictures_data)
+                    picture_url = self.rng.choice(pictures_data)
 
                 if picture_url:
                     self.profile["profile_picture"] = picture_url
                     picture_added = True
             print(f"-> Picture Added: {'Yes' if picture_added else 'No'}")
-            time.sleep(pause_time)
+            pause(pause_time)
 
         # --- Completion & Save Prompt ---
         print(f"\n{self.texts['random_generation_complete']}") # CORRECTED: Separated
@@ -1845,27 +1925,342 @@ class SockSpy:
 
 
 # ==============================================================================
-# Main Execution Block
+# Command line interface (headless: no screen clearing, art, prompts or pauses)
 # ==============================================================================
-def main():
-    """Main function to run the Sock Spy application."""
-    # Perform environment checks if necessary (e.g., Python version)
-    if sys.version_info < (3, 8): # Example check
-         print("Sock Spy requires Python 3.8 or newer.")
-         sys.exit(1)
-
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
+EXPORTS_DIR = os.path.join(BASE_DIR, "exports")
+STORE_PATH = os.path.join(BASE_DIR, "personas.db") # SQLite persona store (see persona_store.py)
+
+GENERATE_FORMATS = ("jsonl", "json", "dir", "sqlite", "parquet", "arrow")
+
+
+def _report(message):
+    """Progress/summary output of headless commands goes to stderr, keeping stdout for data."""
+    print(message, file=sys.stderr)
+
+
+def _cmd_generate(args):
+    """Generate personas without interaction and write them in the requested format."""
+    if args.backend == "numpy" and args.workers > 1:
+        _report("--workers applies to the python backend only; the numpy backend runs in one process.")
+        return 2
+    from sampling import BRANCH, UNIFORM
+    sampling_mode = BRANCH if args.sampling == "branch" else UNIFORM
+    start = time.perf_counter()
+
+    batches = None
+    if args.backend == "numpy":
+        from columnar import ColumnarGenerator
+        columnar = ColumnarGenerator(DATA_DIR, args.seed, sampling_mode)
+        if args.format in ("parquet", "arrow"):
+            batches = columnar.iter_batches(args.count, args.level)
+        else:
+            personas = columnar.iter_personas(args.count, args.level)
+    elif args.workers and args.workers > 1:
+        from generator import iter_personas_parallel
+        personas = iter_personas_parallel(args.count, args.level, args.seed, args.workers,
+                                          data_dir=DATA_DIR, sampling_mode=sampling_mode)
+    else:
+        from generator import PersonaGenerator
+        personas = PersonaGenerator(DATA_DIR, args.seed, sampling_mode).iter_personas(args.count, args.level)
+
+    if args.format == "json":
+        if args.output in (None, "-"):
+            json.dump(list(personas), sys.stdout, ensure_ascii=False, separators=(",", ":"))
+            sys.stdout.write("\n")
+        else:
+            from generator import save_personas
+            if not save_personas(personas, args.output):
+                return 1
+        written = args.count
+    else:
+        from sinks import JsonlSink, DirectorySink, SqliteSink, ArrowSink, write_personas
+        if args.format == "jsonl":
+            sink = JsonlSink(args.output or "-")
+        elif args.format == "dir":
+            from persona_index import PersonaIndex
+            output_dir = args.output or PROFILES_DIR
+            index = PersonaIndex(output_dir) if os.path.abspath(output_dir) == PROFILES_DIR else None
+            sink = DirectorySink(output_dir, index=index)
+        elif args.format == "sqlite":
+            sink = SqliteSink(args.output or STORE_PATH)
+        else:
+            if not args.output:
+                _report(f"--output is required for the {args.format} format.")
+                return 2
+            sink = ArrowSink(args.output, format=args.format)
+
+        if batches is not None:
+            with sink:
+                for batch in batches:
+                    sink.write_batch(batch)
+            written = sink.count
+        else:
+            written = write_personas(personas, sink)
+
+    seconds = time.perf_counter() - start
+    _report(f"Generated {written} persona(s) at level {args.level} in {seconds:.2f}s "
+            f"({written / seconds if seconds > 0 else 0:.0f}/s).")
+    return 0
+
+
+def _cmd_list(args):
+    """List saved personas from the persona index."""
+    filters = {"name": args.name, "nationality": args.nationality, "min_age": args.min_age, "max_age": args.max_age}
+    if not os.path.exists(args.db if args.db else args.profiles_dir):
+        rows, total = [], 0 # Nothing saved yet; don't create an empty directory or database
+    else:
+        if args.db:
+            from persona_store import PersonaStore
+            index = PersonaStore(args.db)
+        else:
+            from persona_index import PersonaIndex
+            index = PersonaIndex(args.profiles_dir)
+        try:
+            rows = index.list(args.offset, args.limit, **filters)
+            total = index.count(**filters)
+        finally:
+            index.close()
+    if args.json:
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False))
+    else:
+        for row in rows:
+            details = ", ".join(str(v) for v in (
+                (row["nationality"] or "").capitalize(), row["age"], row["profession"]) if v)
+            print((row["name"] if args.db else row["filename"][:-5]) + (f" ({details})" if details else ""))
+    _report(f"Showing {len(rows)} of {total} persona(s).")
+    return 0
+
+
+def _cmd_export(args):
+    """Export every saved profile (see bulk_export.py)."""
+    from bulk_export import bulk_export, format_summary, PROFILE_FORMATS
+    summary = bulk_export(args.profiles_dir, args.exports_dir, args.formats or PROFILE_FORMATS,
+                          args.workers, args.processes, args.force)
+    _report(format_summary(summary))
+    return 1 if summary["failed"] else 0
+
+
+def _cmd_stats(args):
+    """Print dataset sizes and saved persona statistics."""
+    datasets = get_registry(DATA_DIR)
+    name_counts = load_name_counts()
+    stats = {
+        "nationalities_with_names": sum(1 for c in name_counts.values() if c.get("last") and (c.get("male") or c.get("female"))),
+        "first_names": sum(c.get("male", 0) + c.get("female", 0) for c in name_counts.values()),
+        "last_names": sum(c.get("last", 0) for c in name_counts.values()),
+        "professions": len(datasets.load_hierarchy("professions.json")),
+        "locations": len(datasets.load_hierarchy("locations.json")),
+        "interests": len(datasets.load_hierarchy("interests.json")),
+        "common_phrases": len(datasets.load_lines(os.path.join("common_phrases", "english.txt")) or []),
+        "profile_pictures": len(datasets.load_lines("profile_pictures.txt") or []),
+    }
+    if os.path.isdir(args.profiles_dir):
+        from persona_index import PersonaIndex
+        index = PersonaIndex(args.profiles_dir)
+        try:
+            stats["saved_personas"] = index.stats()
+        finally:
+            index.close()
+    else: # Nothing saved yet; don't create the directory just to report that
+        stats["saved_personas"] = {"count": 0, "min_age": None, "max_age": None, "mean_age": None, "nationalities": {}}
+
+    if args.json:
+        print(json.dumps(stats, indent=2, ensure_ascii=False))
+        return 0
+    for key, value in stats.items():
+        if key != "saved_personas":
+            print(f"{key.replace('_', ' ').capitalize()}: {value}")
+    saved = stats["saved_personas"]
+    print(f"Saved personas: {saved['count']}")
+    if saved["count"]:
+        print(f"  Age: {saved['min_age']}-{saved['max_age']} (mean {saved['mean_age']})")
+        for nationality, count in saved["nationalities"].items():
+            print(f"  {nationality.capitalize()}: {count}")
+    return 0
+
+
+def _cmd_store(args):
+    """Copy personas between the SQLite store and a profiles directory."""
+    from persona_store import PersonaStore
+    start = time.perf_counter()
+    with PersonaStore(args.db) as store:
+        if args.action == "import":
+            moved = store.import_json_dir(args.profiles_dir)
+        else:
+            index = None
+            if os.path.abspath(args.profiles_dir) == PROFILES_DIR:
+                from persona_index import PersonaIndex
+                index = PersonaIndex(args.profiles_dir)
+            moved = store.export_json_dir(args.profiles_dir, index=index)
+            if index is not None:
+                index.close()
+        total = len(store)
+    seconds = time.perf_counter() - start
+    _report(f"{args.action.capitalize()}ed {moved} persona(s) in {seconds:.2f}s; the store holds {total}.")
+    return 0
+
+
+def _cmd_rebuild_cache(args):
+    """Recount name files, rebuild the persona index and optionally the data pack."""
     app = SockSpy()
+    app._update_name_counts_cache(force=args.force)
+    indexed = app.persona_index.rebuild()
+    app.persona_index.close()
+    print(f"Persona index rebuilt: {indexed} profile(s).")
+    if args.pack:
+        from datapack import build_pack, DEFAULT_PACK_PATH
+        summary = build_pack(app.data_dir, DEFAULT_PACK_PATH)
+        print(f"Data pack written to {DEFAULT_PACK_PATH}: {summary['entries']} datasets, {summary['bytes']} bytes.")
+    return 0
+
+
+class StartupProfile:
+    """
+    Wall-clock marks for --profile-startup, measured from the top of main.py.
+
+    Interpreter start-up (before main.py runs) is not included.
+    """
+
+    def __init__(self):
+        self.marks = [("imports", _IMPORTS_DONE)]
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter()))
+
+    def report(self):
+        lines = ["Start-up profile (ms since main.py started):"]
+        previous = _STARTUP_T0
+        for label, stamp in self.marks:
+            lines.append(f"  {label:<20} {1000 * (stamp - previous):8.2f}   (total {1000 * (stamp - _STARTUP_T0):8.2f})")
+            previous = stamp
+        lines.append(f"  modules loaded: {len(sys.modules)}")
+        _report("\n".join(lines))
+
+
+def _non_negative_int(text):
+    """argparse type for counts, offsets and limits."""
+    import argparse
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{text}'")
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, got {value}")
+    return value
+
+
+def _positive_int(text):
+    """argparse type for worker counts."""
+    import argparse
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{text}'")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be 1 or more, got {value}")
+    return value
+
+
+def build_arg_parser():
+    """Argument parser for the headless subcommands (none given = interactive menu)."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="sock_spy",
+        description="Sock Spy: generate OSINT sock puppet personas. Run without a command for the interactive menu.",
+    )
+    parser.add_argument("--seed", type=int, help="Seed for reproducible output (interactive mode and generate).")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print where start-up time goes (to stderr) before the first prompt or after a command.")
+    parser.add_argument("--metrics", nargs="?", const="", metavar="PATH",
+                        help="Time each stage and count cache hits and file opens; print a summary at exit and "
+                             "write it to PATH (.json, else Prometheus text). Same as SOCKSPY_METRICS=1|PATH.")
+    parser.add_argument("--pace", choices=PACE_MODES,
+                        help="UI pauses: interactive (as written), fast (shortened) or none. Defaults to "
+                             "SOCKSPY_PACE, else interactive on a terminal and none otherwise.")
+    parser.add_argument("--profile", nargs="?", const="", metavar="BASE",
+                        help="Run under cProfile and a stack sampler (waits in input/sleep excluded); writes "
+                             "BASE.pstats and BASE.collapsed (default: sockspy-<command>-<time> next to the output).")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    generate = commands.add_parser("generate", help="Generate random personas without prompts.")
+    generate.add_argument("--count", type=_non_negative_int, default=1)
+    generate.add_argument("--level", type=int, default=4, choices=range(1, 5), help="1 Minimal, 2 Standard, 3 Detailed, 4 Full.")
+    generate.add_argument("--seed", type=int, default=argparse.SUPPRESS, help="Seed for reproducible output.")
+    generate.add_argument("--format", default="jsonl", choices=GENERATE_FORMATS,
+                          help="jsonl/json to stdout or --output, dir = one JSON per persona, sqlite = persona store, parquet/arrow need --output.")
+    generate.add_argument("--output", help="Output file or directory (default: stdout, profiles/ for dir, personas.db for sqlite).")
+    generate.add_argument("--workers", type=_positive_int, default=1, help="Processes for the python backend.")
+    generate.add_argument("--sampling", choices=("uniform", "branch"), default="uniform")
+    generate.add_argument("--backend", choices=("python", "numpy"), default="python",
+                          help="numpy draws whole batches as columns (needs NumPy).")
+    generate.set_defaults(handler=_cmd_generate)
+
+    list_cmd = commands.add_parser("list", help="List saved personas.")
+    list_cmd.add_argument("--name")
+    list_cmd.add_argument("--nationality")
+    list_cmd.add_argument("--min-age", type=int)
+    list_cmd.add_argument("--max-age", type=int)
+    list_cmd.add_argument("--offset", type=_non_negative_int, default=0)
+    list_cmd.add_argument("--limit", type=_non_negative_int, default=50)
+    list_cmd.add_argument("--json", action="store_true", help="One JSON object per line.")
+    list_cmd.add_argument("--profiles-dir", default=PROFILES_DIR)
+    list_cmd.add_argument("--db", help="List from a SQLite persona store instead (name matches by prefix).")
+    list_cmd.set_defaults(handler=_cmd_list)
+
+    export = commands.add_parser("export", help="Export every saved persona in parallel.")
+    export.add_argument("--format", dest="formats", action="append",
+                        choices=("txt", "json", "parquet", "arrow"), help="Repeat for several formats (default: txt and json).")
+    export.add_argument("--profiles-dir", default=PROFILES_DIR)
+    export.add_argument("--exports-dir", default=EXPORTS_DIR)
+    export.add_argument("--workers", type=_positive_int)
+    export.add_argument("--processes", action="store_true", help="Use processes instead of threads.")
+    export.add_argument("--force", action="store_true", help="Re-export up-to-date profiles too.")
+    export.set_defaults(handler=_cmd_export)
+
+    stats = commands.add_parser("stats", help="Show dataset and saved persona statistics.")
+    stats.add_argument("--json", action="store_true")
+    stats.add_argument("--profiles-dir", default=PROFILES_DIR)
+    stats.set_defaults(handler=_cmd_stats)
+
+    store = commands.add_parser("store", help="Copy personas between the SQLite store and the profiles directory.")
+    store.add_argument("action", choices=("import", "export"),
+                       help="import: profile JSON files into the store, export: store into profile JSON files.")
+    store.add_argument("--db", default=STORE_PATH)
+    store.add_argument("--profiles-dir", default=PROFILES_DIR)
+    store.set_defaults(handler=_cmd_store)
+
+    rebuild = commands.add_parser("rebuild-cache", help="Refresh name_counts.json and the persona index.")
+    rebuild.add_argument("--force", action="store_true", help="Recount every name file.")
+    rebuild.add_argument("--pack", action="store_true", help="Also compile the data pack (see datapack.py).")
+    rebuild.set_defaults(handler=_cmd_rebuild_cache)
+
+    return parser
+
+
+def run_interactive(seed=None, startup=None):
+    """
+    Start the interactive menu (the default when no command is given).
+
+    Data files, the name counts cache and the persona index are all loaded on
+    first use, so nothing but the logo stands between launch and the prompt.
+    """
+    app = SockSpy(seed)
+    if startup: startup.mark("app init")
+    enable_screen_buffering() # One write per screen, flushed by each prompt
     try:
-        # --- Add Cache Update Call Here ---
         clear_screen()
-        display_ascii_art(app.data_dir) # Show logo while processing
-        print("\nPerforming startup tasks...")
-        app._update_name_counts_cache() # Run the calculation
-        # --- End Cache Update Call ---
+        display_ascii_art(app.data_dir)
+        if startup:
+            startup.mark("splash")
+            startup.report()
 
-        # Proceed with normal startup
         # app.display_welcome() # Welcome message is now part of display_welcome
-        input("Press Enter to proceed to the main menu...") # Pause after cache update
+        input("Press Enter to proceed to the main menu...")
 
         app.main_menu() # Go to main menu
 
@@ -1881,6 +2276,7 @@ def main():
         print(f"An error occurred: {e}")
         import traceback
         print("\n--- Traceback ---")
+        sys.stdout.flush() # Keep the header above the traceback (stderr is unbuffered)
         traceback.print_exc()
         print("\n--------------------")
         print("Please report this issue if it persists.")
@@ -1888,5 +2284,67 @@ def main():
         sys.exit(1)
 
 
+def _run_command(args, startup=None):
+    """Run the selected headless command and return its exit status."""
+    try:
+        status = args.handler(args)
+    except KeyboardInterrupt:
+        _report("Interrupted.")
+        return 130
+    except BrokenPipeError:
+        # Output piped into e.g. `head`; nothing left to report
+        return 0
+    except (MissingDependencyError, OSError) as e:
+        # A missing optional package or an unusable --output/--db path; anything else is a bug and raises
+        _report(f"Error: {e}")
+        return 2
+    if startup:
+        startup.mark(args.command)
+        startup.report()
+    return status
+
+
+def _default_profile_base(args):
+    """Path prefix of --profile output: next to the command's --output, else in the current directory."""
+    directory = os.getcwd()
+    output = getattr(args, "output", None)
+    if output and output != "-":
+        directory = os.path.dirname(os.path.abspath(output))
+    return os.path.join(directory, f"sockspy-{args.command or 'interactive'}-{time.strftime('%Y%m%d-%H%M%S')}")
+
+
+def main(argv=None):
+    """Main function to run the Sock Spy application."""
+    # Perform environment checks if necessary (e.g., Python version)
+    if sys.version_info < (3, 8): # Example check
+         print("Sock Spy requires Python 3.8 or newer.")
+         sys.exit(1)
+
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        run_interactive() # Plain launch: skip argparse altogether
+        return
+
+    args = build_arg_parser().parse_args(argv)
+    if args.metrics is not None:
+        METRICS.enable(args.metrics or None)
+    if args.pace:
+        PACING.set_mode(args.pace)
+    startup = StartupProfile() if args.profile_startup else None
+    if startup: startup.mark("argument parsing")
+
+    if args.command is None:
+        action = lambda: run_interactive(args.seed, startup)
+    else:
+        action = lambda: _run_command(args, startup)
+    if args.profile is not None:
+        from profiling import profile_call
+        profiled, output_base = action, args.profile or _default_profile_base(args)
+        action = lambda: profile_call(profiled, output_base)
+
+    status = action()
+    if args.command is not None:
+        sys.exit(status)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
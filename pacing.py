@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2025 Kanarath.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+------------------------
+UI pacing policy.
+
+The interactive screens pause briefly so messages can be read before the
+next redraw. Every such pause goes through pause() instead of time.sleep(),
+so one setting decides how long they last:
+
+    interactive   the pauses as written (default on a terminal)
+    fast          a tenth of each pause, capped at 0.2 s
+    none          no pauses at all (default when stdin or stdout is not a terminal)
+
+Choose with main.py --pace MODE or the SOCKSPY_PACE variable.
+"""
+
+import os
+import sys
+import time
+
+INTERACTIVE = "interactive"
+FAST = "fast"
+NONE = "none"
+PACE_MODES = (INTERACTIVE, FAST, NONE)
+
+PACE_ENV_VAR = "SOCKSPY_PACE"
+FAST_FACTOR = 0.1
+FAST_MAX_PAUSE = 0.2 # Seconds
+
+
+def default_mode():
+    """SOCKSPY_PACE if set, else interactive on a terminal and none for pipes and scripts."""
+    mode = os.environ.get(PACE_ENV_VAR, "").strip().lower()
+    if mode in PACE_MODES:
+        return mode
+    if mode:
+        print(f"Warning: Unknown {PACE_ENV_VAR} value '{mode}'. Use one of: {', '.join(PACE_MODES)}.",
+              file=sys.stderr) # Decided at import time, so keep it out of headless stdout output
+    try:
+        on_terminal = sys.stdin.isatty() and sys.stdout.isatty()
+    except (AttributeError, ValueError): # Streams replaced or closed
+        on_terminal = False
+    return INTERACTIVE if on_terminal else NONE
+
+
+class Pacing:
+    """Scales the UI pauses according to the active mode."""
+
+    def __init__(self, mode=None):
+        self.mode = None
+        self.set_mode(mode or default_mode())
+
+    def set_mode(self, mode):
+        if mode not in PACE_MODES:
+            raise ValueError(f"Unknown pacing mode '{mode}'. Use one of: {', '.join(PACE_MODES)}.")
+        self.mode = mode
+
+    def duration(self, seconds):
+        """How long a pause written as ``seconds`` lasts in the current mode."""
+        if self.mode == INTERACTIVE:
+            return seconds
+        if self.mode == FAST:
+            return min(seconds * FAST_FACTOR, FAST_MAX_PAUSE)
+        return 0.0
+
+    def pause(self, seconds):
+        """Wait ``seconds`` (scaled by the mode); returns immediately in "none" mode."""
+        seconds = self.duration(seconds)
+        if seconds > 0:
+            sys.stdout.flush() # Show the message being paused on (stdout may be block-buffered)
+            time.sleep(seconds)
+
+
+PACING = Pacing()
+
+
+def pause(seconds):
+    """Pause the UI through the shared pacing policy."""
+    PACING.pause(seconds)
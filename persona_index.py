@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2025 Kanarath.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+------------------------
+On-disk index of saved personas.
+
+A small SQLite table next to the profiles holds the fields shown when listing
+(name, nationality, age, profession, created-at, path), so listing, paging and
+filtering never have to open every profile JSON. The profile files remain the
+source of truth. save_profile(), edits and deletes keep the index current, so
+opening it costs one stat of the directory; only when the directory mtime
+differs from the one seen at the last reconcile are the files stat'ed (one
+stat each) and the new or changed ones re-read. Each entry records the size
+and mtime of its file, and every listed page is re-checked against them, so
+profiles edited in place (which leaves the directory mtime alone) are
+refreshed when shown.
+"""
+
+import os
+import time
+import sqlite3
+
+from utils import load_json_file
+
+INDEX_FILENAME = ".persona_index.sqlite"
+INDEX_SCHEMA_VERSION = "2" # v2 added the per-file size and mtime
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS personas (
+    filename    TEXT PRIMARY KEY,
+    path        TEXT NOT NULL,
+    first_name  TEXT,
+    last_name   TEXT,
+    nationality TEXT,
+    age         INTEGER,
+    profession  TEXT,
+    created_at  REAL,
+    size        INTEGER,
+    mtime_ns    INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_personas_nationality ON personas (nationality);
+CREATE INDEX IF NOT EXISTS idx_personas_age ON personas (age);
+CREATE INDEX IF NOT EXISTS idx_personas_last_name ON personas (last_name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_UPSERT = """
+INSERT INTO personas (filename, path, first_name, last_name, nationality, age, profession, created_at, size, mtime_ns)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(filename) DO UPDATE SET
+    path = excluded.path,
+    first_name = excluded.first_name,
+    last_name = excluded.last_name,
+    nationality = excluded.nationality,
+    age = excluded.age,
+    profession = excluded.profession,
+    size = excluded.size,
+    mtime_ns = excluded.mtime_ns
+"""
+
+# Columns returned by list(); size and mtime_ns are only used for syncing
+_COLUMNS = ("filename", "path", "first_name", "last_name", "nationality", "age", "profession", "created_at")
+
+
+def escape_like(text):
+    """Escape LIKE wildcards so user text matches literally (with ESCAPE '\\')."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class PersonaIndex:
+    """SQLite-backed listing index for a profiles directory."""
+
+    def __init__(self, profiles_dir):
+        self.profiles_dir = profiles_dir
+        self.db_path = os.path.join(profiles_dir, INDEX_FILENAME)
+        self._conn = None
+        self._synced = False
+
+    # --------------------------------------------------------------------------
+    # Connection / consistency
+    # --------------------------------------------------------------------------
+
+    def _connect(self):
+        if self._conn is None:
+            if not os.path.exists(self.profiles_dir):
+                os.makedirs(self.profiles_dir)
+            self._conn = sqlite3.connect(self.db_path)
+            # The index is a rebuildable cache: keep the journal in memory and skip
+            # fsyncs, so commits don't create files next to the profiles.
+            self._conn.execute("PRAGMA journal_mode=MEMORY")
+            self._conn.execute("PRAGMA synchronous=OFF")
+            self._conn.executescript(_SCHEMA)
+            if self._get_meta("schema_version") != INDEX_SCHEMA_VERSION:
+                # Older layout: start over, the next sync() fills the table again
+                self._conn.execute("DROP TABLE personas")
+                self._conn.execute("DELETE FROM meta WHERE key = 'dir_mtime_ns'")
+                self._conn.executescript(_SCHEMA)
+                self._set_meta("schema_version", INDEX_SCHEMA_VERSION)
+                self._conn.commit()
+        return self._conn
+
+    def _get_meta(self, key):
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self._connect().execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _dir_mtime(self):
+        try:
+            return str(os.stat(self.profiles_dir).st_mtime_ns)
+        except OSError:
+            return None
+
+    def _scan(self):
+        """{filename: (size, mtime_ns)} of every profile JSON in the directory."""
+        files = {}
+        with os.scandir(self.profiles_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.is_file():
+                    st = entry.stat()
+                    files[entry.name] = (st.st_size, st.st_mtime_ns)
+        return files
+
+    def _load_rows(self, filenames):
+        """Index rows for the given profile files (unreadable ones are skipped)."""
+        rows = []
+        for filename in filenames:
+            path = os.path.join(self.profiles_dir, filename)
+            profile = load_json_file(path)
+            if isinstance(profile, dict):
+                rows.append(self._row(path, profile))
+        return rows
+
+    def sync(self, force=False):
+        """
+        Bring the index up to date with the profiles directory.
+
+        While the directory mtime is the one recorded at the last reconcile this
+        is a single stat. Otherwise (files were added, removed or renamed, by us
+        or anyone else) every profile file is stat'ed and only new or changed
+        ones are parsed. ``force`` reconciles regardless of the mtime.
+        """
+        conn = self._connect()
+        dir_mtime = self._dir_mtime() # Read before scanning, so a change made during the scan shows up next time
+        if force or dir_mtime is None or self._get_meta("dir_mtime_ns") != dir_mtime:
+            on_disk = self._scan()
+            indexed = {filename: (size, mtime_ns)
+                       for filename, size, mtime_ns in conn.execute("SELECT filename, size, mtime_ns FROM personas")}
+            changed = [filename for filename, stats in on_disk.items() if indexed.get(filename) != stats]
+            removed = [(filename,) for filename in indexed if filename not in on_disk]
+            with conn:
+                conn.executemany("DELETE FROM personas WHERE filename = ?", removed)
+                conn.executemany(_UPSERT, self._load_rows(changed))
+                self._set_meta("dir_mtime_ns", dir_mtime)
+        self._synced = True
+        return conn
+
+    def ensure_synced(self):
+        """sync() once per PersonaIndex instance; cheap afterwards (list() re-checks each page)."""
+        if not self._synced:
+            return self.sync()
+        return self._connect()
+
+    def rebuild(self):
+        """Re-scan every profile JSON in the directory. Returns the number indexed."""
+        conn = self._connect()
+        dir_mtime = self._dir_mtime()
+        rows = self._load_rows(self._scan())
+        with conn:
+            conn.execute("DELETE FROM personas")
+            conn.executemany(_UPSERT, rows)
+            self._set_meta("dir_mtime_ns", dir_mtime)
+        self._synced = True
+        return len(rows)
+
+    # --------------------------------------------------------------------------
+    # Updates (called by save_profile, edits and deletes)
+    # --------------------------------------------------------------------------
+
+    def _row(self, path, profile):
+        age = profile.get("age")
+        try:
+            st = os.stat(path)
+            created_at, size, mtime_ns = st.st_mtime, st.st_size, st.st_mtime_ns
+        except OSError:
+            created_at, size, mtime_ns = time.time(), None, None # Re-read on the next sync
+        return (
+            os.path.basename(path),
+            path,
+            profile.get("first_name"),
+            profile.get("last_name"),
+            profile.get("nationality"),
+            age if isinstance(age, int) else None,
+            profile.get("profession"),
+            created_at,
+            size,
+            mtime_ns,
+        )
+
+    def upsert(self, path, profile, commit=True):
+        """Add or refresh the entry for the profile saved at ``path`` (created_at is kept)."""
+        conn = self._connect()
+        conn.execute(_UPSERT, self._row(path, profile))
+        if commit:
+            self.commit()
+
+    def remove(self, path, commit=True):
+        """Drop the entry for a deleted profile."""
+        conn = self._connect()
+        conn.execute("DELETE FROM personas WHERE filename = ?", (os.path.basename(path),))
+        if commit:
+            self.commit()
+
+    def commit(self):
+        """Commit pending updates."""
+        self._connect().commit()
+
+    def _refresh_page(self, rows):
+        """
+        Re-stat the files of a listed page and re-index any that changed.
+
+        Returns True if an entry was updated or dropped.
+        """
+        conn = self._connect()
+        stale = []
+        for row in rows:
+            try:
+                st = os.stat(row["path"])
+                current = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                current = None
+            if current != (row["size"], row["mtime_ns"]):
+                stale.append(row["filename"])
+        if not stale:
+            return False
+        on_disk = [filename for filename in stale if os.path.exists(os.path.join(self.profiles_dir, filename))]
+        with conn:
+            conn.executemany("DELETE FROM personas WHERE filename = ?", [(f,) for f in stale if f not in on_disk])
+            conn.executemany(_UPSERT, self._load_rows(on_disk))
+        return True
+
+    # --------------------------------------------------------------------------
+    # Queries
+    # --------------------------------------------------------------------------
+
+    @staticmethod
+    def _where(name=None, nationality=None, min_age=None, max_age=None):
+        clauses = []
+        params = []
+        if name:
+            clauses.append("(first_name LIKE ? ESCAPE '\\' OR last_name LIKE ? ESCAPE '\\' OR filename LIKE ? ESCAPE '\\')")
+            pattern = f"%{escape_like(name)}%"
+            params += [pattern, pattern, pattern]
+        if nationality:
+            clauses.append("nationality = ?")
+            params.append(nationality.lower())
+        if min_age is not None:
+            clauses.append("age >= ?")
+            params.append(min_age)
+        if max_age is not None:
+            clauses.append("age <= ?")
+            params.append(max_age)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, **filters):
+        """Number of indexed personas matching the filters (see list())."""
+        conn = self.ensure_synced()
+        where, params = self._where(**filters)
+        return conn.execute(f"SELECT COUNT(*) FROM personas{where}", params).fetchone()[0]
+
+    def list(self, offset=0, limit=20, **filters):
+        """
+        Return one page of personas as dicts, ordered by filename.
+
+        Filters: name (substring of first/last/file name), nationality,
+        min_age, max_age.
+        """
+        conn = self.ensure_synced()
+        where, params = self._where(**filters)
+        query = f"SELECT {', '.join(_COLUMNS)}, size, mtime_ns FROM personas{where} ORDER BY filename LIMIT ? OFFSET ?"
+        columns = _COLUMNS + ("size", "mtime_ns")
+        rows = [dict(zip(columns, row)) for row in conn.execute(query, params + [limit, offset])]
+        if self._refresh_page(rows): # Edited or deleted since the last sync: query the fresh entries
+            rows = [dict(zip(columns, row)) for row in conn.execute(query, params + [limit, offset])]
+        for row in rows:
+            del row["size"], row["mtime_ns"]
+        return rows
+
+    def stats(self, top=10):
+        """
+        Summary of the indexed personas.
+
+        Returns:
+            dict: count, min_age, max_age, mean_age and the ``top`` most common
+            nationalities as {nationality: count}.
+        """
+        conn = self.ensure_synced()
+        count, min_age, max_age, mean_age = conn.execute(
+            "SELECT COUNT(*), MIN(age), MAX(age), AVG(age) FROM personas").fetchone()
+        nationalities = conn.execute(
+            "SELECT nationality, COUNT(*) AS n FROM personas GROUP BY nationality ORDER BY n DESC, nationality LIMIT ?",
+            (top,),
+        ).fetchall()
+        return {
+            "count": count,
+            "min_age": min_age,
+            "max_age": max_age,
+            "mean_age": round(mean_age, 1) if mean_age is not None else None,
+            "nationalities": {nat or "unknown": n for nat, n in nationalities},
+        }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2025 Kanarath.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+------------------------
+SQLite persona store: an alternative to one JSON file per persona.
+
+Every persona is one row: the full profile as compact JSON plus the fields
+used for lookups (names, nationality, gender, age, profession), which are
+indexed. The database runs in WAL mode, so readers never block the writer,
+and bulk writes go through executemany() in transactions of thousands of
+rows. AsyncPersonaWriter moves those writes to a background thread.
+
+import_json_dir() and export_json_dir() convert between the store and the
+profiles/ layout, whose JSON files stay readable by the interactive menu;
+``main.py store import|export`` runs them from the command line.
+"""
+
+import os
+import json
+import time
+import queue
+import sqlite3
+import threading
+
+from utils import load_json_file, save_profile
+from persona_index import escape_like
+
+DEFAULT_BATCH_SIZE = 5000 # Rows per transaction
+
+_TABLE = """
+CREATE TABLE IF NOT EXISTS personas (
+    id          INTEGER PRIMARY KEY,
+    name        TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    first_name  TEXT COLLATE NOCASE,
+    last_name   TEXT COLLATE NOCASE,
+    nationality TEXT,
+    gender      TEXT,
+    age         INTEGER,
+    profession  TEXT,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    data        TEXT NOT NULL
+);
+"""
+
+# Secondary indexes; dropped while bulk-loading an empty store and built once at the end
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_store_first_name ON personas (first_name);
+CREATE INDEX IF NOT EXISTS idx_store_last_name ON personas (last_name);
+CREATE INDEX IF NOT EXISTS idx_store_nationality_age ON personas (nationality, age);
+CREATE INDEX IF NOT EXISTS idx_store_age ON personas (age);
+"""
+
+# Re-saving a name keeps its id and created_at
+_UPSERT = """
+INSERT INTO personas (name, first_name, last_name, nationality, gender, age, profession, created_at, updated_at, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(name) DO UPDATE SET
+    first_name = excluded.first_name,
+    last_name = excluded.last_name,
+    nationality = excluded.nationality,
+    gender = excluded.gender,
+    age = excluded.age,
+    profession = excluded.profession,
+    updated_at = excluded.updated_at,
+    data = excluded.data
+"""
+
+_COLUMNS = ("name", "first_name", "last_name", "nationality", "gender", "age", "profession", "created_at", "updated_at")
+
+
+def persona_name(profile, number=None):
+    """Default store key of a persona: first_last (plus _NNNNNN), as the profile filenames."""
+    base = f"{profile.get('first_name', 'profile')}_{profile.get('last_name', '')}".lower().replace(" ", "_")
+    return base if number is None else f"{base}_{number:06d}"
+
+
+class PersonaStore:
+    """
+    Personas in one SQLite database.
+
+    Not thread-safe: use one PersonaStore per thread (AsyncPersonaWriter opens
+    its own). Several processes may read while one writes.
+
+    Args:
+        db_path (str): Database file, created (with parent dirs) if missing.
+        batch_size (int): Rows per transaction in put_many().
+    """
+
+    def __init__(self, db_path, batch_size=DEFAULT_BATCH_SIZE):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        # Profiles are plain trees of dicts/lists; skipping the circular-reference check saves ~30% per row
+        self._encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), check_circular=False).encode
+        directory = os.path.dirname(os.path.abspath(db_path))
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL") # WAL stays consistent; only the last commits can be lost on power failure
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA cache_size=-65536") # 64 MiB: keeps the index pages of a bulk load in memory
+        self._conn.execute("PRAGMA wal_autocheckpoint=10000") # Checkpoint every ~40 MiB of WAL, not every 4 MiB
+        self._conn.executescript(_TABLE + _INDEXES)
+
+    # --------------------------------------------------------------------------
+    # Writes
+    # --------------------------------------------------------------------------
+
+    def _row(self, name, profile, now):
+        age = profile.get("age")
+        return (
+            name,
+            profile.get("first_name"),
+            profile.get("last_name"),
+            profile.get("nationality"),
+            profile.get("gender"),
+            age if isinstance(age, int) else None,
+            profile.get("profession"),
+            now,
+            now,
+            self._encode(profile),
+        )
+
+    def put(self, name, profile):
+        """Save (or replace) one persona under ``name`` and commit."""
+        with self._conn:
+            self._conn.execute(_UPSERT, self._row(name, profile, time.time()))
+
+    def _write_batch(self, batch):
+        # Name order keeps the unique index inserts local; the sort is stable, so
+        # the last of several rows with the same name still wins
+        batch.sort(key=lambda row: row[0].lower())
+        with self._conn:
+            self._conn.executemany(_UPSERT, batch)
+
+    def _drop_indexes(self):
+        names = self._conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx\\_store\\_%' ESCAPE '\\'").fetchall()
+        for (name,) in names:
+            self._conn.execute(f"DROP INDEX {name}")
+
+    def begin_bulk_load(self):
+        """
+        Drop the secondary indexes if the store is empty; returns True if it did.
+
+        Loading into an unindexed table and building each index once at the end
+        is much faster than updating the indexes row by row. Call
+        end_bulk_load() when the load is over (queries work meanwhile, unindexed).
+        """
+        if self._conn.execute("SELECT 1 FROM personas LIMIT 1").fetchone():
+            return False
+        self._drop_indexes()
+        return True
+
+    def end_bulk_load(self):
+        """Build the secondary indexes again."""
+        self._conn.executescript(_INDEXES)
+
+    def put_many(self, items, bulk=None):
+        """
+        Save an iterable of (name, profile) pairs, ``batch_size`` rows per transaction.
+
+        A load of at least one full batch into an empty store drops the
+        secondary indexes and rebuilds them at the end (see begin_bulk_load()).
+        Pass ``bulk=False`` to leave the indexes alone, e.g. when the caller
+        manages bulk mode itself.
+
+        Returns:
+            int: Number of personas written.
+        """
+        row = self._row
+        written = 0
+        batch = []
+        bulk_load = False
+        now = time.time()
+        try:
+            for name, profile in items:
+                batch.append(row(name, profile, now))
+                if len(batch) >= self.batch_size:
+                    if not written and bulk is not False:
+                        bulk_load = self.begin_bulk_load()
+                    self._write_batch(batch)
+                    written += len(batch)
+                    batch = []
+                    now = time.time()
+            if batch:
+                self._write_batch(batch)
+                written += len(batch)
+        finally:
+            if bulk_load:
+                self.end_bulk_load()
+        return written
+
+    def last_id(self):
+        """Largest row id so far (0 for an empty store)."""
+        return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM personas").fetchone()[0]
+
+    def delete(self, name):
+        """Remove a persona; returns True if it existed."""
+        with self._conn:
+            return self._conn.execute("DELETE FROM personas WHERE name = ?", (name,)).rowcount > 0
+
+    # --------------------------------------------------------------------------
+    # Reads
+    # --------------------------------------------------------------------------
+
+    def get(self, name):
+        """The profile dict saved under ``name`` (None if there is none)."""
+        row = self._conn.execute("SELECT data FROM personas WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @staticmethod
+    def _where(name=None, nationality=None, min_age=None, max_age=None, gender=None):
+        # Name matching is by prefix so the NOCASE indexes serve it (a substring match would scan)
+        clauses = []
+        params = []
+        if name:
+            pattern = escape_like(name) + "%"
+            clauses.append("(first_name LIKE ? ESCAPE '\\' OR last_name LIKE ? ESCAPE '\\' OR name LIKE ? ESCAPE '\\')")
+            params += [pattern, pattern, pattern]
+        if nationality:
+            clauses.append("nationality = ?")
+            params.append(nationality.lower())
+        if gender:
+            clauses.append("gender = ?")
+            params.append(gender.lower())
+        if min_age is not None:
+            clauses.append("age >= ?")
+            params.append(min_age)
+        if max_age is not None:
+            clauses.append("age <= ?")
+            params.append(max_age)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, **filters):
+        """Number of personas matching the filters (see list())."""
+        where, params = self._where(**filters)
+        return self._conn.execute(f"SELECT COUNT(*) FROM personas{where}", params).fetchone()[0]
+
+    def list(self, offset=0, limit=20, **filters):
+        """
+        Return one page of persona summaries as dicts, ordered by name.
+
+        Filters: name (prefix of the first, last or store name, any case),
+        nationality, gender, min_age, max_age.
+        """
+        where, params = self._where(**filters)
+        cursor = self._conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM personas{where} ORDER BY name LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        )
+        return [dict(zip(_COLUMNS, row)) for row in cursor]
+
+    def iter_profiles(self, **filters):
+        """Yield (name, profile) for every matching persona, in name order."""
+        where, params = self._where(**filters)
+        for name, data in self._conn.execute(f"SELECT name, data FROM personas{where} ORDER BY name", params):
+            yield name, json.loads(data)
+
+    def __len__(self):
+        return self.count()
+
+    # --------------------------------------------------------------------------
+    # JSON bridge
+    # --------------------------------------------------------------------------
+
+    def import_json_dir(self, profiles_dir):
+        """
+        Load every profile JSON of ``profiles_dir``, keyed by file name without .json.
+
+        Returns:
+            int: Number of personas imported.
+        """
+        if not os.path.isdir(profiles_dir):
+            return 0
+
+        def items():
+            for filename in sorted(os.listdir(profiles_dir)):
+                if filename.endswith(".json"):
+                    profile = load_json_file(os.path.join(profiles_dir, filename))
+                    if isinstance(profile, dict):
+                        yield filename[:-5], profile
+
+        return self.put_many(items())
+
+    def export_json_dir(self, profiles_dir, index=None, **filters):
+        """
+        Write matching personas to ``profiles_dir`` as <name>.json (the interactive layout).
+
+        An optional persona_index.PersonaIndex is updated in one transaction.
+
+        Returns:
+            int: Number of profiles written.
+        """
+        if index is not None:
+            index.ensure_synced()
+        written = 0
+        for name, profile in self.iter_profiles(**filters):
+            path = save_profile(profile, name, profiles_dir)
+            if path:
+                if index is not None:
+                    index.upsert(path, profile, commit=False)
+                written += 1
+        if index is not None:
+            index.commit()
+        return written
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class AsyncPersonaWriter:
+    """
+    Writes personas to a PersonaStore from a background thread.
+
+    submit() only queues the persona, so the caller never waits on disk. The
+    thread commits ``batch_size`` rows per transaction, or whatever has queued
+    up after ``max_wait`` seconds if the producer is slower than that. Writing
+    into an empty store runs in bulk mode: the secondary indexes are dropped
+    when the writer opens the store and built once by close(). A full queue
+    makes submit() wait, keeping memory bounded. Errors in the writer thread
+    are raised by the next submit(), flush() or close().
+    """
+
+    _STOP = object()
+
+    def __init__(self, db_path, batch_size=DEFAULT_BATCH_SIZE, max_pending=None, max_wait=0.5):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.count = 0
+        self.last_id = 0 # Largest row id when the writer opened the store
+        self._queue = queue.Queue(max_pending or batch_size * 4)
+        self._error = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sockspy-persona-writer", daemon=True)
+        self._thread.start()
+        self._ready.wait() # Surface schema/open errors before the first submit()
+        self._raise_error()
+
+    def _next_batch(self):
+        """Block for one item, then gather up to batch_size within max_wait seconds."""
+        get = self._queue.get
+        batch = [get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size and batch[-1] is not self._STOP:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        try:
+            store = PersonaStore(self.db_path, self.batch_size)
+            self.last_id = store.last_id()
+            bulk = store.begin_bulk_load()
+        except (OSError, sqlite3.Error) as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        try:
+            stop = False
+            while not stop:
+                batch = self._next_batch()
+                if batch[-1] is self._STOP:
+                    batch.pop()
+                    stop = True
+                if batch and self._error is None:
+                    try:
+                        self.count += store.put_many(batch, bulk=False)
+                    except Exception as e: # Bad profiles (e.g. unencodable JSON) too, or the thread would die
+                        self._error = e # Keep draining so flush()/close() never hang
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+        finally:
+            try:
+                if bulk:
+                    store.end_bulk_load()
+            except sqlite3.Error as e:
+                self._error = self._error or e
+            store.close()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise RuntimeError(f"Persona store write failed: {self._error}") from self._error
+
+    def submit(self, name, profile):
+        """Queue one persona for writing."""
+        self._raise_error()
+        self._queue.put((name, profile))
+
+    def flush(self):
+        """Wait until everything submitted so far is committed."""
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """Commit the remaining personas, build the indexes if bulk loading and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2025 Kanarath.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+------------------------
+CPU profiling of any Sock Spy command (main.py --profile).
+
+profile_call() runs a function under cProfile and, at the same time, a
+sampling thread that records the main thread's stack every few milliseconds.
+It writes two files:
+
+    <base>.pstats      cProfile statistics (python -m pstats, snakeviz, ...)
+    <base>.collapsed   one "frame;frame;frame count" line per distinct stack,
+                       the collapsed format of flamegraph.pl, speedscope and
+                       py-spy --format raw
+
+Time spent blocked in input() or time.sleep() is left out of both: the
+cProfile clock stands still while the program waits, and no samples are
+taken then. The profiles therefore show CPU work, not how long someone took
+to answer a prompt.
+"""
+
+import os
+import sys
+import time
+import builtins
+import threading
+from collections import Counter
+
+DEFAULT_SAMPLE_INTERVAL = 0.005 # Seconds between stack samples
+TOP_FUNCTIONS = 15 # Printed to stderr when profiling ends
+_THIS_FILE = __file__
+
+
+class _BlockedClock:
+    """
+    perf_counter() minus the time spent inside the wrapped blocking calls.
+
+    While a blocking call runs the clock is frozen, so cProfile charges it
+    (and its callers) nothing for the wait.
+    """
+
+    def __init__(self):
+        self.blocked_total = 0.0
+        self.blocked_since = None
+
+    def __call__(self):
+        since = self.blocked_since
+        return (since if since is not None else time.perf_counter()) - self.blocked_total
+
+    def wrap(self, func):
+        clock = self
+
+        def blocking(*args, **kwargs):
+            if clock.blocked_since is not None: # Nested (e.g. sleep inside a patched input)
+                return func(*args, **kwargs)
+            clock.blocked_since = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                clock.blocked_total += time.perf_counter() - clock.blocked_since
+                clock.blocked_since = None
+
+        blocking.__wrapped__ = func
+        return blocking
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stack of one thread at a fixed interval into collapsed-stack counts.
+
+    Samples are skipped while ``is_blocked()`` returns True.
+    """
+
+    def __init__(self, thread_id, interval=DEFAULT_SAMPLE_INTERVAL, is_blocked=lambda: False):
+        super().__init__(name="sockspy-stack-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.is_blocked = is_blocked
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def _label(code):
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def run(self):
+        label = self._label
+        while not self._stop_event.wait(self.interval):
+            if self.is_blocked():
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                if code.co_filename != _THIS_FILE: # Leave out the profiler's own clock and wrappers
+                    stack.append(label(code))
+                frame = frame.f_back
+            if stack and not self._stop_event.is_set(): # The profiled call may have just ended
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def write(self, path):
+        """Write the collapsed stacks, most frequent first."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def profile_call(func, output_base, interval=DEFAULT_SAMPLE_INTERVAL, report=True):
+    """
+    Call ``func()`` under cProfile and the stack sampler and write both profiles.
+
+    Files are written even if ``func`` raises (including SystemExit from a menu's
+    Exit option); the exception then propagates.
+
+    Args:
+        func (callable): The work to profile, called without arguments.
+        output_base (str): Path prefix of the .pstats and .collapsed files.
+        interval (float): Seconds between stack samples.
+        report (bool): Print the top functions and the file names to stderr.
+
+    Returns:
+        The return value of ``func()``.
+    """
+    import cProfile
+    import pstats
+
+    directory = os.path.dirname(os.path.abspath(output_base))
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    clock = _BlockedClock()
+    originals = (builtins.input, time.sleep)
+    builtins.input = clock.wrap(builtins.input)
+    time.sleep = clock.wrap(time.sleep)
+
+    profiler = cProfile.Profile(clock)
+    sampler = StackSampler(threading.get_ident(), interval, lambda: clock.blocked_since is not None)
+    sampler.start()
+    try:
+        profiler.enable()
+        try:
+            return func()
+        finally:
+            profiler.disable()
+    finally:
+        sampler.stop()
+        builtins.input, time.sleep = originals
+
+        pstats_path = f"{output_base}.pstats"
+        collapsed_path = f"{output_base}.collapsed"
+        profiler.dump_stats(pstats_path)
+        sampler.write(collapsed_path)
+        if report:
+            stats = pstats.Stats(profiler, stream=sys.stderr)
+            stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+            print(f"Profile written to {pstats_path} and {collapsed_path} "
+                  f"({clock.blocked_total:.1f}s blocked in input/sleep excluded, "
+                  f"{sum(sampler.stacks.values())} samples).", file=sys.stderr)
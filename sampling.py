@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2025 Kanarath.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+------------------------
+Precomputed sampling structures for Sock Spy datasets
+"""
+
+import random
+
+UNIFORM = "uniform"
+BRANCH = "branch"
+
+
+class HierarchyIndex:
+    """
+    Flattened leaf index over a nested dict/list dataset (locations, interests,
+    professions).
+
+    ``leaves[i]`` is a leaf value and ``paths[i]`` the tuple of keys leading to
+    it. Leaves of the same list share a single path tuple.
+
+    Two sampling modes are supported:
+        - "uniform": every leaf is equally likely (O(1)).
+        - "branch":  a uniform choice at every level, like
+                     get_random_hierarchical_item, so leaves in small branches
+                     are more likely (O(1) via an alias table built on first use).
+
+    Unlike get_random_hierarchical_item, dead ends (empty dicts/lists, and
+    values that are neither dict nor list) are left out instead of being drawn
+    as (None, path), so "branch" matches its distribution conditioned on
+    reaching a leaf. The bundled datasets have no dead ends, where the two are
+    the same.
+    """
+
+    def __init__(self, data, max_depth=10):
+        self.leaves = []
+        self.paths = []
+        self._branch_weights = []
+        self._branch_sampler = None
+        self._collect(data, (), 1.0, max_depth)
+
+    def _collect(self, node, path, weight, depth_left):
+        """Depth-first walk filling the parallel arrays."""
+        if depth_left <= 0:
+            return
+        if isinstance(node, dict):
+            # Empty branches can't yield a leaf; skip them so weights stay normalised
+            children = [(k, v) for k, v in node.items() if isinstance(v, (dict, list)) and v]
+            for key, child in children:
+                self._collect(child, path + (key,), weight / len(children), depth_left - 1)
+        elif isinstance(node, list) and node:
+            leaf_weight = weight / len(node)
+            for item in node:
+                self.leaves.append(item)
+                self.paths.append(path)
+                self._branch_weights.append(leaf_weight)
+
+    def __len__(self):
+        return len(self.leaves)
+
+    def sample_index(self, rng=None, mode=UNIFORM):
+        """Return the index of a random leaf (raises IndexError if the index is empty)."""
+        if not self.leaves:
+            raise IndexError("cannot sample from an empty HierarchyIndex")
+        rng = rng or random
+        if mode == BRANCH:
+            if self._branch_sampler is None:
+                self._branch_sampler = AliasSampler(range(len(self.leaves)), self._branch_weights)
+            return self._branch_sampler.sample_index(rng)
+        return int(rng.random() * len(self.leaves))
+
+    def sample(self, rng=None, mode=UNIFORM):
+        """
+        Return (leaf, path) for a random leaf, or (None, ()) if there are no leaves.
+
+        Like get_random_hierarchical_item(), except that dead ends are never
+        drawn (see the class docstring) and path is a shared tuple that must
+        not be modified.
+        """
+        if not self.leaves:
+            return None, ()
+        i = self.sample_index(rng, mode)
+        return self.leaves[i], self.paths[i]
+
+
+class AliasSampler:
+    """
+    Walker's alias method: O(n) setup, O(1) weighted sampling.
+
+    Items with a weight of zero (or less) are dropped and can never be drawn.
+    """
+
+    def __init__(self, items, weights):
+        pairs = [(item, float(w)) for item, w in zip(items, weights) if w > 0]
+        self.items = [item for item, _ in pairs]
+        n = len(pairs)
+        self._prob = [1.0] * n
+        self._alias = list(range(n))
+        if n == 0:
+            return
+
+        total = sum(w for _, w in pairs)
+        scaled = [w * n / total for _, w in pairs]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self._prob[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftovers are 1.0 up to rounding error
+        for i in small + large:
+            self._prob[i] = 1.0
+
+    def __len__(self):
+        return len(self.items)
+
+    def sample_index(self, rng=None):
+        """Return the index (into ``items``) of a weighted random item."""
+        if not self.items:
+            raise IndexError("cannot sample from an empty AliasSampler")
+        u = (rng or random).random() * len(self.items)
+        i = int(u)
+        return i if (u - i) < self._prob[i] else self._alias[i]
+
+    def sample(self, rng=None):
+        """Return a weighted random item, or None if there are no items."""
+        if not self.items:
+            return None
+        return self.items[self.sample_index(rng)]
+
+
+class NationalitySampler:
+    """
+    Picks nationalities weighted by the size of their name corpora.
+
+    Built from name_counts.json counts; a nationality's weight for a gender is
+    the number of distinct first/last name combinations it offers, so a
+    nationality with an empty first or last name list is never picked.
+    """
+
+    def __init__(self, name_counts):
+        self._samplers = {}
+        for gender in ("male", "female"):
+            nationalities = sorted(name_counts) # Sorted so seeded runs don't depend on file order
+            weights = [
+                name_counts[nat].get(gender, 0) * name_counts[nat].get("last", 0)
+                for nat in nationalities
+            ]
+            self._samplers[gender] = AliasSampler(nationalities, weights)
+
+    def nationalities(self, gender):
+        """Nationalities that can be drawn for ``gender``."""
+        return list(self._samplers[gender].items)
+
+    def sample(self, gender, rng=None):
+        """Return a nationality key for ``gender``, or None if no corpus has names."""
+        return self._samplers[gender].sample(rng)
+
+
+class PermutationCursor:
+    """
+    Walks a random permutation of range(n) without materialising it.
+
+    take(k) draws the next k positions of a lazy Fisher-Yates shuffle: only the
+    swapped slots are kept (in a dict), so each call costs O(k) whatever n is,
+    and no index is returned twice until reset(). With ``shuffle=False`` the
+    cursor simply walks 0, 1, 2, ... (e.g. over ranked search results).
+    """
+
+    def __init__(self, n, rng=None, shuffle=True):
+        self.n = n
+        self.rng = rng or random
+        self.shuffle = shuffle
+        self.position = 0
+        self._swapped = {}
+
+    def remaining(self):
+        """Number of indices not handed out yet."""
+        return self.n - self.position
+
+    def take(self, k):
+        """Return up to ``k`` indices not returned before."""
+        end = min(self.n, self.position + k)
+        if not self.shuffle:
+            taken = list(range(self.position, end))
+        else:
+            taken = []
+            swapped = self._swapped
+            randrange = self.rng.randrange
+            for i in range(self.position, end):
+                j = randrange(i, self.n)
+                # Swap slots i and j; slot i is never read again, so drop it
+                value_i = swapped.pop(i, i)
+                taken.append(swapped.get(j, j) if j != i else value_i)
+                if j != i:
+                    swapped[j] = value_i
+        self.position = end
+        return taken
+
+    def reset(self):
+        """Start a fresh permutation."""
+        self.position = 0
+        self._swapped.clear()
+
+
+class OrderedSelection:
+    """
+    Insertion-ordered set with an optional size limit.
+
+    Used wherever items are picked without repeats (multi-select menus,
+    random interests): add/contains/discard are O(1) instead of list scans,
+    and iteration keeps the order items were picked in.
+    """
+
+    __slots__ = ("_items", "limit")
+
+    def __init__(self, items=(), limit=None):
+        self._items = {}
+        self.limit = limit
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def is_full(self):
+        """True once ``limit`` items are selected (never, without a limit)."""
+        return self.limit is not None and len(self._items) >= self.limit
+
+    def add(self, item):
+        """Add ``item``; returns False if it was already selected or the limit is reached."""
+        if item in self._items or self.is_full():
+            return False
+        self._items[item] = None
+        return True
+
+    def discard(self, item):
+        """Remove ``item`` if it is selected; a no-op otherwise."""
+        self._items.pop(item, None)
+
+    def fill(self, draw, max_attempts):
+        """
+        Call ``draw()`` until the selection is full or ``max_attempts`` draws were made.
+
+        Falsy draws (e.g. an empty leaf) are skipped, repeats are ignored.
+        """
+        for _ in range(max_attempts):
+            if self.is_full():
+                break
+            item = draw()
+            if item:
+                self.add(item)
+        return self
+
+    def to_list(self):
+        """The selected items as a list, in the order they were added."""
+        return list(self._items)
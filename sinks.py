@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2025 Kanarath.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+------------------------
+Output sinks for bulk persona generation.
+
+A sink receives personas one at a time through write() and never keeps them,
+so memory stays flat however many personas go through it (ArrowSink holds at
+most one row group).
+"""
+
+import io
+import os
+import sys
+import json
+import gzip
+
+from utils import MissingDependencyError, save_profile, load_json_file, sanitize_filename
+from instrumentation import METRICS
+
+DEFAULT_BUFFER_SIZE = 1 << 20 # 1 MiB
+DEFAULT_ROW_GROUP_SIZE = 64 * 1024
+
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+ARROW_SUFFIXES = {".parquet": "parquet", ".pq": "parquet", ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow"}
+
+# Column layout of Arrow/Parquet exports. Keys not listed here are kept as a
+# JSON object in the "extra" column.
+PERSONA_STRING_FIELDS = (
+    "gender", "nationality", "first_name", "last_name", "profession", "location",
+    "username", "password", "profile_picture", "appendix",
+)
+PERSONA_LIST_FIELDS = ("platforms", "interests", "common_phrases")
+
+
+def _infer_compression(path):
+    """Guess compression from the file suffix (None for plain files)."""
+    return COMPRESSION_SUFFIXES.get(os.path.splitext(path)[1].lower())
+
+
+class JsonlSink:
+    """
+    Appends personas as compact newline-delimited JSON records to one file.
+
+    Args:
+        path (str): Output file. Created (with parent dirs) if missing. "-" writes to stdout.
+        compression (str): None, "gzip" or "zstd". Defaults to the file suffix (.gz / .zst).
+        append (bool): Append to an existing file instead of truncating it.
+        buffer_size (int): Bytes buffered before each write to disk.
+    """
+
+    def __init__(self, path, compression=None, append=False, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.path = path
+        self.compression = compression or _infer_compression(path)
+        self.count = 0
+        self._encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        self._owns_file = path != "-"
+        if not self._owns_file:
+            if self.compression is not None:
+                raise ValueError("Compression is not supported when writing to stdout.")
+            self._file = sys.stdout.buffer
+            return
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        mode = "ab" if append else "wb"
+        METRICS.count("file_opens", kind="write")
+        if self.compression is None:
+            self._file = open(path, mode, buffering=buffer_size)
+        elif self.compression == "gzip":
+            self._file = io.BufferedWriter(gzip.open(path, mode, compresslevel=6), buffer_size)
+        elif self.compression == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                raise MissingDependencyError("zstd compression needs the 'zstandard' package (pip install zstandard).")
+            raw = zstandard.ZstdCompressor().stream_writer(open(path, mode), closefd=True)
+            self._file = io.BufferedWriter(raw, buffer_size)
+        else:
+            raise ValueError(f"Unknown compression '{self.compression}'. Use gzip or zstd.")
+
+    def write(self, profile):
+        """Serialize one persona as a single line."""
+        with METRICS.stage("serialization"):
+            line = self._encode(profile).encode("utf-8") + b"\n"
+        with METRICS.stage("file_write"):
+            self._file.write(line)
+        self.count += 1
+
+    def close(self):
+        """Flush buffers and finish the compressed stream."""
+        if self._file is not None:
+            if self._owns_file:
+                self._file.close()
+            else:
+                self._file.flush()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class DirectorySink:
+    """
+    The existing one-pretty-JSON-file-per-persona layout, as a sink.
+
+    Files are named first_last_NNNNNN.json. Names already present in the
+    directory (from earlier runs or saves) are skipped, so nothing is overwritten.
+    An optional PersonaIndex is updated in one transaction, committed on close().
+    """
+
+    def __init__(self, profiles_dir, index=None):
+        self.profiles_dir = profiles_dir
+        self.index = index
+        self.count = 0
+        self._serial = 0 # Next NNNNNN suffix to try
+        try:
+            # Lowercased: the check must also hold on case-insensitive file systems
+            self._taken = {filename.lower() for filename in os.listdir(profiles_dir)}
+        except OSError:
+            self._taken = set()
+        if index is not None:
+            index.ensure_synced()
+
+    def _filename(self, profile):
+        """First free first_last_NNNNNN name (without .json) for ``profile``."""
+        base = f"{profile.get('first_name', 'profile')}_{profile.get('last_name', '')}".lower().replace(" ", "_")
+        while True:
+            filename = sanitize_filename(f"{base}_{self._serial:06d}")
+            self._serial += 1
+            if f"{filename.lower()}.json" not in self._taken:
+                self._taken.add(f"{filename.lower()}.json")
+                return filename
+
+    def write(self, profile):
+        """Save one persona via utils.save_profile."""
+        path = save_profile(profile, self._filename(profile), self.profiles_dir)
+        if path:
+            if self.index is not None:
+                self.index.upsert(path, profile, commit=False)
+            self.count += 1
+
+    def close(self):
+        if self.index is not None:
+            self.index.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SqliteSink:
+    """
+    Personas into a persona_store database, committed by a background writer thread.
+
+    Stored as first_last_NNNNNN like DirectorySink file names. Numbering starts
+    after the store's largest row id, so a run never replaces personas stored
+    by an earlier one.
+    """
+
+    def __init__(self, db_path, batch_size=None):
+        from persona_store import AsyncPersonaWriter, DEFAULT_BATCH_SIZE, persona_name
+        self.path = db_path
+        self._name = persona_name
+        self._writer = AsyncPersonaWriter(db_path, batch_size or DEFAULT_BATCH_SIZE)
+        self._serial = self._writer.last_id
+        self.count = 0
+
+    def write(self, profile):
+        """Queue one persona; the writer thread batches the inserts."""
+        self._writer.submit(self._name(profile, self._serial + self.count), profile)
+        self.count += 1
+
+    def close(self):
+        """Wait for the last transaction to commit."""
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise MissingDependencyError("Arrow/Parquet export needs the 'pyarrow' package (pip install pyarrow).")
+    return pyarrow
+
+
+def persona_schema(pa):
+    """Arrow schema of exported personas: strings, an int32 age and list<string> fields."""
+    fields = [pa.field(name, pa.string()) for name in PERSONA_STRING_FIELDS[:4]]
+    fields.append(pa.field("age", pa.int32()))
+    fields += [pa.field(name, pa.string()) for name in PERSONA_STRING_FIELDS[4:]]
+    fields += [pa.field(name, pa.list_(pa.string())) for name in PERSONA_LIST_FIELDS]
+    fields.append(pa.field("extra", pa.string()))
+    return pa.schema(fields)
+
+
+class ArrowSink:
+    """
+    Writes personas to one columnar file, as Parquet or Arrow IPC (Feather v2).
+
+    Rows are buffered per column and written every ``row_group_size`` personas,
+    so each flush becomes one Parquet row group / IPC record batch.
+
+    Args:
+        path (str): Output file. Created (with parent dirs) if missing.
+        format (str): "parquet" or "arrow". Defaults to the file suffix (.parquet/.pq, .arrow/.feather/.ipc).
+        row_group_size (int): Personas per row group.
+        compression (str): Codec passed to pyarrow (e.g. "zstd", "snappy", "lz4").
+            Defaults to snappy for Parquet and no compression for Arrow IPC.
+    """
+
+    def __init__(self, path, format=None, row_group_size=DEFAULT_ROW_GROUP_SIZE, compression=None):
+        pa = self._pa = _import_pyarrow()
+        self.path = path
+        self.format = format or ARROW_SUFFIXES.get(os.path.splitext(path)[1].lower())
+        if self.format not in ("parquet", "arrow"):
+            raise ValueError(f"Unknown columnar format for '{path}'. Use parquet or arrow.")
+        self.row_group_size = row_group_size
+        self.schema = persona_schema(pa)
+        self.count = 0
+        self._reset_buffer()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        METRICS.count("file_opens", kind="write")
+        if self.format == "parquet":
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(path, self.schema, compression=compression or "snappy")
+        else:
+            import pyarrow.ipc as ipc
+            options = ipc.IpcWriteOptions(compression=compression)
+            self._writer = ipc.new_file(path, self.schema, options=options)
+
+    def _reset_buffer(self):
+        self._buffer = {name: [] for name in self.schema.names}
+        self._buffered = 0
+
+    def write(self, profile):
+        """Buffer one persona; a full row group is written out."""
+        buffer = self._buffer
+        for name in PERSONA_STRING_FIELDS:
+            value = profile.get(name)
+            buffer[name].append(None if value is None else str(value))
+        age = profile.get("age")
+        buffer["age"].append(age if isinstance(age, int) else (int(age) if str(age).isdigit() else None))
+        for name in PERSONA_LIST_FIELDS:
+            value = profile.get(name)
+            buffer[name].append(None if value is None else [str(v) for v in value])
+        extra = {k: v for k, v in profile.items() if k not in self._buffer}
+        buffer["extra"].append(json.dumps(extra, ensure_ascii=False) if extra else None)
+        self._buffered += 1
+        self.count += 1
+        if self._buffered >= self.row_group_size:
+            self._flush()
+
+    def write_batch(self, batch):
+        """
+        Write a columnar.PersonaBatch without building per-persona dicts.
+
+        Pending single-persona writes are flushed first so row order is kept.
+        """
+        pa = self._pa
+        self._flush()
+        with METRICS.stage("serialization"):
+            columns = batch.columns()
+            arrays = []
+            for field in self.schema:
+                values = columns.get(field.name)
+                arrays.append(pa.nulls(len(batch), field.type) if values is None else pa.array(values, field.type))
+            table = pa.Table.from_arrays(arrays, schema=self.schema)
+        self._write_table(table)
+        self.count += len(batch)
+
+    def _write_table(self, table):
+        with METRICS.stage("file_write"):
+            if self.format == "parquet":
+                self._writer.write_table(table, row_group_size=self.row_group_size)
+            else:
+                self._writer.write_table(table, max_chunksize=self.row_group_size)
+
+    def _flush(self):
+        if self._buffered:
+            with METRICS.stage("serialization"):
+                table = self._pa.Table.from_pydict(self._buffer, schema=self.schema)
+            self._write_table(table)
+            self._reset_buffer()
+
+    def close(self):
+        """Write the last partial row group and the file footer."""
+        if self._writer is not None:
+            self._flush()
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_persona_table(path, columns=None):
+    """
+    Load a Parquet or Arrow IPC persona export as a pyarrow.Table.
+
+    Only the requested ``columns`` are read (all of them by default);
+    call .to_pandas() on the result for a DataFrame.
+    """
+    pa = _import_pyarrow()
+    file_format = ARROW_SUFFIXES.get(os.path.splitext(path)[1].lower())
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=columns)
+    import pyarrow.ipc as ipc
+    with pa.memory_map(path) as source:
+        table = ipc.open_file(source).read_all()
+    return table.select(columns) if columns else table
+
+
+def iter_saved_profiles(profiles_dir):
+    """Yield every saved profile JSON in ``profiles_dir``, in filename order."""
+    if not os.path.isdir(profiles_dir):
+        return
+    for filename in sorted(os.listdir(profiles_dir)):
+        if filename.endswith(".json"):
+            profile = load_json_file(os.path.join(profiles_dir, filename))
+            if isinstance(profile, dict):
+                yield profile
+
+
+def write_personas(personas, sink):
+    """
+    Stream an iterable of personas into ``sink`` and close it.
+
+    Pass a generator (e.g. PersonaGenerator.iter_personas) to keep memory constant.
+
+    Returns:
+        int: Number of personas written.
+    """
+    with sink:
+        write = sink.write
+        for profile in personas:
+            write(profile)
+    return sink.count
@@ -1,5 +1,5 @@
 @echo off
 REM Script para ejecutar Sock Spy en Windows
 cd /d "%~dp0"
-python main.py
+python -m main %*
 pause
@@ -17,4 +17,4 @@
 
 # Script para ejecutar Sock Spy en Linux/macOS
 cd "$(dirname "$0")"
-python3 main.py
+python3 -m main "$@"
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2025 Kanarath.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+------------------------
+Synthetic data corpora for load-testing the loaders and selectors.
+
+build_synthetic_corpus() writes a complete data directory with the same
+layout as data/ (names/, last_names/, nationalities.json, locations.json,
+interests.json, professions.json plus the small assets copied as is), but
+with lists and trees of any size. Point PersonaGenerator, SockSpy or the
+benchmarks at it to see how a change behaves with production-sized corpora.
+
+Every generated word is unique, pronounceable and reproducible from the seed.
+JSON trees are streamed to disk, so a tree with millions of leaves never has
+to fit in memory.
+"""
+
+import os
+import json
+import time
+import random
+import shutil
+from collections import Counter
+
+from utils import load_data_file, load_json_file
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Copied from the source data directory; the generator needs them but they do not scale
+ASSET_PATHS = ("common_phrases", "ascii_art", "profile_pictures.txt")
+
+# Levels of each JSON tree, outermost first; the last level is the length of the leaf lists
+TREE_FILES = {
+    "locations.json": "continent > country > region > city > district",
+    "interests.json": "category > subcategory > interest",
+    "professions.json": "sector > field > role > title",
+}
+
+PRESETS = {
+    # The mean shape of the shipped data directory, for quick checks of the tool itself
+    "small": {"names_per_file": 40, "last_names_per_file": 40, "extra_nationalities": 0,
+              "locations": (5, 11, 5, 2, 5), "interests": (6, 6, 10), "professions": (15, 3, 3, 3)},
+    # Large enough to show scaling problems (about 1M location leaves)
+    "large": {"names_per_file": 10_000, "last_names_per_file": 10_000, "extra_nationalities": 40,
+              "locations": (6, 20, 20, 20, 20), "interests": (40, 25, 100), "professions": (30, 15, 15, 15)},
+    # Production scale: 50k names per file and about 3.6M location leaves
+    "production": {"names_per_file": 50_000, "last_names_per_file": 50_000, "extra_nationalities": 100,
+                   "locations": (6, 25, 20, 30, 40), "interests": (60, 40, 200), "professions": (40, 20, 20, 20)},
+}
+
+_CONSONANTS = "bdfgklmnprstvz"
+_VOWELS = "aeiou"
+# Every syllable is exactly one consonant and one vowel, so any sequence of them reads back unambiguously
+_SYLLABLES = [c + v for c in _CONSONANTS for v in _VOWELS]
+_WORD_SPACE = len(_SYLLABLES) ** 5
+_SCRAMBLE = 2654435761 # Odd and not a multiple of 5 or 7: a bijection modulo _WORD_SPACE
+
+
+class WordMaker:
+    """
+    Produces unique capitalized pseudo-words ("Rulizivuti", "Pazotomolo").
+
+    The n-th word is the base-70 syllable spelling of a scrambled n, so words
+    never repeat (up to ~1.7 billion of them) and no "seen" set is needed.
+    """
+
+    def __init__(self, seed=0):
+        self._next = random.Random(seed).randrange(_WORD_SPACE)
+        self.count = 0
+
+    def __call__(self):
+        value = (self._next * _SCRAMBLE) % _WORD_SPACE
+        self._next = (self._next + 1) % _WORD_SPACE
+        self.count += 1
+        syllables = []
+        while value or len(syllables) < 2:
+            value, digit = divmod(value, len(_SYLLABLES))
+            syllables.append(_SYLLABLES[digit])
+        return "".join(syllables).capitalize()
+
+    def phrase(self, words=2):
+        """Several words joined by spaces (place names, multi-word labels)."""
+        return " ".join(self() for _ in range(words))
+
+
+def _write_tree(f, shape, next_label, next_leaf):
+    """Stream one JSON tree of the given ``shape`` to ``f``; returns the number of leaves."""
+    if len(shape) == 1:
+        f.write(json.dumps([next_leaf() for _ in range(shape[0])], ensure_ascii=False))
+        return shape[0]
+    leaves = 0
+    f.write("{")
+    for i in range(shape[0]):
+        if i:
+            f.write(",")
+        f.write(json.dumps(next_label(), ensure_ascii=False))
+        f.write(":")
+        leaves += _write_tree(f, shape[1:], next_label, next_leaf)
+    f.write("}")
+    return leaves
+
+
+def _write_lines(path, count, next_word):
+    with open(path, "w", encoding="utf-8") as f:
+        for start in range(0, count, 10_000):
+            f.write("".join(f"{next_word()}\n" for _ in range(min(10_000, count - start))))
+
+
+def tree_shape(tree):
+    """
+    Mean fan-out of every level of a JSON tree (see TREE_FILES), rounded.
+
+    Irregular trees are measured down to the depth most leaf lists sit at.
+
+    Returns:
+        tuple: e.g. (5, 11, 5, 2, 5) for the shipped locations.json.
+    """
+    sizes = {} # depth -> fan-out of every node at that depth
+    list_depths = Counter()
+    stack = [(tree, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if isinstance(node, dict):
+            stack.extend((child, depth + 1) for child in node.values())
+        elif isinstance(node, list):
+            list_depths[depth] += 1
+        else:
+            continue
+        sizes.setdefault(depth, []).append(len(node))
+    if not list_depths:
+        return ()
+    leaf_depth = list_depths.most_common(1)[0][0]
+    return tuple(max(1, round(sum(sizes[d]) / len(sizes[d]))) for d in range(leaf_depth + 1))
+
+
+def scale_options(factor, data_dir=DEFAULT_DATA_DIR):
+    """
+    build_synthetic_corpus() arguments for a corpus ``factor`` times the size of ``data_dir``.
+
+    Name lists get ``factor`` times the mean file length; every JSON tree keeps
+    the mean shape of the original with ``factor`` times longer leaf lists.
+    """
+    options = {"extra_nationalities": 0}
+    for key, folder in (("names_per_file", os.path.join("names", "male")), ("last_names_per_file", "last_names")):
+        directory = os.path.join(data_dir, folder)
+        sizes = [len(load_data_file(os.path.join(directory, name)) or [])
+                 for name in os.listdir(directory) if name.endswith(".txt")]
+        options[key] = max(1, round(sum(sizes) / max(1, len(sizes)) * factor))
+    for filename in TREE_FILES:
+        shape = tree_shape(load_json_file(os.path.join(data_dir, filename)))
+        options[os.path.splitext(filename)[0]] = shape[:-1] + (shape[-1] * factor,)
+    return options
+
+
+def build_synthetic_corpus(output_dir, names_per_file=40, last_names_per_file=40, extra_nationalities=0,
+                           locations=(5, 11, 5, 2, 5), interests=(6, 6, 10), professions=(15, 3, 3, 3),
+                           seed=0, source_dir=DEFAULT_DATA_DIR):
+    """
+    Write a complete synthetic data directory.
+
+    The shipped nationalities are kept so every code path that names one still
+    works; ``extra_nationalities`` synthetic ones are spread over the continents.
+
+    Args:
+        output_dir (str): Destination directory (created if missing).
+        names_per_file (int): First names per nationality and gender.
+        last_names_per_file (int): Last names per nationality.
+        extra_nationalities (int): Synthetic nationalities added to nationalities.json.
+        locations (tuple): Fan-out per level of locations.json (5 levels).
+        interests (tuple): Fan-out per level of interests.json (3 levels).
+        professions (tuple): Fan-out per level of professions.json (4 levels).
+        seed (int): Seed of the word stream.
+        source_dir (str): Data directory providing nationalities and the unscaled assets.
+
+    Returns:
+        dict: files, words, bytes, seconds and the leaf count of each JSON tree.
+    """
+    start = time.perf_counter()
+    word = WordMaker(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    summary = {"files": 0}
+
+    nationalities = {continent: list(group) for continent, group
+                     in (load_json_file(os.path.join(source_dir, "nationalities.json")) or {}).items()}
+    continents = list(nationalities) or ["Synthetia"]
+    for i in range(extra_nationalities):
+        nationalities.setdefault(continents[i % len(continents)], []).append(f"{word()}ian")
+    with open(os.path.join(output_dir, "nationalities.json"), "w", encoding="utf-8") as f:
+        json.dump(nationalities, f, ensure_ascii=False, indent=4)
+    summary["files"] += 1
+    summary["nationalities"] = sum(len(group) for group in nationalities.values())
+
+    for folder, per_file in ((os.path.join("names", "male"), names_per_file),
+                             (os.path.join("names", "female"), names_per_file),
+                             ("last_names", last_names_per_file)):
+        directory = os.path.join(output_dir, folder)
+        os.makedirs(directory, exist_ok=True)
+        for group in nationalities.values():
+            for nationality in group:
+                _write_lines(os.path.join(directory, f"{nationality.lower()}.txt"), per_file, word)
+                summary["files"] += 1
+
+    for filename, shape in (("locations.json", locations), ("interests.json", interests),
+                            ("professions.json", professions)):
+        with open(os.path.join(output_dir, filename), "w", encoding="utf-8") as f:
+            summary[os.path.splitext(filename)[0]] = _write_tree(f, tuple(shape), word, word.phrase)
+        summary["files"] += 1
+
+    for asset in ASSET_PATHS:
+        src, dst = os.path.join(source_dir, asset), os.path.join(output_dir, asset)
+        if os.path.isdir(src):
+            shutil.copytree(src, dst, dirs_exist_ok=True)
+        elif os.path.isfile(src):
+            shutil.copyfile(src, dst)
+
+    summary["words"] = word.count
+    summary["bytes"] = sum(os.path.getsize(os.path.join(root, name))
+                           for root, _, files in os.walk(output_dir) for name in files)
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+
+def _parse_shape(text):
+    return tuple(int(part) for part in text.split(","))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Generate a large synthetic Sock Spy data directory.",
+        epilog="Tree shapes are comma-separated fan-outs per level: "
+               + "; ".join(f"{name}: {levels}" for name, levels in TREE_FILES.items()))
+    parser.add_argument("output_dir")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--preset", choices=sorted(PRESETS), default="large")
+    size.add_argument("--scale", type=int, help="Size factor relative to --source-dir instead of a preset.")
+    parser.add_argument("--source-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--names", type=int, dest="names_per_file")
+    parser.add_argument("--last-names", type=int, dest="last_names_per_file")
+    parser.add_argument("--extra-nationalities", type=int)
+    parser.add_argument("--locations", type=_parse_shape)
+    parser.add_argument("--interests", type=_parse_shape)
+    parser.add_argument("--professions", type=_parse_shape)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    options = dict(scale_options(args.scale, args.source_dir) if args.scale else PRESETS[args.preset])
+    for key in ("names_per_file", "last_names_per_file", "extra_nationalities", "locations", "interests", "professions"):
+        if getattr(args, key) is not None:
+            options[key] = getattr(args, key) # Explicit sizes override the preset
+    result = build_synthetic_corpus(args.output_dir, seed=args.seed, source_dir=args.source_dir, **options)
+    print(f"Synthetic corpus written to {args.output_dir}: {result['files']} files, {result['words']} words, "
+          f"{result['bytes'] / 1e6:.1f} MB in {result['seconds']:.1f}s "
+          f"({result['locations']} locations, {result['interests']} interests, {result['professions']} professions).")
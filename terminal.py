@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2025 Kanarath.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+------------------------
+Terminal rendering: screen clearing and buffered redraws without a shell.
+
+clear_screen() writes an ANSI escape sequence instead of running clear/cls,
+so a redraw costs microseconds and never spawns a process. Once
+enable_screen_buffering() has been called, a screen's clear and its text
+stay in the stdout buffer until the next input() prompt (or pause) flushes
+them, so each screen reaches the terminal in one write with no flicker.
+
+How the screen is cleared depends on what stdout is:
+
+    ansi      a terminal that understands escape sequences (also Windows 10+,
+              after enabling virtual terminal processing)
+    dumb      TERM=dumb: blank lines push the old screen out of view
+    legacy    an old Windows console without escape sequences: cls
+    none      not a terminal (pipe, file, test): nothing is written
+"""
+
+import os
+import sys
+import shutil
+
+# Cursor home, erase screen, erase scrollback (what clear(1) sends)
+CLEAR_SEQUENCE = "\x1b[H\x1b[2J\x1b[3J"
+
+ANSI = "ansi"
+DUMB = "dumb"
+LEGACY = "legacy"
+NONE = "none"
+
+_modes = {} # id(stream) -> mode, detected once per stream
+
+
+def _enable_windows_ansi():
+    """Turn on escape sequence processing in the Windows console; False if unsupported."""
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11) # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004)) # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    except (AttributeError, OSError, ImportError):
+        return False
+
+
+def detect_mode(stream=None):
+    """How the screen can be cleared on ``stream`` (default: sys.stdout); see the module docstring."""
+    stream = stream or sys.stdout
+    mode = _modes.get(id(stream))
+    if mode is None:
+        try:
+            is_tty = stream.isatty()
+        except (AttributeError, ValueError): # Replaced or closed stream
+            is_tty = False
+        if not is_tty:
+            mode = NONE
+        elif os.environ.get("TERM", "").lower() == "dumb":
+            mode = DUMB
+        elif os.name == "nt" and not _enable_windows_ansi():
+            mode = LEGACY
+        else:
+            mode = ANSI
+        _modes[id(stream)] = mode
+    return mode
+
+
+def clear_screen(stream=None):
+    """Clear the terminal (see detect_mode()); output is flushed by the next prompt, not here."""
+    stream = stream or sys.stdout
+    mode = detect_mode(stream)
+    if mode == ANSI:
+        stream.write(CLEAR_SEQUENCE)
+    elif mode == DUMB:
+        stream.write("\n" * (shutil.get_terminal_size().lines or 24)) # A pty may report 0 rows
+    elif mode == LEGACY:
+        stream.flush() # Keep what was printed before in order with the cls output
+        os.system("cls")
+
+
+def enable_screen_buffering(stream=None):
+    """
+    Stop flushing ``stream`` (default: sys.stdout) at every newline.
+
+    input() flushes before it prompts, so each screen is still shown in full
+    before the program waits; pacing.pause() flushes before sleeping.
+    Returns False if the stream cannot be reconfigured (left as it is).
+    """
+    stream = stream or sys.stdout
+    if detect_mode(stream) == NONE:
+        return False
+    try:
+        stream.reconfigure(line_buffering=False)
+        return True
+    except (AttributeError, ValueError):
+        return False
@@ -0,0 +1,24 @@
+import os
+import json
+
+from bulk_export import bulk_export
+
+
+def test_exports_and_reports_failures(tmp_path, capsys):
+    profiles_dir = tmp_path / "profiles"
+    exports_dir = tmp_path / "exports"
+    profiles_dir.mkdir()
+    (profiles_dir / "ann_lee.json").write_text(json.dumps({"first_name": "Ann", "last_name": "Lee"}), encoding="utf-8")
+    (profiles_dir / "broken.json").write_text("[1, 2]", encoding="utf-8")
+
+    summary = bulk_export(str(profiles_dir), str(exports_dir))
+    assert summary["written"] == 2
+    assert sorted(os.listdir(exports_dir)) == ["ann_lee.json", "ann_lee.txt"]
+    assert summary["failed"] == 2
+    assert {(os.path.basename(f["profile"]), f["format"]) for f in summary["failures"]} == {
+        ("broken.json", "txt"), ("broken.json", "json")}
+    captured = capsys.readouterr()
+    assert "broken.json" in captured.err and "broken.json" not in captured.out
+
+    again = bulk_export(str(profiles_dir), str(exports_dir))
+    assert (again["written"], again["skipped"]) == (0, 2)
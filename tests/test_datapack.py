@@ -0,0 +1,74 @@
+import os
+import json
+
+import pytest
+
+from datapack import DataPack, DataPackError, PackedStrings, build_pack
+from datasets import DatasetRegistry
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    root = tmp_path / "data"
+    (root / "names" / "male").mkdir(parents=True)
+    (root / "names" / "male" / "testland.txt").write_text("Alpha\n\n  Beta  \nGamma\n", encoding="utf-8")
+    (root / "profile_pictures.txt").write_text("a.png\nb.png\n", encoding="utf-8")
+    tree = {"Europe": {"Spain": ["Madrid", "Sevilla"], "Note": "x"}, "Mixed": [1, "two", None]}
+    (root / "locations.json").write_text(json.dumps(tree), encoding="utf-8")
+    (root / "ascii_art").mkdir()
+    (root / "ascii_art" / "logo.txt").write_text("not a dataset\n", encoding="utf-8")
+    return root
+
+
+def test_round_trip(data_dir, tmp_path):
+    pack_path = str(tmp_path / "data.pack")
+    summary = build_pack(str(data_dir), pack_path)
+    assert summary["entries"] == 3
+
+    pack = DataPack(pack_path)
+    try:
+        lines = pack.lines(os.path.join("names", "male", "testland.txt"))
+        assert isinstance(lines, PackedStrings)
+        assert lines == ["Alpha", "Beta", "Gamma"]
+        assert lines[1:] == ["Beta", "Gamma"]
+        assert pack.tree("locations.json") == json.loads((data_dir / "locations.json").read_text(encoding="utf-8"))
+        assert "ascii_art/logo.txt" not in pack
+        assert pack.lines("missing.txt") is None
+        assert pack.stale_sources(str(data_dir)) == []
+    finally:
+        pack.close()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "bogus.pack"
+    path.write_bytes(b"NOPE" + b"\0" * 64)
+    with pytest.raises(DataPackError):
+        DataPack(str(path))
+
+
+def test_stale_pack_is_detected(data_dir, tmp_path):
+    pack_path = str(tmp_path / "data.pack")
+    build_pack(str(data_dir), pack_path)
+    (data_dir / "profile_pictures.txt").write_text("c.png\n", encoding="utf-8")
+    (data_dir / "professions.json").write_text("{}", encoding="utf-8")
+
+    pack = DataPack(pack_path)
+    assert sorted(pack.stale_sources(str(data_dir))) == ["professions.json", "profile_pictures.txt"]
+    registry = DatasetRegistry(str(data_dir))
+    assert registry.attach_pack(pack) is False
+    assert registry.pack is None
+    assert registry.load_lines("profile_pictures.txt") == ["c.png"]
+
+
+def test_invalidate_bypasses_edited_dataset(data_dir, tmp_path):
+    pack_path = str(tmp_path / "data.pack")
+    build_pack(str(data_dir), pack_path)
+    registry = DatasetRegistry(str(data_dir))
+    assert registry.attach_pack(DataPack(pack_path))
+    assert registry.load_lines("profile_pictures.txt") == ["a.png", "b.png"]
+
+    path = data_dir / "profile_pictures.txt"
+    path.write_text("c.png\nd.png\ne.png\n", encoding="utf-8")
+    registry.invalidate("profile_pictures.txt")
+    assert registry.load_lines("profile_pictures.txt") == ["c.png", "d.png", "e.png"]
+    assert registry.pack is not None # Untouched datasets still come from the pack
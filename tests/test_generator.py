@@ -0,0 +1,37 @@
+import pytest
+
+from generator import (
+    PersonaGenerator,
+    chunk_seed,
+    generate_personas,
+    generate_personas_parallel,
+)
+
+
+def test_seeded_generation_is_reproducible():
+    assert generate_personas(20, 4, seed=11) == generate_personas(20, 4, seed=11)
+    assert generate_personas(20, 4, seed=11) != generate_personas(20, 4, seed=12)
+
+
+@pytest.mark.parametrize("level", [0, 5, 7])
+def test_rejects_unknown_levels(level):
+    generator = PersonaGenerator(seed=1)
+    with pytest.raises(ValueError):
+        generator.iter_personas(1, level)
+    with pytest.raises(ValueError):
+        generator.generate(level)
+
+
+def test_chunk_seed_is_stable():
+    assert chunk_seed(42, 3) == chunk_seed(42, 3)
+    assert chunk_seed(42, 3) != chunk_seed(42, 4)
+    assert chunk_seed(42, 3) != chunk_seed(43, 3)
+
+
+def test_parallel_output_does_not_depend_on_worker_count():
+    kwargs = {"count": 25, "level": 4, "seed": 99, "chunk_size": 6}
+    one = generate_personas_parallel(workers=1, **kwargs)
+    three = generate_personas_parallel(workers=3, **kwargs)
+    assert len(one) == 25
+    assert one == three
+    assert generate_personas_parallel(workers=2, **kwargs) == one
@@ -0,0 +1,118 @@
+import os
+import json
+import sqlite3
+
+import pytest
+
+from persona_index import PersonaIndex
+from utils import save_profile
+
+
+def _write(profiles_dir, name, **profile):
+    path = os.path.join(profiles_dir, f"{name}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f)
+    return path
+
+
+def _touch_later(path):
+    """Move the mtime of a file or directory forward, so the change is visible on coarse-timestamp file systems."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+@pytest.fixture
+def profiles_dir(tmp_path):
+    path = str(tmp_path / "profiles")
+    os.makedirs(path)
+    _write(path, "ann_lee", first_name="Ann", last_name="Lee", nationality="korean", age=30)
+    _write(path, "bob_ray", first_name="Bob", last_name="Ray", nationality="american", age=50)
+    return path
+
+
+def test_lists_and_filters(profiles_dir):
+    index = PersonaIndex(profiles_dir)
+    assert index.count() == 2
+    assert [row["first_name"] for row in index.list()] == ["Ann", "Bob"]
+    assert [row["first_name"] for row in index.list(nationality="American")] == ["Bob"]
+    assert [row["first_name"] for row in index.list(min_age=40)] == ["Bob"]
+    assert index.stats()["count"] == 2
+    index.close()
+
+
+def test_sync_sees_outside_changes(profiles_dir):
+    index = PersonaIndex(profiles_dir)
+    assert index.count() == 2
+    index.close()
+
+    edited = _write(profiles_dir, "ann_lee", first_name="Annabel", last_name="Lee", nationality="korean", age=31)
+    _touch_later(edited)
+    os.remove(os.path.join(profiles_dir, "bob_ray.json"))
+    _write(profiles_dir, "cid_moe", first_name="Cid", last_name="Moe", nationality="american", age=22)
+    _touch_later(profiles_dir)
+
+    index = PersonaIndex(profiles_dir)
+    rows = index.list()
+    assert [(row["filename"], row["first_name"], row["age"]) for row in rows] == [
+        ("ann_lee.json", "Annabel", 31), ("cid_moe.json", "Cid", 22)]
+    index.close()
+
+
+def test_unchanged_directory_is_not_scanned(profiles_dir, monkeypatch):
+    index = PersonaIndex(profiles_dir)
+    assert index.count() == 2 # First use reconciles
+    index.close()
+
+    index = PersonaIndex(profiles_dir)
+    monkeypatch.setattr(index, "_scan", lambda: pytest.fail("directory scanned although unchanged"))
+    assert index.count() == 2
+    index.close()
+
+    _write(profiles_dir, "cid_moe", first_name="Cid")
+    _touch_later(profiles_dir)
+    index = PersonaIndex(profiles_dir)
+    assert index.count() == 3
+    index.close()
+
+
+def test_page_is_rechecked_after_sync(profiles_dir):
+    index = PersonaIndex(profiles_dir)
+    assert index.list()[0]["first_name"] == "Ann"
+
+    # Edited in place while the index stays open (no create/delete/rename)
+    edited = _write(profiles_dir, "ann_lee", first_name="Anna", last_name="Lee", nationality="korean", age=30)
+    _touch_later(edited)
+    assert index.list()[0]["first_name"] == "Anna"
+
+    os.remove(os.path.join(profiles_dir, "bob_ray.json"))
+    assert [row["filename"] for row in index.list()] == ["ann_lee.json"]
+    index.close()
+
+
+def test_name_filter_matches_wildcards_literally(profiles_dir):
+    _write(profiles_dir, "a_b", first_name="a_b", last_name="Q")
+    _write(profiles_dir, "axb", first_name="axb", last_name="Q")
+    _write(profiles_dir, "pct", first_name="100%", last_name="Q")
+    index = PersonaIndex(profiles_dir)
+    assert [row["first_name"] for row in index.list(name="a_b")] == ["a_b"]
+    assert [row["first_name"] for row in index.list(name="0%")] == ["100%"]
+    index.close()
+
+
+def test_save_profile_updates_index(profiles_dir):
+    index = PersonaIndex(profiles_dir)
+    path = save_profile({"first_name": "Dee", "last_name": "Fox", "age": 40}, "dee_fox", profiles_dir, index=index)
+    assert path == os.path.join(profiles_dir, "dee_fox.json")
+    assert index.count(name="Dee") == 1
+    index.close()
+
+
+def test_save_profile_survives_index_errors(profiles_dir):
+    class BrokenIndex:
+        def upsert(self, path, profile):
+            raise sqlite3.OperationalError("database is locked")
+
+    path = save_profile({"first_name": "Eve"}, "eve", profiles_dir, index=BrokenIndex())
+    assert path == os.path.join(profiles_dir, "eve.json")
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"first_name": "Eve"}
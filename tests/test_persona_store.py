@@ -0,0 +1,80 @@
+import sqlite3
+
+import pytest
+
+from persona_store import AsyncPersonaWriter, PersonaStore
+from sinks import SqliteSink, write_personas
+
+
+def _profiles(n):
+    return [{"first_name": f"Ann{i % 7}", "last_name": "Lee", "nationality": "korean", "age": 20 + i % 50}
+            for i in range(n)]
+
+
+def _index_names(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+                if name.startswith("idx_store_")}
+    finally:
+        conn.close()
+
+
+def test_put_get_and_filters(tmp_path):
+    with PersonaStore(str(tmp_path / "p.db")) as store:
+        store.put("ann_lee", {"first_name": "Ann", "last_name": "Lee", "age": 30, "nationality": "korean"})
+        store.put("a_b", {"first_name": "a_b", "age": 40})
+        store.put("axb", {"first_name": "axb", "age": 50})
+        assert store.get("ANN_LEE")["age"] == 30
+        assert [row["name"] for row in store.list(name="a_")] == ["a_b"]
+        assert store.count(min_age=35) == 2
+        assert store.delete("axb") and store.get("axb") is None
+
+
+def test_async_writer_bulk_loads_and_rebuilds_indexes(tmp_path):
+    db_path = str(tmp_path / "p.db")
+    PersonaStore(db_path).close()
+    expected = _index_names(db_path)
+    assert expected
+    with AsyncPersonaWriter(db_path, batch_size=100) as writer:
+        for i, profile in enumerate(_profiles(1050)):
+            writer.submit(f"p{i:05d}", profile)
+        writer.flush()
+        assert _index_names(db_path) == set() # Bulk mode: built once by close()
+    assert writer.count == 1050
+    assert _index_names(db_path) == expected
+    with PersonaStore(db_path) as store:
+        assert len(store) == 1050
+        assert store.get("p01049")["age"] == 20 + 1049 % 50
+
+
+def test_async_writer_commits_partial_batches(tmp_path):
+    db_path = str(tmp_path / "p.db")
+    with PersonaStore(db_path) as store:
+        store.put("existing", {"first_name": "Old"})
+    writer = AsyncPersonaWriter(db_path, batch_size=10_000, max_wait=0.05)
+    for i, profile in enumerate(_profiles(5)):
+        writer.submit(f"p{i}", profile)
+    writer.flush() # Does not wait for a full batch
+    with PersonaStore(db_path) as store:
+        assert len(store) == 6
+    writer.close()
+
+
+def test_async_writer_reports_unencodable_profiles(tmp_path):
+    writer = AsyncPersonaWriter(str(tmp_path / "p.db"), batch_size=10, max_wait=0.05)
+    writer.submit("bad", {"tags": {1, 2}}) # A set is not JSON
+    with pytest.raises(RuntimeError):
+        writer.flush()
+    with pytest.raises(RuntimeError):
+        writer.close()
+    assert not writer._thread.is_alive()
+
+
+def test_sqlite_sink_never_replaces_earlier_runs(tmp_path):
+    db_path = str(tmp_path / "p.db")
+    profiles = _profiles(30)
+    assert write_personas(iter(profiles), SqliteSink(db_path)) == 30
+    assert write_personas(iter(profiles), SqliteSink(db_path)) == 30
+    with PersonaStore(db_path) as store:
+        assert len(store) == 60
@@ -0,0 +1,69 @@
+import random
+from collections import Counter
+
+import pytest
+
+from sampling import AliasSampler, NationalitySampler, PermutationCursor
+
+
+def test_alias_sampler_matches_weights():
+    weights = {"a": 1, "b": 2, "c": 3, "d": 14}
+    sampler = AliasSampler(list(weights), list(weights.values()))
+    rng = random.Random(1)
+    draws = 200_000
+    counts = Counter(sampler.sample(rng) for _ in range(draws))
+    total = sum(weights.values())
+    for item, weight in weights.items():
+        assert counts[item] / draws == pytest.approx(weight / total, abs=0.005)
+
+
+def test_alias_sampler_drops_zero_weights():
+    sampler = AliasSampler(["never", "always", "negative"], [0, 5, -1])
+    rng = random.Random(2)
+    assert len(sampler) == 1
+    assert {sampler.sample(rng) for _ in range(1000)} == {"always"}
+
+
+def test_alias_sampler_empty():
+    sampler = AliasSampler([], [])
+    assert sampler.sample() is None
+    with pytest.raises(IndexError):
+        sampler.sample_index()
+
+
+def test_nationality_sampler_weights_by_name_combinations():
+    counts = {
+        "big": {"male": 30, "female": 10, "last": 10},
+        "small": {"male": 10, "female": 10, "last": 10},
+        "no_last_names": {"male": 50, "female": 50, "last": 0},
+    }
+    sampler = NationalitySampler(counts)
+    assert sampler.nationalities("male") == ["big", "small"]
+    rng = random.Random(3)
+    draws = Counter(sampler.sample("male", rng) for _ in range(40_000))
+    assert draws["big"] / 40_000 == pytest.approx(0.75, abs=0.01)
+
+
+@pytest.mark.parametrize("n, k", [(0, 5), (1, 1), (10, 3), (257, 20), (1000, 1000)])
+def test_permutation_cursor_returns_each_index_once(n, k):
+    cursor = PermutationCursor(n, random.Random(n))
+    seen = []
+    while cursor.remaining():
+        batch = cursor.take(k)
+        assert 0 < len(batch) <= k
+        seen += batch
+    assert sorted(seen) == list(range(n))
+    assert cursor.take(k) == []
+
+
+def test_permutation_cursor_reset_and_order():
+    cursor = PermutationCursor(50, random.Random(4))
+    first = cursor.take(50)
+    assert first != list(range(50)) # Shuffled
+    cursor.reset()
+    assert sorted(cursor.take(50)) == list(range(50))
+    assert PermutationCursor(6, shuffle=False).take(4) == [0, 1, 2, 3]
+
+
+def test_permutation_cursor_is_seeded():
+    assert PermutationCursor(100, random.Random(9)).take(30) == PermutationCursor(100, random.Random(9)).take(30)
@@ -0,0 +1,66 @@
+import os
+import json
+import gzip
+
+import pytest
+
+from generator import PersonaGenerator
+from sinks import DirectorySink, JsonlSink, write_personas
+
+
+@pytest.fixture(scope="module")
+def personas():
+    return list(PersonaGenerator(seed=7).iter_personas(50, 4))
+
+
+@pytest.mark.parametrize("filename", ["personas.jsonl", "personas.jsonl.gz"])
+def test_jsonl_round_trip(tmp_path, personas, filename):
+    path = str(tmp_path / "out" / filename)
+    assert write_personas(iter(personas), JsonlSink(path)) == len(personas)
+
+    opener = gzip.open if filename.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert [json.loads(line) for line in lines] == personas
+
+
+def test_jsonl_append(tmp_path, personas):
+    path = str(tmp_path / "personas.jsonl")
+    write_personas(iter(personas[:10]), JsonlSink(path))
+    write_personas(iter(personas[10:]), JsonlSink(path, append=True))
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == personas
+
+
+def test_directory_sink_never_overwrites(tmp_path, personas):
+    profiles_dir = str(tmp_path / "profiles")
+    write_personas(iter(personas), DirectorySink(profiles_dir))
+    write_personas(iter(personas), DirectorySink(profiles_dir)) # Same names again
+
+    filenames = os.listdir(profiles_dir)
+    assert len(filenames) == 2 * len(personas)
+    saved = []
+    for filename in filenames:
+        with open(os.path.join(profiles_dir, filename), encoding="utf-8") as f:
+            saved.append(json.load(f))
+    key = lambda p: json.dumps(p, sort_keys=True)
+    assert sorted(saved, key=key) == sorted(personas * 2, key=key)
+
+
+@pytest.mark.parametrize("filename", ["personas.parquet", "personas.arrow"])
+def test_columnar_round_trip(tmp_path, personas, filename):
+    pytest.importorskip("pyarrow")
+    from sinks import ArrowSink, read_persona_table
+
+    path = str(tmp_path / filename)
+    profiles = [dict(p, appendix="note") if i % 2 else p for i, p in enumerate(personas)]
+    profiles[0]["custom"] = {"kept": ["in", "extra"]}
+    assert write_personas(iter(profiles), ArrowSink(path, row_group_size=16)) == len(profiles)
+
+    rows = read_persona_table(path).to_pylist()
+    assert len(rows) == len(profiles)
+    for row, profile in zip(rows, profiles):
+        extra = row.pop("extra")
+        restored = {k: v for k, v in row.items() if v is not None}
+        restored.update(json.loads(extra) if extra else {})
+        assert restored == profile
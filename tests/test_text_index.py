@@ -0,0 +1,30 @@
+from text_index import TextIndex
+
+
+def brute_force(items, query, prefix_only=False):
+    query = query.casefold()
+    keys = [item.casefold() for item in items]
+    prefix = sorted((i for i, key in enumerate(keys) if key.startswith(query)), key=lambda i: (keys[i], i))
+    if prefix_only:
+        return prefix
+    other = sorted((i for i, key in enumerate(keys) if query in key and i not in prefix), key=lambda i: (keys[i], i))
+    return prefix + other
+
+
+def test_search_matches_brute_force():
+    items = ["Anna", "Hannah", "anna", "Joanna", "Ann Marie", "Nan", "Zoë", "a" * 20, "a" * 19 + "b", "a" * 21]
+    index = TextIndex(items)
+    for query in ("a", "an", "ANN", "nna", "n m", "aaaaaaaaaaa", "aaaab", "zoë", "x"):
+        for prefix_only in (False, True):
+            assert index.search_indices(query, prefix_only) == brute_force(items, query, prefix_only), query
+
+
+def test_suffixes_are_stored_as_positions():
+    index = TextIndex(["Maria", "Mario"])
+    assert index.search("ari") == ["Maria", "Mario"]
+    assert index.search("  ") == []
+    assert index._owners.typecode == "I" and len(index._owners) == 10
+
+
+def test_empty_index():
+    assert TextIndex([]).search("a") == []
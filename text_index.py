@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2025 Kanarath.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+------------------------
+Type-ahead search over name corpora
+"""
+
+from array import array
+from itertools import groupby
+
+# Characters compared per sorting pass; suffixes that tie on a whole chunk are re-sorted on the next one
+_SORT_CHUNK = 8
+
+
+class TextIndex:
+    """
+    Sorted suffix array over a list of short strings (names, last names).
+
+    Every suffix of every case-folded item is kept in sorted order, so any
+    prefix or substring query is two binary searches plus the k matches:
+    O(log n + k), with no rescan of the list. A suffix is stored as two
+    integers (owning item, start offset) rather than as a string, so memory
+    grows with the total length of the items, not its square; the binary
+    search slices the few suffixes it actually compares.
+
+    Built once per dataset and cached by DatasetRegistry.load_text_index();
+    the suffix array itself is only built on the first search.
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self._keys = None
+        self._owners = None # array('I'): item index of each suffix, in suffix order
+        self._starts = None # array('I'): offset of each suffix within its item
+
+    def _build(self):
+        self._keys = keys = [item.casefold() for item in self.items]
+        # Pack (item, offset) into one int while sorting: far smaller than a tuple per suffix
+        shift = max(map(len, keys), default=0).bit_length()
+        positions = [
+            i << shift | start
+            for i, key in enumerate(keys)
+            for start in range(len(key))
+            if not key[start].isspace()
+        ]
+        positions = self._sort_positions(positions, shift, 0)
+        mask = (1 << shift) - 1
+        self._owners = array("I", (position >> shift for position in positions))
+        self._starts = array("I", (position & mask for position in positions))
+
+    def _sort_positions(self, positions, shift, depth):
+        """
+        Sort packed suffix positions by their text from ``depth`` on.
+
+        Only ``_SORT_CHUNK`` characters per suffix are sliced in each pass;
+        runs that tie on a whole chunk are sorted again on the next one. The
+        sort is stable, so identical suffixes stay in (item, offset) order.
+        """
+        keys = self._keys
+        mask = (1 << shift) - 1
+        end = depth + _SORT_CHUNK
+
+        def chunk(position):
+            start = position & mask
+            return keys[position >> shift][start + depth:start + end]
+
+        positions.sort(key=chunk)
+        ordered = []
+        for text, group in groupby(positions, key=chunk):
+            if len(text) == _SORT_CHUNK:
+                group = list(group)
+                if len(group) > 1:
+                    group = self._sort_positions(group, shift, end)
+            ordered.extend(group)
+        return ordered
+
+    def __len__(self):
+        return len(self.items)
+
+    def _bisect(self, query, lo=0, after=False):
+        """
+        First suffix position not before ``query``.
+
+        With ``after``, suffixes that start with ``query`` count as before it,
+        so the result is the end of the run of matches.
+        """
+        keys, owners, starts = self._keys, self._owners, self._starts
+        size = len(query)
+        hi = len(owners)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = starts[mid]
+            head = keys[owners[mid]][start:start + size]
+            if head < query or (after and head == query):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _range(self, query):
+        lo = self._bisect(query)
+        return lo, self._bisect(query, lo, after=True)
+
+    def search_indices(self, query, prefix_only=False):
+        """
+        Indices of items containing ``query`` (case-insensitive).
+
+        Items that start with the query come first, then the other matches,
+        each group in alphabetical order.
+        """
+        query = query.strip().casefold()
+        if not query:
+            return []
+        if self._owners is None:
+            self._build()
+        lo, hi = self._range(query)
+        prefix_hits = [self._owners[j] for j in range(lo, hi) if self._starts[j] == 0]
+        if prefix_only:
+            return prefix_hits # Whole-key suffixes come out of the array already sorted
+        seen = set(prefix_hits)
+        other_hits = sorted({self._owners[j] for j in range(lo, hi)} - seen, key=self._keys.__getitem__)
+        return prefix_hits + other_hits
+
+    def search(self, query, prefix_only=False):
+        """Items containing ``query`` (or starting with it if ``prefix_only``), best matches first."""
+        return [self.items[i] for i in self.search_indices(query, prefix_only)]
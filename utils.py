@@ -24,13 +24,20 @@ import os
 import sys
 import json
 import random
-import datetime
 import string
 
+from sampling import PermutationCursor
+from instrumentation import METRICS
+import terminal
+
 # Define constants (optional but good practice)
 FILE_NOT_FOUND = None
 FILE_EMPTY = []
 
+
+class MissingDependencyError(RuntimeError):
+    """An optional package (numpy, pyarrow, zstandard) needed for the requested feature is not installed."""
+
 def load_data_file(filepath):
     """
     Loads data from a text file, one item per line.
@@ -67,11 +74,12 @@ def load_data_file(filepath):
         return FILE_NOT_FOUND
 
 def clear_screen():
-    """Clear the terminal screen based on operating system"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    """Clear the terminal screen (ANSI escape sequence, no shell; see terminal.py)"""
+    terminal.clear_screen()
 
 def load_data_file(filepath):
     """Load data from a text file, one item per line"""
+    METRICS.count("file_opens", kind="read")
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             # Read lines, strip whitespace, and filter out empty lines
@@ -86,6 +94,7 @@ def load_data_file(filepath):
 
 def load_json_file(filepath):
     """Load data from a JSON file"""
+    METRICS.count("file_opens", kind="read")
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             return json.load(f)
@@ -99,29 +108,66 @@ def load_json_file(filepath):
         print(f"Warning: Error reading JSON file {filepath}: {e}")
         return {}
 
-def save_profile(profile, filename, profiles_dir):
-    """Save profile to a JSON file"""
+def atomic_write_json(filepath, data, indent=2):
+    """
+    Write JSON to filepath atomically.
+
+    The data goes to a temporary file in the same directory which is then
+    swapped in with os.replace(), so readers never see a half-written file.
+    Exceptions propagate to the caller.
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    tmp_path = os.path.join(directory, f".{os.path.basename(filepath)}.{os.getpid()}.tmp")
+    try:
+        with METRICS.stage("serialization"):
+            text = json.dumps(data, indent=indent, ensure_ascii=False)
+        METRICS.count("file_opens", kind="write")
+        with METRICS.stage("file_write"), open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, filepath)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def sanitize_filename(filename):
+    """Keep only letters, digits, '_' and '-' (no paths, no spaces)."""
+    return "".join(c for c in filename if c.isalnum() or c in ('_', '-')).rstrip()
+
+def save_profile(profile, filename, profiles_dir, rng=None, index=None):
+    """
+    Save profile to a JSON file (``rng`` is used for the fallback filename).
+
+    If ``index`` (a persona_index.PersonaIndex) is given, its entry is updated too.
+    """
     try:
         if not os.path.exists(profiles_dir):
             os.makedirs(profiles_dir)
 
         # Sanitize filename slightly (replace spaces, avoid path traversal)
-        safe_filename = "".join(c for c in filename if c.isalnum() or c in ('_', '-')).rstrip()
+        safe_filename = sanitize_filename(filename)
         if not safe_filename:
-            safe_filename = f"profile_{random.randint(1000,9999)}"
+            safe_filename = f"profile_{(rng or random).randint(1000,9999)}"
 
         filepath = os.path.join(profiles_dir, f"{safe_filename}.json")
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(profile, f, indent=2, ensure_ascii=False)
-
-        return filepath
+        with METRICS.stage("serialization"):
+            text = json.dumps(profile, indent=2, ensure_ascii=False)
+        METRICS.count("file_opens", kind="write")
+        with METRICS.stage("file_write"), open(filepath, 'w', encoding='utf-8') as f:
+            f.write(text)
     except Exception as e:
         print(f"Error saving profile to {filename}.json: {e}")
         return None
 
-def export_profile_to_txt(profile, filename, exports_dir):
-    """Export profile to a text file"""
+    if index is not None:
+        try:
+            index.upsert(filepath, profile)
+        except Exception as e: # The profile is saved; the index picks it up on its next sync
+            print(f"Warning: Could not update the persona index for {filepath}: {e}")
+    return filepath
+
+def export_profile_to_txt(profile, filename, exports_dir, rng=None):
+    """Export profile to a text file (``rng`` is used for the fallback filename)"""
     # --- NOTE: This function still contains Spanish headers ---
     # You might want to replace "Datos básicos", "Credenciales", etc. with English equivalents
     # from your TEXTS["en"] dictionary for consistency.
@@ -130,13 +176,14 @@ def export_profile_to_txt(profile, filename, exports_dir):
             os.makedirs(exports_dir)
 
         # Sanitize filename
-        safe_filename = "".join(c for c in filename if c.isalnum() or c in ('_', '-')).rstrip()
+        safe_filename = sanitize_filename(filename)
         if not safe_filename:
-            safe_filename = f"profile_{random.randint(1000,9999)}"
+            safe_filename = f"profile_{(rng or random).randint(1000,9999)}"
 
         filepath = os.path.join(exports_dir, f"{safe_filename}.txt")
 
-        with open(filepath, 'w', encoding='utf-8') as f:
+        METRICS.count("file_opens", kind="write")
+        with METRICS.stage("file_write"), open(filepath, 'w', encoding='utf-8') as f: # Formatting and writing are interleaved
             f.write("===== SOCK SPY PROFILE =====\n\n")
 
             # Basic Data (Example using English keys, update headers manually)
@@ -266,7 +313,8 @@ def get_numeric_choice(min_val, max_val, prompt="> "):
             print("Invalid input. Please enter a number.")
         # Removed EOFError handling here as it's in get_input
 
-def handle_dynamic_list_selection(full_list, texts, prompt_msg, initial_show=5, increment=5, allow_skip=False):
+def handle_dynamic_list_selection(full_list, texts, prompt_msg, initial_show=5, increment=5, allow_skip=False, rng=None,
+                                  search_index=None):
     """
     Handles displaying a list with options for 'Show More', 'Regenerate', and optionally 'Skip/Stop'.
 
@@ -277,6 +325,9 @@ def handle_dynamic_list_selection(full_list, texts, prompt_msg, initial_show=5,
         initial_show (int): Number of items to show initially.
         increment (int): Number of items to add when 'Show More' is chosen.
         allow_skip (bool): If True, add the 'Skip/Stop Here' option.
+        rng: Optional random.Random instance used to sample the displayed items.
+        search_index (TextIndex): Optional index over ``full_list``; adds a 'Filter' action
+            that narrows the list to items containing the typed text.
 
     Returns:
         tuple: (selected_item, action)
@@ -289,16 +340,22 @@ def handle_dynamic_list_selection(full_list, texts, prompt_msg, initial_show=5,
         # input(texts.get("continue_prompt", "Press Enter to continue...")) # Optional pause
         return None, 'back' # Indicate nothing to select
 
-    # Use indices for easier management of displayed vs. available
-    available_indices = list(range(len(full_list)))
-    displayed_indices = random.sample(available_indices, min(initial_show, len(full_list)))
-    displayed_indices.sort() # Keep displayed items ordered by original list index initially
+    rng = rng or random
+    all_items = full_list
+    filter_text = None # While set, full_list holds the best matches first
+    # Items are drawn from a lazily shuffled permutation (ranked order while filtering),
+    # so Show More / Regenerate cost O(items added) however long the list is
+    cursor = PermutationCursor(len(full_list), rng)
+    displayed_indices = sorted(cursor.take(initial_show)) # Keep displayed items ordered by original list index
 
     # Text keys expected in the 'texts' dictionary
     text_select_action = texts.get("select_or_action", "Select an item or choose an action:")
     text_show_more = texts.get("show_more_options", "Show More Options")
     text_regenerate = texts.get("regenerate_options", "Show New Options (Regenerate List)")
     text_skip_level = texts.get("skip_level_and_continue", "Use current selection level and continue")
+    text_filter = texts.get("filter_options", "Filter by text")
+    text_filter_prompt = texts.get("filter_prompt", "Type part of the item (Enter to clear the filter):")
+    text_filter_no_matches = texts.get("filter_no_matches", "Nothing matches '{}'.")
     text_invalid_choice = texts.get("invalid_choice", "Invalid choice.")
     text_continue = texts.get("continue_prompt", "Press Enter to continue...")
 
@@ -306,6 +363,8 @@ def handle_dynamic_list_selection(full_list, texts, prompt_msg, initial_show=5,
     while True:
         clear_screen()
         print(prompt_msg)
+        if filter_text:
+            print(f"(Filter: '{filter_text}', {len(full_list)} match(es))")
         print(text_select_action)
 
         current_options_map = {i + 1: full_list[idx] for i, idx in enumerate(displayed_indices)}
@@ -318,12 +377,13 @@ def handle_dynamic_list_selection(full_list, texts, prompt_msg, initial_show=5,
         option_offset = len(current_options_map)
         show_more_opt_num = option_offset + 1
         regenerate_opt_num = option_offset + 2
-        skip_opt_num = option_offset + 3 if allow_skip else -1 # Only valid if allow_skip is True
+        filter_opt_num = option_offset + 3 if search_index is not None else -1
+        skip_opt_num = option_offset + (4 if search_index is not None else 3) if allow_skip else -1 # Only valid if allow_skip is True
 
         current_max_choice = option_offset # Start with max item number
 
         # Option: Show More
-        can_show_more = len(displayed_indices) < len(full_list)
+        can_show_more = cursor.remaining() > 0
         if can_show_more:
             print(f"{show_more_opt_num}. {text_show_more}")
             current_max_choice = show_more_opt_num
@@ -336,6 +396,11 @@ def handle_dynamic_list_selection(full_list, texts, prompt_msg, initial_show=5,
         print(f"{regenerate_opt_num}. {text_regenerate}")
         current_max_choice = regenerate_opt_num
 
+        # Option: Filter
+        if search_index is not None:
+            print(f"{filter_opt_num}. {text_filter}")
+            current_max_choice = filter_opt_num
+
         # Option: Skip/Stop
         if allow_skip:
             print(f"{skip_opt_num}. {text_skip_level}")
@@ -352,21 +417,30 @@ def handle_dynamic_list_selection(full_list, texts, prompt_msg, initial_show=5,
 
         # --- Handle Actions ---
         if can_show_more and choice == show_more_opt_num:
-            remaining_indices = [i for i in available_indices if i not in displayed_indices]
-            if remaining_indices:
-                num_to_add = min(increment, len(remaining_indices))
-                # Sample from remaining, don't add duplicates
-                new_indices = random.sample(remaining_indices, num_to_add)
-                displayed_indices.extend(new_indices)
-                displayed_indices.sort() # Maintain order if desired
+            # The cursor never repeats an index, so no duplicates can be added
+            displayed_indices.extend(cursor.take(increment))
+            displayed_indices.sort() # Maintain order if desired
             # Loop continues to redisplay with more items
             continue
 
+        elif choice == filter_opt_num:
+            query = get_input(text_filter_prompt).strip()
+            matches = search_index.search(query) if query else []
+            if query and not matches:
+                print(text_filter_no_matches.format(query))
+                input(text_continue)
+                continue
+            filter_text = query or None
+            full_list = matches if query else all_items
+            cursor = PermutationCursor(len(full_list), rng, shuffle=not filter_text)
+            displayed_indices = sorted(cursor.take(initial_show))
+            continue
+
         elif choice == regenerate_opt_num:
-            # Resample completely new indices from all available
-            num_to_show = min(initial_show, len(full_list)) # Start with initial count again
-            displayed_indices = random.sample(available_indices, num_to_show)
-            displayed_indices.sort()
+            # Show items not seen yet; once everything was shown, start a new shuffle
+            if cursor.remaining() == 0:
+                cursor.reset()
+            displayed_indices = sorted(cursor.take(initial_show))
             # Loop continues to redisplay regenerated list
             continue
 
@@ -389,13 +463,18 @@ def handle_dynamic_list_selection(full_list, texts, prompt_msg, initial_show=5,
 # --- End of new / modified functions ---
 
 
-def generate_username_suggestions(first_name, last_name, age):
-    """Generate username suggestions based on name and age"""
+def generate_username_suggestions(first_name, last_name, age, rng=None):
+    """Generate username suggestions based on name and age.
+
+    ``rng`` may be a ``random.Random`` instance for reproducible output;
+    the module-level ``random`` is used when it is omitted.
+    """
+    rng = rng or random
     suggestions = []
     fn = first_name.lower().replace(" ", "") # Remove spaces
     ln = last_name.lower().replace(" ", "")
     if not fn: fn = "user"
-    if not ln: ln = str(random.randint(100,999))
+    if not ln: ln = str(rng.randint(100,999))
 
     try:
         # Basic combinations
@@ -413,16 +492,16 @@ def generate_username_suggestions(first_name, last_name, age):
             except Exception: pass # Ignore errors calculating year
 
         # Add random numbers
-        suggestions.append(f"{fn}{ln}{random.randint(10, 999)}")
-        suggestions.append(f"{fn}_{ln}{random.randint(10, 99)}")
+        suggestions.append(f"{fn}{ln}{rng.randint(10, 999)}")
+        suggestions.append(f"{fn}_{ln}{rng.randint(10, 99)}")
 
         # Mix initials and numbers
-        suggestions.append(f"{fn[0] if fn else 'u'}{ln[0] if ln else 's'}{random.randint(100, 9999)}")
+        suggestions.append(f"{fn[0] if fn else 'u'}{ln[0] if ln else 's'}{rng.randint(100, 9999)}")
 
         # Use parts of names
         fn_part = fn[:max(1, len(fn)//2)] # First half of first name
         ln_part = ln[:max(1, len(ln)//2)] # First half of last name
-        suggestions.append(f"{fn_part}{ln_part}{random.randint(10, 99)}")
+        suggestions.append(f"{fn_part}{ln_part}{rng.randint(10, 99)}")
 
         # Ensure unique suggestions and limit count
         unique_suggestions = list(dict.fromkeys(suggestions)) # Remove duplicates preserving order
@@ -430,11 +509,12 @@ def generate_username_suggestions(first_name, last_name, age):
     except Exception as e:
         # Fallback in case of unexpected errors with names/age
         print(f"Warning: Could not generate all username suggestions: {e}")
-        return [f"{fn}{ln}{random.randint(100,999)}"]
+        return [f"{fn}{ln}{rng.randint(100,999)}"]
 
 
 def get_current_year():
     """Get the current year"""
+    import datetime # Only needed here; kept out of start-up imports
     return datetime.datetime.now().year
 
 def load_hierarchical_data(data_dir, category, subcategory=None):
@@ -465,26 +545,30 @@ def load_hierarchical_data(data_dir, category, subcategory=None):
         print(f"Error loading hierarchical data for {category}: {e}")
         return {}
 
-def generate_random_password(length=12):
+PASSWORD_CHARACTERS = string.ascii_letters + string.digits + string.punctuation
+
+def generate_random_password(length=12, rng=None):
     """Generates a random password with letters, digits, and symbols."""
-    characters = string.ascii_letters + string.digits + string.punctuation
+    rng = rng or random
     # Ensure password meets complexity if needed (e.g., at least one of each type)
     # For simplicity now, just pick random characters
-    password = ''.join(random.choice(characters) for i in range(length))
+    password = ''.join(rng.choices(PASSWORD_CHARACTERS, k=length))
     return password
 
-def get_random_hierarchical_item(data):
+def get_random_hierarchical_item(data, rng=None):
     """
     Navigates a nested dictionary/list structure randomly and returns a
     random item from the deepest list found, along with the path taken.
 
     Args:
         data: The nested dictionary or list.
+        rng: Optional random.Random instance (defaults to the random module).
 
     Returns:
         tuple: (selected_item, path_list) or (None, []) if error/no list found.
         selected_item is None if the deepest level wasn't a non-empty list.
     """
+    rng = rng or random
     current_level = data
     path = []
     max_depth = 10 # Prevent infinite loops in case of weird data
@@ -493,12 +577,12 @@ def get_random_hierarchical_item(data):
         for _ in range(max_depth):
             if isinstance(current_level, dict):
                 if not current_level: break # Stop if dict is empty
-                key = random.choice(list(current_level.keys()))
+                key = rng.choice(list(current_level.keys()))
                 path.append(key)
                 current_level = current_level[key]
             elif isinstance(current_level, list):
                 if not current_level: break # Stop if list is empty
-                selected_item = random.choice(current_level)
+                selected_item = rng.choice(current_level)
                 # path.append(selected_item) # Option: Add the item itself to the path?
                 return selected_item, path # Found a list, return item and path leading to it
             else: